@@ -0,0 +1,216 @@
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+import psutil
+
+from collector import (SystemCollector, ProcessCollector, DeltaEncoder, CpuSource, MemorySource, NetSource,
+                       DiskUsageSource, DiskProbe, MountWatcher, DiskStatsSource, ProcfsProcessBackend,
+                       PsutilProcessBackend)
+from collector.memory import MemoryAccountant, default_uss_reader, read_psutil_uss
+import collector.diskprobe
+import collector.memory
+import collector.processes
+import collector.sources
+from .fixtures import ProcTree, FakePsutil
+
+# Módulos del colector que importan psutil: la capa falsa se inyecta en todos
+PSUTIL_USERS = (collector.sources, collector.processes, collector.diskprobe, collector.memory)
+AUDITED = {'open': 'opens', 'os.listdir': 'listdirs', 'os.scandir': 'listdirs'}
+
+
+class SyscallCounter:
+    # Aperturas y listados por los eventos de auditoría de Python; lecturas/escrituras por los
+    # contadores syscr/syscw de /proc/self/io (todo el proceso, incluidos los hilos de DiskProbe).
+    # readlink, stat o statvfs no tienen evento de auditoría y no se cuentan.
+    def __init__(self):
+        self.enabled = False
+        self.counts = Counter()
+        self.has_io = os.path.exists("/proc/self/io")
+        self.overhead = 0
+        sys.addaudithook(self.hook)
+        if self.has_io:
+            a = self.io()
+            b = self.io()
+            self.overhead = b[0] - a[0]
+
+    def hook(self, event, args):
+        if self.enabled:
+            name = AUDITED.get(event)
+            if name: self.counts[name] += 1
+
+    def io(self):
+        fd = os.open("/proc/self/io", os.O_RDONLY)
+        try:
+            raw = os.read(fd, 4096)
+        finally:
+            os.close(fd)
+        values = dict(line.split(b": ") for line in raw.splitlines() if b": " in line)
+        return int(values[b"syscr"]), int(values[b"syscw"])
+
+    def measure(self, fn):
+        self.counts = Counter()
+        before = self.io() if self.has_io else (0, 0)
+        self.enabled = True
+        try:
+            fn()
+        finally:
+            self.enabled = False
+        out = {'opens': self.counts['opens'], 'listdirs': self.counts['listdirs']}
+        if self.has_io:
+            after = self.io()
+            out['reads'] = max(after[0] - before[0] - self.overhead, 0)
+            out['writes'] = after[1] - before[1]
+        return out
+
+
+@contextlib.contextmanager
+def fixture_psutil(fake=None, procfs_path=None):
+    saved = [m.psutil for m in PSUTIL_USERS]
+    saved_path = getattr(psutil, "PROCFS_PATH", None)
+    try:
+        if fake is not None:
+            for m in PSUTIL_USERS: m.psutil = fake
+        if procfs_path is not None:
+            psutil.PROCFS_PATH = procfs_path
+            try: psutil._pmap.clear()
+            except: pass
+        yield
+    finally:
+        for m, mod in zip(PSUTIL_USERS, saved): m.psutil = mod
+        if procfs_path is not None: psutil.PROCFS_PATH = saved_path
+
+
+def summarize(times):
+    q = statistics.quantiles(times, n=100, method='inclusive') if len(times) > 1 else times * 99
+    return {'p50_ms': statistics.median(times), 'p99_ms': q[98], 'mean_ms': statistics.fmean(times)}
+
+
+def run_case(name, state, step, rounds, counter, warmup=2, **info):
+    # step(): un tick completo; state.advance() entre ticks simula actividad (fuera del tiempo)
+    for _ in range(warmup):
+        state.advance()
+        step()
+    times = []
+    for _ in range(rounds):
+        state.advance()
+        t0 = time.perf_counter()
+        step()
+        times.append((time.perf_counter() - t0) * 1000)
+    calls = []
+    for _ in range(max(min(rounds, 5), 1)):
+        state.advance()
+        calls.append(counter.measure(step))
+    result = {'case': name, 'rounds': rounds}
+    result.update(info)
+    result.update(summarize(times))
+    for key in calls[0]: result[f"{key}_per_tick"] = statistics.fmean(c[key] for c in calls)
+    return result
+
+
+def system_sources(mode, tree):
+    sources = [CpuSource(), MemorySource(), NetSource()]
+    if mode == 'fake':
+        probe = DiskProbe(watcher=MountWatcher(os.devnull))
+    else:
+        sources.append(DiskStatsSource(proc_root=tree.proc, sys_root=tree.sys))
+        probe = DiskProbe(watcher=MountWatcher(os.path.join(tree.proc, "self", "mountinfo")))
+    sources.append(DiskUsageSource(probe=probe))
+    return sources
+
+
+def bench_system(mode, nics, partitions, rounds, counter):
+    # Lo que hace WorkerThread en cada emisión con todas las fuentes vencidas: sample() + as_dict()
+    if mode == 'fake':
+        fixture = FakePsutil(processes=0, nics=nics, partitions=partitions)
+        ctx = fixture_psutil(fake=fixture)
+    else:
+        fixture = ProcTree(processes=0, nics=nics, partitions=partitions)
+        ctx = fixture_psutil(procfs_path=fixture.proc)
+    try:
+        with ctx:
+            system = SystemCollector(sources=system_sources(mode, fixture))
+            system.open()
+            try:
+                return run_case('worker.tick', fixture, lambda: system.sample().as_dict(), rounds, counter,
+                                fixture=mode, nics=nics, partitions=partitions)
+            finally:
+                system.close()
+    finally:
+        if mode != 'fake': fixture.close()
+
+
+def bench_processes(mode, processes, rounds, counter):
+    # Lo que hace ProcessWorker en cada escaneo: sample() + DeltaEncoder.encode()
+    if mode == 'fake':
+        fixture = FakePsutil(processes=processes)
+        ctx = fixture_psutil(fake=fixture)
+    else:
+        fixture = ProcTree(processes=processes, nics=0, partitions=0)
+        ctx = fixture_psutil(procfs_path=fixture.proc)
+    try:
+        with ctx:
+            if mode == 'procfs':
+                backend = ProcfsProcessBackend(proc_root=fixture.proc,
+                                               memory=MemoryAccountant(default_uss_reader(fixture.proc)))
+            else:
+                backend = PsutilProcessBackend(memory=MemoryAccountant(read_psutil_uss))
+            procs = ProcessCollector(backend)
+            encoder = DeltaEncoder()
+            return run_case('process_worker.scan', fixture, lambda: encoder.encode(procs.sample()), rounds,
+                            counter, fixture=mode, processes=processes)
+    finally:
+        if mode != 'fake': fixture.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.collector",
+                                     description="Coste por tick del colector contra un /proc sintético o una capa psutil falsa.")
+    parser.add_argument("-n", "--processes", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--nics", type=int, nargs="+", default=[2, 32])
+    parser.add_argument("--partitions", type=int, nargs="+", default=[4, 64])
+    parser.add_argument("-r", "--rounds", type=int, default=20)
+    parser.add_argument("--fixture", choices=['procfs', 'psutil', 'fake'], action="append",
+                        help="procfs: backends propios sobre /proc sintético; psutil: psutil sobre el mismo "
+                             "árbol; fake: psutil en memoria (se puede repetir)")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("-o", "--output", help="guardar el JSON en un fichero")
+    args = parser.parse_args(argv)
+
+    linux = sys.platform.startswith("linux")
+    modes = args.fixture or (['procfs', 'psutil', 'fake'] if linux else ['fake'])
+    if not linux and any(m != 'fake' for m in modes):
+        print("los fixtures /proc solo funcionan en Linux: se usa la capa psutil falsa", file=sys.stderr)
+        modes = ['fake']
+
+    counter = SyscallCounter()
+    results = []
+    for mode in modes:
+        # El tick de sistema no depende del backend de procesos: una vez por árbol
+        if mode != 'psutil' or 'procfs' not in modes:
+            for nics in args.nics:
+                for partitions in args.partitions:
+                    results.append(bench_system(mode, nics, partitions, args.rounds, counter))
+        for n in args.processes:
+            results.append(bench_processes(mode, n, args.rounds, counter))
+
+    if args.output:
+        with open(args.output, "w") as f: json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for r in results:
+            extra = " ".join(f"{k}={r[k]}" for k in ('fixture', 'processes', 'nics', 'partitions') if k in r)
+            calls = "  ".join(f"{k[:-9]} {r[k]:7.1f}" for k in ('opens_per_tick', 'reads_per_tick', 'listdirs_per_tick')
+                              if k in r)
+            print(f"{r['case']:>20} {extra:<34} p50 {r['p50_ms']:8.2f} ms  p99 {r['p99_ms']:8.2f} ms  {calls}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import os
+import random
+import shutil
+import tempfile
+from collections import namedtuple
+
+# Fixtures para medir el colector sin depender de la máquina: un árbol /proc (+ /sys) sintético
+# que leen tanto los backends propios (proc_root/sys_root) como psutil (psutil.PROCFS_PATH), y
+# una capa psutil en memoria que deja solo el coste de Python del colector.
+
+CLK_TCK = 100
+PAGE = 4096
+BTIME = 1700000000
+
+
+class ProcTree:
+    def __init__(self, processes=500, nics=2, partitions=4, groups=None, seed=0, root=None):
+        self.rnd = random.Random(seed)
+        self.own_root = root is None
+        self.root = root or tempfile.mkdtemp(prefix="lesys-fixture-")
+        self.proc = os.path.join(self.root, "proc")
+        self.sys = os.path.join(self.root, "sys")
+        self.mnt = os.path.join(self.root, "mnt")
+        groups = groups or max(processes // 10, 1)
+        # pid -> [nombre, utime, stime, rss_pages, io_bytes]
+        self.pids = {}
+        for i in range(processes):
+            name = f"proc{self.rnd.randrange(groups):05d}"
+            self.pids[1000 + i] = [name, self.rnd.randrange(10000), self.rnd.randrange(5000),
+                                   self.rnd.randrange(100, 50000), self.rnd.randrange(1 << 30)]
+        self.nics = {f"eth{i}": [self.rnd.randrange(1 << 40), self.rnd.randrange(1 << 40)] for i in range(nics)}
+        self.disks = {}
+        for i in range(partitions):
+            disk = f"sd{chr(97 + i % 26)}{'' if i < 26 else i // 26}"
+            self.disks[f"{disk}1"] = [8, 16 * i + 1, disk] + [self.rnd.randrange(1 << 30) for _ in range(9)]
+        self.cpu = [self.rnd.randrange(1 << 20) for _ in range(8)]
+        self.build()
+
+    def build(self):
+        os.makedirs(os.path.join(self.proc, "net"), exist_ok=True)
+        os.makedirs(os.path.join(self.proc, "self"), exist_ok=True)
+        for pid in self.pids: self.write_pid(pid, create=True)
+        self.write_system()
+        self.write_mounts()
+
+    def _write(self, path, text):
+        with open(path, "w") as f: f.write(text)
+
+    def write_pid(self, pid, create=False):
+        name, utime, stime, rss, io = self.pids[pid]
+        base = os.path.join(self.proc, str(pid))
+        if create:
+            os.makedirs(base, exist_ok=True)
+            os.symlink(f"/usr/bin/{name}", os.path.join(base, "exe"))
+            self._write(os.path.join(base, "cmdline"), f"/usr/bin/{name}\0--flag\0")
+            self._write(os.path.join(base, "smaps_rollup"),
+                        f"Rss: {rss * 4} kB\nPrivate_Clean: {rss} kB\nPrivate_Dirty: {rss} kB\n")
+        # stat: 52 campos como en Linux >= 5; starttime fijo por PID
+        rest = ["S", "1", str(pid), str(pid), "0", "-1", "4194304", "100", "0", "0", "0",
+                str(utime), str(stime), "0", "0", "20", "0", "1", "0", str(pid * 10),
+                str(rss * 8 * PAGE), str(rss)] + ["0"] * 30
+        self._write(os.path.join(base, "stat"), f"{pid} ({name}) {' '.join(rest)}\n")
+        self._write(os.path.join(base, "statm"), f"{rss * 8} {rss} {rss // 4} 10 0 {rss} 0\n")
+        self._write(os.path.join(base, "io"),
+                    f"rchar: {io}\nwchar: {io // 2}\nsyscr: {io // 4096}\nsyscw: {io // 8192}\n"
+                    f"read_bytes: {io}\nwrite_bytes: {io // 2}\ncancelled_write_bytes: 0\n")
+
+    def write_system(self):
+        c = self.cpu
+        cpus = "".join(f"cpu{i} {' '.join(str(v // 4) for v in c)} 0 0\n" for i in range(4))
+        self._write(os.path.join(self.proc, "stat"),
+                    f"cpu  {' '.join(str(v) for v in c)} 0 0\n{cpus}btime {BTIME}\nprocesses {len(self.pids)}\n")
+        self._write(os.path.join(self.proc, "self", "stat"), "1 (python) R 0 0 0 0 -1 0" + " 0" * 44 + "\n")
+        self._write(os.path.join(self.proc, "meminfo"),
+                    "MemTotal: 16000000 kB\nMemFree: 4000000 kB\nMemAvailable: 8000000 kB\n"
+                    "Buffers: 100000 kB\nCached: 3000000 kB\nSwapCached: 0 kB\nActive: 6000000 kB\n"
+                    "Inactive: 3000000 kB\nShmem: 200000 kB\nSReclaimable: 300000 kB\n"
+                    "SwapTotal: 0 kB\nSwapFree: 0 kB\n")
+        lines = ["Inter-|   Receive                                                |  Transmit",
+                 " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed"]
+        for nic, (rx, tx) in self.nics.items():
+            lines.append(f"{nic:>6}: {rx} 100 0 0 0 0 0 0 {tx} 100 0 0 0 0 0 0")
+        self._write(os.path.join(self.proc, "net", "dev"), "\n".join(lines) + "\n")
+        stats = []
+        for name, d in self.disks.items():
+            stats.append(f"{d[0]:>4} {d[1]:>7} {name} {' '.join(str(v) for v in d[3:])} 0 {d[10]} {d[11]} 0 0 0 0")
+        self._write(os.path.join(self.proc, "diskstats"), "\n".join(stats) + "\n")
+
+    def write_mounts(self):
+        mountinfo = []
+        mounts = []
+        for i, (name, d) in enumerate(self.disks.items()):
+            point = os.path.join(self.mnt, name)
+            os.makedirs(point, exist_ok=True)
+            mountinfo.append(f"{30 + i} 1 {d[0]}:{d[1]} / {point} rw,relatime shared:{i} - ext4 /dev/{name} rw")
+            mounts.append(f"/dev/{name} {point} ext4 rw,relatime 0 0")
+            part = os.path.join(self.sys, "devices", "block", d[2], name)
+            os.makedirs(part, exist_ok=True)
+            self._write(os.path.join(part, "partition"), "1\n")
+            link = os.path.join(self.sys, "class", "block", name)
+            os.makedirs(os.path.dirname(link), exist_ok=True)
+            if not os.path.lexists(link): os.symlink(part, link)
+        self._write(os.path.join(self.proc, "self", "mountinfo"), "\n".join(mountinfo) + "\n")
+        self._write(os.path.join(self.proc, "self", "mounts"), "\n".join(mounts) + "\n")
+        self._write(os.path.join(self.proc, "filesystems"), "nodev\tproc\n\text4\n")
+        self._write(os.path.join(self.proc, "self", "smaps_rollup"), "Private_Clean: 0 kB\n")
+
+    def advance(self, fraction=0.2):
+        # Un ciclo de actividad: una parte de los procesos consume CPU y hace E/S
+        rnd = self.rnd
+        for pid, p in self.pids.items():
+            if rnd.random() >= fraction: continue
+            p[1] += rnd.randrange(1, 50)
+            p[4] += rnd.randrange(1 << 20)
+            self.write_pid(pid)
+        for v in self.nics.values():
+            v[0] += rnd.randrange(1 << 20)
+            v[1] += rnd.randrange(1 << 18)
+        for d in self.disks.values():
+            for j in (3, 5, 7, 9): d[j] += rnd.randrange(1000)
+        self.cpu = [v + rnd.randrange(400) for v in self.cpu]
+        self.write_system()
+
+    def close(self):
+        if self.own_root: shutil.rmtree(self.root, ignore_errors=True)
+
+
+_cpu_freq = namedtuple("scpufreq", "current min max")
+_vmem = namedtuple("svmem", "total available percent used free")
+_netio = namedtuple("snetio", "bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout")
+_part = namedtuple("sdiskpart", "device mountpoint fstype opts")
+_usage = namedtuple("sdiskusage", "total used free percent")
+_meminfo = namedtuple("pmem", "rss vms shared text lib data dirty")
+_pio = namedtuple("pio", "read_count write_count read_bytes write_bytes")
+
+
+class FakeProcess:
+    __slots__ = ('info',)
+
+    def __init__(self, info):
+        self.info = info
+
+
+class FakePsutil:
+    # Solo lo que usa el colector; mismo estado que ProcTree pero sin tocar el sistema de archivos
+    class NoSuchProcess(Exception): pass
+
+    class AccessDenied(Exception): pass
+
+    class ZombieProcess(Exception): pass
+
+    def __init__(self, processes=500, nics=2, partitions=4, groups=None, seed=0):
+        self.rnd = random.Random(seed)
+        groups = groups or max(processes // 10, 1)
+        self.procs = []
+        for i in range(processes):
+            name = f"proc{self.rnd.randrange(groups):05d}"
+            rss = self.rnd.randrange(1 << 20, 1 << 30)
+            self.procs.append({'pid': 1000 + i, 'name': name, 'cpu_percent': 0.0,
+                               'memory_info': _meminfo(rss, rss * 4, rss // 4, 0, 0, rss, 0),
+                               'exe': f"/usr/bin/{name}", 'create_time': float(BTIME + i), 'ppid': 1,
+                               'io_counters': _pio(0, 0, self.rnd.randrange(1 << 30), 0)})
+        self.nics = {f"eth{i}": [self.rnd.randrange(1 << 40), self.rnd.randrange(1 << 40)] for i in range(nics)}
+        self.parts = [_part(f"/dev/sd{i}1", f"/mnt/p{i}", "ext4", "rw") for i in range(partitions)]
+
+    def advance(self, fraction=0.2):
+        rnd = self.rnd
+        for p in self.procs:
+            if rnd.random() >= fraction:
+                p['cpu_percent'] = 0.0
+                continue
+            p['cpu_percent'] = rnd.random() * 100
+            io = p['io_counters']
+            p['io_counters'] = io._replace(read_bytes=io.read_bytes + rnd.randrange(1 << 20))
+        for v in self.nics.values():
+            v[0] += rnd.randrange(1 << 20)
+            v[1] += rnd.randrange(1 << 18)
+
+    def cpu_percent(self, interval=None, percpu=False):
+        return self.rnd.random() * 100
+
+    def cpu_freq(self):
+        return _cpu_freq(3400.0, 800.0, 4200.0)
+
+    def cpu_count(self, logical=True):
+        return 8
+
+    def virtual_memory(self):
+        return _vmem(16 << 30, 8 << 30, 50.0, 8 << 30, 4 << 30)
+
+    def net_io_counters(self, pernic=False):
+        return {n: _netio(tx, rx, 100, 100, 0, 0, 0, 0) for n, (rx, tx) in self.nics.items()}
+
+    def disk_partitions(self, all=False):
+        return list(self.parts)
+
+    def disk_usage(self, path):
+        return _usage(1 << 40, 1 << 39, 1 << 39, 50.0)
+
+    def process_iter(self, attrs=None):
+        # Copia del dict como hace psutil con p.info
+        return [FakeProcess(dict(p)) for p in self.procs]
@@ -0,0 +1,68 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from collector import ProcessTable, DeltaEncoder, ProcessSnapshot, COLUMNAR_AVAILABLE
+from .synthetic import make_records, churn
+
+if COLUMNAR_AVAILABLE:
+    from collector import ColumnarProcessTable
+
+SORTS = {'ram': (-1, 0, False), 'cpu': (2, 0, False), 'name': (0, 1, False)}
+
+
+def bench_table(table_cls, records, rounds, sort):
+    encoder = DeltaEncoder()
+    table = table_cls()
+    table.apply(encoder.encode(ProcessSnapshot(0.0, records)))
+    apply_ms = []
+    group_ms = []
+    current = records
+    for i in range(rounds):
+        current = churn(current, 0.05, seed=i)
+        delta = encoder.encode(ProcessSnapshot(0.0, current))
+        t0 = time.perf_counter()
+        table.apply(delta)
+        t1 = time.perf_counter()
+        table.group_by_name(*SORTS[sort])
+        t2 = time.perf_counter()
+        apply_ms.append((t1 - t0) * 1000)
+        group_ms.append((t2 - t1) * 1000)
+    return {
+        'table': table_cls.__name__, 'processes': len(records), 'sort': sort,
+        'apply_ms': statistics.median(apply_ms), 'group_ms': statistics.median(group_ms),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.grouping",
+                                     description="Agrupación por nombre: dicts de Python contra columnas NumPy.")
+    parser.add_argument("-n", "--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("-r", "--rounds", type=int, default=10)
+    parser.add_argument("--sort", choices=sorted(SORTS), default='ram')
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    tables = [ProcessTable]
+    if COLUMNAR_AVAILABLE: tables.append(ColumnarProcessTable)
+    else: print("numpy no está instalado: solo se mide la ruta Python", file=sys.stderr)
+
+    results = []
+    for n in args.sizes:
+        records = make_records(n)
+        for cls in tables:
+            results.append(bench_table(cls, records, args.rounds, args.sort))
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for r in results:
+            print(f"{r['table']:>22} {r['processes']:>7} procs  apply {r['apply_ms']:8.2f} ms  "
+                  f"group {r['group_ms']:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
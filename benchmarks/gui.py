@@ -0,0 +1,215 @@
+import os
+
+# Sin pantalla: se fija antes de importar Qt
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from PySide6 import __version__ as PYSIDE_VERSION
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QObject, Signal
+
+import config
+from collector import DeltaEncoder, ProcessSnapshot
+from collector.history import RingBuffer
+from .synthetic import make_records, churn, make_system_data
+
+# Tamaños de grupo: pocos nombres con muchas instancias, mezcla y casi uno por proceso
+GROUPINGS = {'few': 100, 'mixed': 10, 'unique': 2}
+
+
+class BenchFeed(QObject):
+    # Fuente vacía para MonitorFinal: nada de workers ni disco mientras se mide
+    data_signal = Signal(dict)
+    processes_signal = Signal(object)
+
+    def start(self):
+        pass
+
+    def set_visible_pids(self, pids):
+        pass
+
+    def request_keyframe(self):
+        pass
+
+
+def expose(widget):
+    # repaint() no pinta nada hasta que la ventana ha recibido su primer expose
+    widget.show()
+    QApplication.processEvents()
+
+
+def measure(name, fn, rounds, warmup=2, **info):
+    # Tiempos sin tracemalloc (que ralentiza) y después una pasada aparte para las asignaciones
+    for i in range(warmup): fn(i)
+    times = []
+    for i in range(rounds):
+        t0 = time.perf_counter()
+        fn(warmup + i)
+        times.append((time.perf_counter() - t0) * 1000)
+    alloc_rounds = max(min(rounds, 5), 1)
+    tracemalloc.start()
+    allocated = 0
+    peak = 0
+    for i in range(alloc_rounds):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn(warmup + rounds + i)
+        current, top = tracemalloc.get_traced_memory()
+        allocated += current - base
+        peak = max(peak, top - base)
+    tracemalloc.stop()
+    q = statistics.quantiles(times, n=100, method='inclusive') if len(times) > 1 else times * 99
+    result = {'case': name, 'rounds': rounds, 'p50_ms': statistics.median(times), 'p99_ms': q[98],
+              'mean_ms': statistics.fmean(times), 'alloc_net_kb': allocated / alloc_rounds / 1024,
+              'alloc_peak_kb': peak / 1024}
+    result.update(info)
+    return result
+
+
+def bench_process_tree(sizes, rounds):
+    from widgets import ProcessTree
+    results = []
+    for n in sizes:
+        for grouping, per_group in GROUPINGS.items():
+            tree = ProcessTree()
+            tree.resize(700, 600)
+            expose(tree)
+            records = make_records(n, groups=max(n // per_group, 1))
+            states = [records]
+
+            def update_data(i):
+                while len(states) <= i: states.append(churn(states[-1], 0.05, seed=len(states)))
+                tree.update_data(states[i])
+
+            results.append(measure('process_tree.update_data', update_data, rounds,
+                                   processes=n, groups=grouping))
+
+            encoder = DeltaEncoder()
+            tree.apply_delta(encoder.encode(ProcessSnapshot(0.0, states[-1])))
+            deltas = []
+
+            def apply_delta(i):
+                while len(deltas) <= i:
+                    states.append(churn(states[-1], 0.05, seed=len(states)))
+                    deltas.append(encoder.encode(ProcessSnapshot(0.0, states[-1])))
+                tree.apply_delta(deltas[i])
+
+            results.append(measure('process_tree.apply_delta', apply_delta, rounds,
+                                   processes=n, groups=grouping))
+            tree.close()
+            tree.deleteLater()
+    return results
+
+
+def bench_graphs(rounds):
+    from widgets import AreaGraph, HardwareRow
+    results = []
+    for label, window in (('60s', 60), ('1h', 3600)):
+        series = RingBuffer(window)
+        for i in range(window): series.append((i * 37) % 100)
+        graph = AreaGraph(series=series, max_points=window)
+        graph.resize(600, 75)
+        expose(graph)
+
+        def repaint(i):
+            series.append((i * 13) % 100)
+            graph.repaint()
+
+        results.append(measure('area_graph.repaint', repaint, rounds, window=label))
+        graph.close()
+
+        row = HardwareRow("CPU", series)
+        row.resize(700, 95)
+        expose(row)
+
+        def row_update(i):
+            series.append((i * 13) % 100)
+            row.update_val((i * 13) % 100, "3.40 GHz")
+            row.repaint()
+
+        results.append(measure('hardware_row.update_val+repaint', row_update, rounds, window=label))
+        row.close()
+    return results
+
+
+def bench_window(rounds, processes):
+    from window import MonitorFinal
+    persist = config.HISTORY_PERSIST
+    config.HISTORY_PERSIST = False
+    window = MonitorFinal(feed=BenchFeed(), title="bench")
+    config.HISTORY_PERSIST = persist
+    expose(window)
+    window.proc_table.update_data(make_records(processes))
+    data = [make_system_data(i) for i in range(8)]
+    window.update_ui(data[0])
+    QApplication.processEvents()
+
+    results = []
+    results.append(measure('monitor.update_ui', lambda i: window.update_ui(data[i % 8]), rounds))
+
+    def cycle(i):
+        window.update_ui(data[i % 8])
+        window.repaint()
+
+    results.append(measure('monitor.update_ui+repaint', cycle, rounds))
+
+    def toggle(i):
+        window.toggle_theme(i % 2 == 0)
+
+    results.append(measure('monitor.toggle_theme', toggle, max(rounds // 5, 4)))
+    window.toggle_theme(False)
+    window.close()
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except:
+        commit = ""
+    return {'commit': commit, 'python': platform.python_version(), 'pyside': PYSIDE_VERSION,
+            'platform': sys.platform, 'qpa': os.environ.get("QT_QPA_PLATFORM", "")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.gui",
+                                     description="Coste de actualización y pintado de la interfaz (Qt offscreen).")
+    parser.add_argument("-n", "--sizes", type=int, nargs="+", default=[500, 5000, 50000])
+    parser.add_argument("-r", "--rounds", type=int, default=20)
+    parser.add_argument("--only", choices=['processes', 'graphs', 'window'], action="append",
+                        help="limitar a un grupo de casos (se puede repetir)")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("-o", "--output", help="guardar el JSON en un fichero")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    only = set(args.only or ['processes', 'graphs', 'window'])
+    results = []
+    if 'processes' in only: results += bench_process_tree(args.sizes, args.rounds)
+    if 'graphs' in only: results += bench_graphs(args.rounds)
+    if 'window' in only: results += bench_window(args.rounds, min(args.sizes))
+
+    report = {'environment': environment(), 'results': results}
+    if args.output:
+        with open(args.output, "w") as f: json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report))
+    else:
+        for r in results:
+            extra = " ".join(f"{k}={r[k]}" for k in ('processes', 'groups', 'window') if k in r)
+            print(f"{r['case']:>34} {extra:<28} p50 {r['p50_ms']:8.2f} ms  p99 {r['p99_ms']:8.2f} ms  "
+                  f"alloc {r['alloc_net_kb']:8.1f} KB (pico {r['alloc_peak_kb']:8.1f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
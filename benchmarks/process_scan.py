@@ -0,0 +1,50 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from collector import PsutilProcessBackend, ProcfsProcessBackend, procfs_available
+
+
+def bench_backend(backend, rounds, warmup=1):
+    for _ in range(warmup): backend.scan()
+    times = []
+    count = 0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        records = backend.scan()
+        times.append((time.perf_counter() - t0) * 1000)
+        count = len(records)
+    return {
+        'backend': backend.name,
+        'processes': count,
+        'rounds': rounds,
+        'mean_ms': statistics.fmean(times),
+        'min_ms': min(times),
+        'max_ms': max(times),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.process_scan",
+                                     description="Compara el escaneo de procesos psutil contra /proc.")
+    parser.add_argument("-r", "--rounds", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    backends = [PsutilProcessBackend()]
+    if procfs_available(): backends.append(ProcfsProcessBackend())
+
+    results = [bench_backend(b, args.rounds) for b in backends]
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for r in results:
+            print(f"{r['backend']:>8}: {r['processes']:>6} procs  mean {r['mean_ms']:8.2f} ms  "
+                  f"min {r['min_ms']:8.2f} ms  max {r['max_ms']:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+import random
+
+from collector import ProcessRecord
+
+
+def make_records(count, groups=None, seed=0, start_pid=1):
+    rnd = random.Random(seed)
+    groups = groups or max(count // 10, 1)
+    names = [f"proc{i:05d}" for i in range(groups)]
+    records = []
+    for i in range(count):
+        # Grupos de tamaño desigual: unos pocos nombres concentran muchos procesos
+        name = names[min(int(rnd.paretovariate(1.2)) - 1, groups - 1)] if i % 2 else names[i % groups]
+        # Padre entre los anteriores, sesgado hacia los primeros (árbol ancho y poco profundo)
+        ppid = start_pid + int(i * rnd.random() ** 3) if i else 0
+        records.append(ProcessRecord(start_pid + i, name, rnd.random() * 5, rnd.random() * 5e8,
+                                     rnd.random(), f"/usr/bin/{name}", float(i), ppid))
+    return records
+
+
+def churn(records, fraction=0.05, seed=1):
+    # Variación entre ciclos: la mayoría ociosos, algunos cambian y otros nacen/mueren
+    rnd = random.Random(seed)
+    out = []
+    next_pid = max(r.pid for r in records) + 1 if records else 1
+    for r in records:
+        x = rnd.random()
+        if x < fraction / 2: continue
+        if x < fraction:
+            out.append(ProcessRecord(r.pid, r.name, rnd.random() * 5, r.ram * 1.01, rnd.random(), r.exe, r.start,
+                                     r.ppid))
+        else:
+            out.append(ProcessRecord(r.pid, r.name, r.cpu, r.ram, r.disk, r.exe, r.start, r.ppid))
+    for _ in range(int(len(records) * fraction / 2)):
+        src = rnd.choice(records)
+        out.append(ProcessRecord(next_pid, src.name, rnd.random(), rnd.random() * 1e8, 0.0, src.exe,
+                                 float(next_pid), src.pid))
+        next_pid += 1
+    return out
+
+
+def make_system_data(seed=0, disks=4, nics=2):
+    # Dict con la forma de SystemSnapshot.as_dict() y valores variables
+    from collector import SystemSnapshot
+    rnd = random.Random(seed)
+    snap = SystemSnapshot(timestamp=1.0e9 + seed, cpu=rnd.random() * 100, ram=rnd.random() * 100,
+                          gpu=rnd.random() * 100, cpu_extra="3.40 GHz", ram_extra="7.1 / 15.5 GB",
+                          gpu_extra="1.2 / 8.0 GB")
+    snap.net_nics = {f"eth{i}": (rnd.random() * 5, rnd.random() * 50) for i in range(nics)}
+    snap.net_up = sum(v[0] for v in snap.net_nics.values())
+    snap.net_down = sum(v[1] for v in snap.net_nics.values())
+    snap.net_iface = "eth0"
+    snap.temps = {"coretemp Package id 0": 40 + rnd.random() * 30}
+    for i in range(disks):
+        dev = f"/dev/sd{chr(97 + i)}1"
+        snap.disk_usage[dev] = rnd.random() * 100
+        snap.disk_io[dev] = (rnd.random() * 100, rnd.random() * 100)
+        snap.disk_detail[dev] = (rnd.random() * 500, rnd.random() * 500, rnd.random() * 5, rnd.random() * 5,
+                                 rnd.random() * 100, f"sd{chr(97 + i)}1", (f"sd{chr(97 + i)}",))
+    return snap.as_dict()
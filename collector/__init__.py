@@ -0,0 +1,17 @@
+from .snapshot import SystemSnapshot, ProcessRecord, ProcessSnapshot
+from .sources import (Source, WmiSession, CpuSource, MemorySource, NetSource,
+                      WmiDiskIOSource, DiskUsageSource, default_sources, list_partitions)
+from .sensors import (SensorBackend, NvmlBackend, WmiGpuBackend, SysfsGpuBackend, HwmonBackend,
+                      NullBackend, FakeBackend, SensorRegistry, SensorSource, default_registry)
+from .diskprobe import DiskProbe, MountWatcher, list_mounts
+from .diskstats import DiskStatsSource, diskstats_available, backing_devices
+from .memory import MemoryAccountant, read_smaps_rollup, read_psutil_uss, default_uss_reader
+from .processes import PsutilProcessBackend, IGNORED_PROCESSES, private_estimate
+from .procfs import ProcfsProcessBackend, procfs_available
+from .scheduler import Scheduler, Job
+from .core import Collector, SystemCollector, ProcessCollector, default_process_backend
+from .delta import ProcessDelta, DeltaEncoder, ProcessTable
+from .search import ProcessIndex
+from .hierarchy import ProcessHierarchy
+from .grouping import group_by_name, GroupView
+from .columnar import ColumnarProcessTable, make_process_table, COLUMNAR_AVAILABLE
@@ -0,0 +1,50 @@
+import argparse
+import json
+import sys
+import time
+
+from .core import SystemCollector, ProcessCollector
+from .sensors import default_registry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m collector",
+                                     description="Muestrea el sistema sin Qt e imprime los snapshots en JSON.")
+    parser.add_argument("-n", "--count", type=int, default=1)
+    parser.add_argument("-i", "--interval", type=float, default=1.0)
+    parser.add_argument("--processes", action="store_true", help="incluir la lista de procesos")
+    parser.add_argument("--timing", action="store_true", help="mostrar el coste por tick en stderr")
+    parser.add_argument("--sensors", action="store_true", help="mostrar los backends de sensores y cuáles están activos")
+    args = parser.parse_args(argv)
+
+    if args.sensors:
+        registry = default_registry()
+        registry.open()
+        print(json.dumps(registry.describe(), indent=2))
+        registry.close()
+        return 0
+
+    system = SystemCollector()
+    procs = ProcessCollector() if args.processes else None
+    with system:
+        time.sleep(min(args.interval, 0.5))
+        for i in range(args.count):
+            t0 = time.perf_counter()
+            out = {'system': system.sample().as_dict()}
+            t1 = time.perf_counter()
+            if procs:
+                out['processes'] = procs.sample().as_dicts()
+            t2 = time.perf_counter()
+            print(json.dumps(out), flush=True)
+            if args.timing:
+                print(f"system: {(t1 - t0) * 1000:.2f} ms  processes: {(t2 - t1) * 1000:.2f} ms", file=sys.stderr)
+            if i + 1 < args.count: time.sleep(args.interval)
+        if args.timing:
+            for name, st in system.stats().items():
+                print(f"{name:>10}: {st['runs']} ejecuciones, {st['missed']} plazos perdidos, "
+                      f"máx {st['max_ms']:.2f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
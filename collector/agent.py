@@ -0,0 +1,326 @@
+import json
+import os
+import socket
+import sys
+import threading
+
+from .core import SystemCollector, ProcessCollector
+from .delta import DeltaEncoder
+from .scheduler import Scheduler
+from . import wire
+
+VERSION = 1
+MAX_PENDING_DELTAS = 8
+# Lo que envían los clientes (petición de keyframe, PIDs visibles) es pequeño
+MAX_CLIENT_FRAME = 1 << 20
+
+
+def parse_endpoint(text):
+    # "unix:/ruta/socket", "[HOST]:PUERTO" o "PUERTO"; sin HOST, 127.0.0.1
+    if text.startswith("unix:"): return socket.AF_UNIX, text[5:]
+    host, _, port = text.rpartition(":")
+    return socket.AF_INET, (host.strip("[]") or "127.0.0.1", int(port))
+
+
+def connect(text, timeout=5.0):
+    family, address = parse_endpoint(text)
+    if family == socket.AF_UNIX:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(address)
+    else:
+        sock = socket.create_connection(address, timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.settimeout(None)
+    return sock
+
+
+def listen(text):
+    family, address = parse_endpoint(text)
+    if family == socket.AF_UNIX:
+        try: os.unlink(address)
+        except: pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(address)
+        sock.listen()
+        return sock
+    # Sin autenticación: solo se escucha fuera de 127.0.0.1 si se pide un host (0.0.0.0, ::, IP)
+    family = socket.AF_INET6 if ":" in address[0] else socket.AF_INET
+    return socket.create_server(address, family=family, reuse_port=False)
+
+
+class AgentClient:
+    # Un cliente conectado. Del sistema solo se guarda el último dict (último valor gana); los
+    # deltas de procesos se encolan hasta MAX_PENDING_DELTAS y, si el enlace no da abasto, se
+    # descartan y se envía un keyframe. Así un cliente lento nunca frena al agente ni a los demás.
+    def __init__(self, agent, sock):
+        self.agent = agent
+        self.sock = sock
+        self.cond = threading.Condition()
+        self.system = None
+        self.deltas = []
+        self.need_keyframe = True
+        self.closed = False
+        self.encoder = wire.SystemDeltaEncoder()
+        self.sent_frames = 0
+        self.dropped = 0
+        # Número del último estado de procesos enviado (keyframe o delta); solo lo usa el emisor
+        self.sent_seq = -1
+
+    def offer_system(self, data):
+        with self.cond:
+            if self.system is not None: self.dropped += 1
+            self.system = data
+            self.cond.notify()
+
+    def offer_delta(self, seq, payload):
+        # payload: ProcessDelta ya codificado una vez para todos los clientes
+        with self.cond:
+            if len(self.deltas) >= MAX_PENDING_DELTAS:
+                self.dropped += len(self.deltas)
+                self.deltas = []
+                self.need_keyframe = True
+            self.deltas.append((seq, payload))
+            self.cond.notify()
+
+    def request_keyframe(self):
+        with self.cond:
+            self.need_keyframe = True
+            self.cond.notify()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        try: self.sock.shutdown(socket.SHUT_RDWR)
+        except: pass
+
+    def _take(self):
+        with self.cond:
+            while not (self.closed or self.system is not None or self.deltas
+                       or (self.need_keyframe and self.agent.latest is not None)):
+                self.cond.wait()
+            if self.closed: return None
+            system, self.system = self.system, None
+            deltas, self.deltas = self.deltas, []
+            keyframe = self.need_keyframe and self.agent.latest is not None
+            if keyframe: self.need_keyframe = False
+            return system, deltas, keyframe
+
+    def run_sender(self):
+        sock = self.sock
+        try:
+            hello = {'host': socket.gethostname(), 'version': VERSION, 'platform': sys.platform}
+            sock.sendall(wire.MAGIC + wire.frame(wire.HELLO, json.dumps(hello).encode("utf-8")))
+            while True:
+                work = self._take()
+                if work is None: break
+                system, deltas, keyframe = work
+                frames = []
+                if keyframe:
+                    # El keyframe lleva el número del último delta emitido: los encolados con
+                    # número menor o igual ya están incluidos
+                    seq, ts, records = self.agent.latest
+                    frames.append(wire.frame(wire.PROCS, wire.encode_process_delta(wire.keyframe_delta(seq, ts, records))))
+                    self.sent_seq = seq
+                    if system is None: system = self.agent.last_system
+                    if system is not None: frames.append(wire.frame(wire.SYSTEM, self.encoder.encode(system, True)))
+                    system = None
+                if system is not None:
+                    frames.append(wire.frame(wire.SYSTEM, self.encoder.encode(system)))
+                # En cada ronda: un delta ya cubierto por lo enviado (p. ej. encolado justo después
+                # de que el keyframe de la ronda anterior leyera `latest`) se descarta
+                for seq, payload in deltas:
+                    if seq <= self.sent_seq: continue
+                    frames.append(wire.frame(wire.PROCS, payload))
+                    self.sent_seq = seq
+                if frames:
+                    # Un solo sendall por ronda; si el socket se llena, se bloquea solo este hilo
+                    sock.sendall(b"".join(frames))
+                    self.sent_frames += len(frames)
+        except:
+            pass
+        finally:
+            self.agent.remove(self)
+
+    def run_reader(self):
+        reader = wire.FrameReader(self.sock.recv, MAX_CLIENT_FRAME)
+        try:
+            while True:
+                kind, payload = reader.next()
+                if kind == wire.KEYFRAME_REQUEST:
+                    self.request_keyframe()
+                elif kind == wire.VISIBLE:
+                    self.agent.set_visible_pids(json.loads(payload))
+        except:
+            pass
+        finally:
+            self.close()
+
+
+class Agent:
+    # Modo agente: el mismo muestreo que la interfaz (SystemCollector + ProcessCollector con
+    # DeltaEncoder) enviado a N clientes por TCP o socket Unix.
+    def __init__(self, address, interval=1.0, process_interval=2.0, system=None, processes=None):
+        self.address = address
+        self.interval = interval
+        self.process_interval = process_interval
+        self.system = system
+        self.processes = processes if processes is not None else ProcessCollector()
+        self.encoder = DeltaEncoder()
+        self.latest = None
+        self.last_system = None
+        self.clients = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.server = None
+
+    def add(self, sock):
+        client = AgentClient(self, sock)
+        with self.lock: self.clients.append(client)
+        threading.Thread(target=client.run_sender, name="agent-send", daemon=True).start()
+        threading.Thread(target=client.run_reader, name="agent-recv", daemon=True).start()
+        return client
+
+    def remove(self, client):
+        with self.lock:
+            if client in self.clients: self.clients.remove(client)
+        client.close()
+        try: client.sock.close()
+        except: pass
+
+    def set_visible_pids(self, pids):
+        self.processes.set_visible_pids(pids)
+
+    def scan(self, now, dt):
+        snapshot = self.processes.sample()
+        delta = self.encoder.encode(snapshot)
+        payload = wire.encode_process_delta(delta)
+        self.latest = (delta.seq, snapshot.timestamp, snapshot.records)
+        with self.lock: clients = list(self.clients)
+        for c in clients: c.offer_delta(delta.seq, payload)
+
+    def run_collector(self):
+        if self.system is None: self.system = SystemCollector(emit_interval=self.interval)
+        self.system.open()
+        procs = Scheduler()
+        procs.add('processes', self.process_interval, self.scan, delay=0)
+        while not self.stop_event.is_set():
+            procs.run_pending()
+            snap = self.system.tick()
+            if snap is not None:
+                data = snap.as_dict()
+                self.last_system = data
+                with self.lock: clients = list(self.clients)
+                for c in clients: c.offer_system(data)
+            self.stop_event.wait(min(self.system.sleep_ms(), procs.sleep_ms()) / 1000)
+        self.system.close()
+
+    def serve_forever(self):
+        self.server = listen(self.address)
+        threading.Thread(target=self.run_collector, name="collector", daemon=True).start()
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    sock, _ = self.server.accept()
+                except OSError:
+                    break
+                if sock.family != socket.AF_UNIX:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.add(sock)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.stop_event.set()
+        with self.lock: clients = list(self.clients)
+        for c in clients: c.close()
+        if self.server is not None:
+            try: self.server.close()
+            except: pass
+            family, address = parse_endpoint(self.address)
+            if family == socket.AF_UNIX:
+                try: os.unlink(address)
+                except: pass
+
+
+class AgentStream:
+    # Lado cliente (sin Qt): conecta, decodifica las tramas y devuelve ('hello', dict),
+    # ('system', dict) o ('procs', ProcessDelta). Lo que va hacia el agente (PIDs visibles,
+    # petición de keyframe) lo envía un hilo aparte con último valor, sin bloquear a quien llama.
+    def __init__(self, address, timeout=5.0):
+        self.sock = connect(address, timeout)
+        self.reader = wire.FrameReader(self.sock.recv)
+        self.reader.read_magic()
+        self.system = wire.SystemDeltaDecoder()
+        self.cond = threading.Condition()
+        self.visible = None
+        self.keyframe = False
+        self.closed = False
+        threading.Thread(target=self.run_writer, name="agent-stream-send", daemon=True).start()
+
+    def next(self):
+        kind, payload = self.reader.next()
+        if kind == wire.SYSTEM: return 'system', self.system.decode(payload)
+        if kind == wire.PROCS: return 'procs', wire.decode_process_delta(payload)
+        if kind == wire.HELLO: return 'hello', json.loads(payload)
+        return None, payload
+
+    def run_writer(self):
+        try:
+            while True:
+                with self.cond:
+                    while not (self.closed or self.keyframe or self.visible is not None):
+                        self.cond.wait()
+                    if self.closed: break
+                    keyframe, self.keyframe = self.keyframe, False
+                    visible, self.visible = self.visible, None
+                out = b""
+                if keyframe: out += wire.frame(wire.KEYFRAME_REQUEST, b"")
+                if visible is not None: out += wire.frame(wire.VISIBLE, json.dumps(list(visible)).encode("utf-8"))
+                self.sock.sendall(out)
+        except:
+            pass
+
+    def request_keyframe(self):
+        with self.cond:
+            self.keyframe = True
+            self.cond.notify()
+
+    def send_visible(self, pids):
+        with self.cond:
+            self.visible = pids
+            self.cond.notify()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        try: self.sock.shutdown(socket.SHUT_RDWR)
+        except: pass
+        self.sock.close()
+
+
+def serve(address, interval=1.0, process_interval=2.0):
+    agent = Agent(address, interval=interval, process_interval=process_interval)
+    print(f"LeSYS agente escuchando en {address}", file=sys.stderr, flush=True)
+    try:
+        agent.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m collector.agent",
+                                     description="Envía los snapshots de LeSYS a los clientes conectados.")
+    parser.add_argument("address", nargs="?", default=":9185", help="[HOST]:PUERTO o unix:/ruta; sin HOST solo 127.0.0.1")
+    parser.add_argument("-i", "--interval", type=float, default=1.0)
+    parser.add_argument("-p", "--process-interval", type=float, default=2.0)
+    args = parser.parse_args(argv)
+    return serve(args.address, args.interval, args.process_interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
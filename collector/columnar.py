@@ -0,0 +1,193 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .delta import ProcessTable
+from .grouping import COL_KEYS, DEFAULT_LIMIT
+
+COLUMNAR_AVAILABLE = np is not None
+
+
+class ColumnarProcessTable(ProcessTable):
+    # Réplica de ProcessTable con los campos numéricos en arrays NumPy (una ranura por PID)
+    # y el nombre como código entero: la agrupación usa argsort/reduceat y argpartition
+    # para el top-N, y solo los grupos mostrados vuelven a objetos Python.
+    def __init__(self, capacity=1024):
+        super().__init__()
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self.capacity = capacity
+        self.size = 0
+        self.slot_of = {}
+        self.free = []
+        self.objs = [None] * capacity
+        self.pid = np.zeros(capacity, dtype=np.int64)
+        self.cpu = np.zeros(capacity)
+        self.ram = np.zeros(capacity)
+        self.disk = np.zeros(capacity)
+        self.code = np.full(capacity, -1, dtype=np.int32)
+        self.name_code = {}
+        self.names = []
+
+    def _grow(self):
+        extra = self.capacity
+        self.objs.extend([None] * extra)
+        self.pid = np.concatenate([self.pid, np.zeros(extra, dtype=np.int64)])
+        self.cpu = np.concatenate([self.cpu, np.zeros(extra)])
+        self.ram = np.concatenate([self.ram, np.zeros(extra)])
+        self.disk = np.concatenate([self.disk, np.zeros(extra)])
+        self.code = np.concatenate([self.code, np.full(extra, -1, dtype=np.int32)])
+        self.capacity += extra
+
+    def _code_for(self, name):
+        code = self.name_code.get(name)
+        if code is None:
+            code = len(self.names)
+            self.name_code[name] = code
+            self.names.append(name)
+        return code
+
+    def _insert(self, r):
+        if self.free:
+            slot = self.free.pop()
+        else:
+            if self.size == self.capacity: self._grow()
+            slot = self.size
+            self.size += 1
+        self.slot_of[r.pid] = slot
+        self.objs[slot] = r
+        self.pid[slot] = r.pid
+        self.cpu[slot] = r.cpu
+        self.ram[slot] = r.ram
+        self.disk[slot] = r.disk
+        self.code[slot] = self._code_for(r.name)
+
+    def _remove(self, pid):
+        slot = self.slot_of.pop(pid, None)
+        if slot is None: return
+        self.objs[slot] = None
+        self.code[slot] = -1
+        self.free.append(slot)
+
+    def _compact_names(self):
+        live = self.code[:self.size]
+        used = np.unique(live[live >= 0])
+        remap = np.full(len(self.names), -1, dtype=np.int32)
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        self.names = [self.names[c] for c in used]
+        self.name_code = {n: i for i, n in enumerate(self.names)}
+        mask = live >= 0
+        live[mask] = remap[live[mask]]
+
+    def apply(self, delta):
+        if delta.keyframe:
+            self._alloc(max(self.capacity, len(delta.added)))
+            self._clear()
+        elif self.seq >= 0 and delta.seq - delta.span != self.seq:
+            return False
+        self.seq = delta.seq
+
+        for pid in delta.removed:
+            self._drop(pid)
+            self._remove(pid)
+        for r in delta.added:
+            if r.pid in self.slot_of: self._remove(r.pid)
+            self._put(r)
+            self._insert(r)
+
+        n = len(delta.changed_pids)
+        if n:
+            slot_of = self.slot_of
+            slots = np.fromiter((slot_of.get(p, -1) for p in delta.changed_pids), dtype=np.int64, count=n)
+            values = np.frombuffer(delta.changed, dtype=np.float64).reshape(n, 3)
+            ok = slots >= 0
+            slots = slots[ok]
+            values = values[ok]
+            self.cpu[slots] = values[:, 0]
+            self.ram[slots] = values[:, 1]
+            self.disk[slots] = values[:, 2]
+            objs = self.objs
+            touched = self.touched
+            for slot, (cpu, ram, disk) in zip(slots.tolist(), values.tolist()):
+                r = objs[slot]
+                r.cpu = cpu
+                r.ram = ram
+                r.disk = disk
+                if touched is not None: touched.add(r.name)
+
+        if len(self.names) > 1024 and len(self.names) > 2 * len(self.records): self._compact_names()
+        return True
+
+    def reset(self, records):
+        self._alloc(max(self.capacity, len(records)))
+        self._clear()
+        self.seq = -1
+        for r in records:
+            self._put(r)
+            self._insert(r)
+
+    def group_by_name(self, sort_col=-1, sort_state_name=0, sort_asc=False, limit=DEFAULT_LIMIT, only=None):
+        size = self.size
+        codes_all = self.code[:size]
+        if only is None:
+            live = np.flatnonzero(codes_all >= 0)
+        else:
+            slot_of = self.slot_of
+            live = np.sort(np.fromiter((slot_of[p] for p in only if p in slot_of), dtype=np.int64))
+        if not len(live): return []
+
+        # Dos argsort estables (valor y luego código) dejan cada grupo contiguo con sus hijos ordenados
+        child_key = 'ram' if sort_col == -1 else COL_KEYS.get(sort_col, 'ram')
+        if sort_col == 0:
+            order = live[np.argsort(codes_all[live], kind='stable')]
+        else:
+            child_values = getattr(self, child_key)[live]
+            if sort_col == -1 or not sort_asc: child_values = -child_values
+            by_value = live[np.argsort(child_values, kind='stable')]
+            order = by_value[np.argsort(codes_all[by_value], kind='stable')]
+        sorted_codes = codes_all[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1])))
+        counts = np.diff(np.append(starts, len(order)))
+        g_codes = sorted_codes[starts]
+        columns = {
+            'cpu': np.add.reduceat(self.cpu[order], starts),
+            'ram': np.add.reduceat(self.ram[order], starts),
+            'disk': np.add.reduceat(self.disk[order], starts),
+            'pid': np.minimum.reduceat(self.pid[order], starts),
+        }
+        n_groups = len(starts)
+        names = self.names
+
+        if sort_col == 0 and sort_state_name != 0:
+            lowered = [names[c].lower() for c in g_codes.tolist()]
+            selected = sorted(range(n_groups), key=lowered.__getitem__, reverse=(sort_state_name == 2))
+        else:
+            key = 'ram' if sort_col in (-1, 0) else COL_KEYS[sort_col]
+            descending = sort_col in (-1, 0) or not sort_asc
+            values = -columns[key] if descending else columns[key]
+            if limit is not None and limit < n_groups:
+                top = np.argpartition(values, limit - 1)[:limit]
+                selected = top[np.argsort(values[top], kind='stable')].tolist()
+            else:
+                selected = np.argsort(values, kind='stable').tolist()
+
+        objs = self.objs
+        pids = self.pid
+        parent_items_data = []
+        for g in selected:
+            s = starts[g]
+            members = order[s:s + counts[g]]
+            member_list = members.tolist()
+            children = [objs[i] for i in member_list]
+            parent_items_data.append({
+                'name': names[g_codes[g]], 'pid': int(columns['pid'][g]), 'all_pids': pids[members].tolist(),
+                'cpu': float(columns['cpu'][g]), 'ram': float(columns['ram'][g]), 'disk': float(columns['disk'][g]),
+                'exe': objs[member_list[int(np.argmin(pids[members]))]].exe, 'count': len(children), 'children': children
+            })
+        return parent_items_data
+
+
+def make_process_table():
+    return ColumnarProcessTable() if COLUMNAR_AVAILABLE else ProcessTable()
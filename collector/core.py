@@ -0,0 +1,124 @@
+import abc
+import time
+
+from .snapshot import SystemSnapshot, ProcessSnapshot
+from .sources import default_sources
+from .scheduler import Scheduler
+from .processes import PsutilProcessBackend
+from .procfs import ProcfsProcessBackend, procfs_available
+
+
+class Collector(abc.ABC):
+    def open(self):
+        pass
+
+    @abc.abstractmethod
+    def sample(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+FULL_RATE = ('emit', 'cpu', 'ram', 'net')
+
+
+class SystemCollector(Collector):
+    # Cada fuente se muestrea con su propio intervalo (Source.interval o `intervals`) sobre un
+    # snapshot persistente; tick() devuelve una copia cada emit_interval segundos.
+    def __init__(self, sources=None, intervals=None, emit_interval=1.0, sensors=None, first_delay=None):
+        self.sources = sources if sources is not None else default_sources(sensors)
+        self.intervals = intervals or {}
+        self.emit_interval = emit_interval
+        # Retraso del primer snapshot (arranque): por defecto un emit_interval completo
+        self.first_delay = emit_interval if first_delay is None else first_delay
+        self.snap = SystemSnapshot()
+        self.scheduler = None
+        self.emitted = None
+        self.slowdown = 1
+
+    def interval_for(self, source):
+        return self.intervals.get(source.name, source.interval)
+
+    def open(self):
+        for s in self.sources:
+            try:
+                s.open()
+            except:
+                pass
+        self.scheduler = Scheduler()
+        for s in self.sources:
+            interval = self.interval_for(s)
+            # Las fuentes lentas también dan su primer valor en el primer tick
+            self.scheduler.add(s.name, interval, self._runner(s), delay=min(interval, self.first_delay))
+        self.scheduler.add('emit', self.emit_interval, self._emit, delay=self.first_delay)
+        if self.slowdown != 1: self.set_slowdown(self.slowdown)
+
+    def set_slowdown(self, factor):
+        # Ventana oculta: discos y sensores cada `factor` intervalos; CPU, RAM y red (y la emisión)
+        # siguen a su ritmo para que el historial no tenga huecos
+        self.slowdown = factor
+        if self.scheduler is not None: self.scheduler.stretch(factor, FULL_RATE)
+
+    def _runner(self, source):
+        snap = self.snap
+        return lambda now, dt: source.sample(snap, dt)
+
+    def _emit(self, now, dt):
+        self.snap.timestamp = time.time()
+        self.emitted = self.snap.copy()
+
+    def tick(self):
+        # Ejecuta lo que haya vencido; devuelve un SystemSnapshot si tocaba emitir, si no None
+        if self.scheduler is None: self.open()
+        self.emitted = None
+        self.scheduler.run_pending()
+        return self.emitted
+
+    def sleep_ms(self):
+        return self.scheduler.sleep_ms() if self.scheduler is not None else 0
+
+    def stats(self):
+        # Por fuente: ejecuciones, plazos perdidos y coste (ms)
+        return self.scheduler.stats() if self.scheduler is not None else {}
+
+    def sample(self):
+        # Muestreo inmediato de todas las fuentes (uso puntual, p. ej. python -m collector)
+        if self.scheduler is None: self.open()
+        now = time.monotonic()
+        for job in self.scheduler.jobs:
+            if job.name != 'emit': job.next = now
+        self.scheduler.run_pending(now)
+        self.snap.timestamp = time.time()
+        return self.snap.copy()
+
+    def close(self):
+        for s in self.sources:
+            try:
+                s.close()
+            except:
+                pass
+
+
+def default_process_backend():
+    if procfs_available(): return ProcfsProcessBackend()
+    return PsutilProcessBackend()
+
+
+class ProcessCollector(Collector):
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else default_process_backend()
+
+    def set_visible_pids(self, pids):
+        memory = getattr(self.backend, 'memory', None)
+        if memory is not None: memory.set_visible(pids)
+
+    def sample(self):
+        return ProcessSnapshot(timestamp=time.time(), records=self.backend.scan())
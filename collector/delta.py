@@ -0,0 +1,194 @@
+from array import array
+from dataclasses import replace
+
+from .grouping import group_by_name, DEFAULT_LIMIT
+from .search import ProcessIndex
+
+
+class ProcessDelta:
+    # Cambios entre dos escaneos: altas (registros completos), bajas (PIDs) y, para los
+    # PIDs que siguen vivos, solo cpu/ram/disk en arrays planos [cpu, ram, disk] * n.
+    # span: números de secuencia que cubre (más de 1 tras merge); se aplica sobre seq - span.
+    __slots__ = ('seq', 'timestamp', 'keyframe', 'added', 'removed', 'changed_pids', 'changed', 'span')
+
+    def __init__(self, seq=0, timestamp=0.0, keyframe=False, span=1):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.keyframe = keyframe
+        self.span = span
+        self.added = []
+        self.removed = array('q')
+        self.changed_pids = array('q')
+        self.changed = array('d')
+
+    def is_empty(self):
+        return not (self.keyframe or self.added or self.removed or self.changed_pids)
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.changed_pids)
+
+    def merge(self, newer):
+        # Un solo delta equivalente a aplicar self y después newer (buzón de la interfaz: si el
+        # consumidor va atrasado, los deltas se funden en vez de descartarse). Si no son
+        # consecutivos se devuelve newer y la réplica pedirá un keyframe al ver el hueco.
+        if newer.keyframe or newer.seq - newer.span != self.seq: return newer
+        out = ProcessDelta(newer.seq, newer.timestamp, self.keyframe, self.span + newer.span)
+        added = {r.pid: r for r in self.added}
+        removed = dict.fromkeys(self.removed)
+        changed = {}
+        values = self.changed
+        for i, pid in enumerate(self.changed_pids):
+            changed[pid] = (values[i * 3], values[i * 3 + 1], values[i * 3 + 2])
+
+        for pid in newer.removed:
+            changed.pop(pid, None)
+            # Alta en older y baja en newer: se anulan (salvo PID reutilizado, ya en removed)
+            if added.pop(pid, None) is None: removed[pid] = None
+        for r in newer.added:
+            added[r.pid] = r
+            changed.pop(r.pid, None)
+        values = newer.changed
+        for i, pid in enumerate(newer.changed_pids):
+            j = i * 3
+            r = added.get(pid)
+            if r is not None:
+                # Alta pendiente: el registro sale ya con los valores nuevos (copia, el original
+                # puede estar en otra réplica)
+                added[pid] = replace(r, cpu=values[j], ram=values[j + 1], disk=values[j + 2])
+            else:
+                changed[pid] = (values[j], values[j + 1], values[j + 2])
+
+        out.added = list(added.values())
+        out.removed = array('q', removed)
+        out.changed_pids = array('q', changed)
+        flat = out.changed
+        for v in changed.values(): flat.extend(v)
+        return out
+
+
+class DeltaEncoder:
+    # Lado productor: recuerda lo último enviado y genera ProcessDelta
+    def __init__(self):
+        self.sent = {}
+        self.seq = 0
+        self.force_keyframe = True
+
+    def request_keyframe(self):
+        self.force_keyframe = True
+
+    def encode(self, snapshot):
+        keyframe = self.force_keyframe
+        self.force_keyframe = False
+        delta = ProcessDelta(self.seq, snapshot.timestamp, keyframe)
+        self.seq += 1
+
+        prev = {} if keyframe else self.sent
+        sent = {}
+        added = delta.added
+        changed_pids = delta.changed_pids
+        changed = delta.changed
+        for r in snapshot.records:
+            pid = r.pid
+            state = (r.start, r.name, r.exe, r.cpu, r.ram, r.disk, r.ppid)
+            sent[pid] = state
+            old = prev.get(pid)
+            if old is None:
+                added.append(r)
+            elif old[0] != r.start or old[1] != r.name or old[2] != r.exe or old[6] != r.ppid:
+                # PID reutilizado, exec() o huérfano adoptado por otro padre: baja + alta en el mismo delta
+                delta.removed.append(pid)
+                added.append(r)
+            elif old[3] != r.cpu or old[4] != r.ram or old[5] != r.disk:
+                changed_pids.append(pid)
+                changed.append(r.cpu)
+                changed.append(r.ram)
+                changed.append(r.disk)
+        if not keyframe:
+            for pid in prev:
+                if pid not in sent: delta.removed.append(pid)
+        self.sent = sent
+        return delta
+
+
+class ProcessTable:
+    # Lado consumidor: réplica del estado a partir de los deltas, con índice de búsqueda.
+    # members: PIDs por nombre; touched: nombres que han cambiado desde el último take_touched()
+    # (None tras un keyframe o reset: hay que reagrupar todo)
+    def __init__(self):
+        self.records = {}
+        self.seq = -1
+        self.index = ProcessIndex()
+        self.members = {}
+        self.touched = None
+
+    def _put(self, r):
+        if r.pid in self.records: self._drop(r.pid)
+        self.records[r.pid] = r
+        self.index.add(r)
+        pids = self.members.get(r.name)
+        if pids is None: self.members[r.name] = pids = set()
+        pids.add(r.pid)
+        if self.touched is not None: self.touched.add(r.name)
+
+    def _drop(self, pid):
+        r = self.records.pop(pid, None)
+        if r is None: return
+        self.index.remove(pid)
+        pids = self.members[r.name]
+        pids.discard(pid)
+        if not pids: del self.members[r.name]
+        if self.touched is not None: self.touched.add(r.name)
+
+    def _clear(self):
+        self.records = {}
+        self.members = {}
+        self.touched = None
+        self.index.clear()
+
+    def take_touched(self):
+        touched = self.touched
+        self.touched = set()
+        return touched
+
+    def apply(self, delta):
+        if delta.keyframe:
+            self._clear()
+        elif self.seq >= 0 and delta.seq - delta.span != self.seq:
+            return False
+        self.seq = delta.seq
+
+        for pid in delta.removed: self._drop(pid)
+        for r in delta.added: self._put(r)
+        records = self.records
+        touched = self.touched
+        values = delta.changed
+        for i, pid in enumerate(delta.changed_pids):
+            r = records.get(pid)
+            if r is None: continue
+            j = i * 3
+            r.cpu = values[j]
+            r.ram = values[j + 1]
+            r.disk = values[j + 2]
+            if touched is not None: touched.add(r.name)
+        return True
+
+    def reset(self, records):
+        self._clear()
+        self.seq = -1
+        for r in records: self._put(r)
+
+    def values(self):
+        return self.records.values()
+
+    def search(self, query):
+        return self.index.match(query)
+
+    def group_by_name(self, sort_col=-1, sort_state_name=0, sort_asc=False, limit=DEFAULT_LIMIT, only=None):
+        # only: PIDs a incluir (resultado de search); None, todos
+        records = self.records
+        if only is not None: records = {pid: records[pid] for pid in only if pid in records}
+        return group_by_name(records.values(), sort_col, sort_state_name, sort_asc, limit)
+
+    def __len__(self):
+        return len(self.records)
+
@@ -0,0 +1,207 @@
+import queue
+import select
+import sys
+import threading
+import time
+
+import psutil
+
+MOUNTINFO = "/proc/self/mountinfo"
+
+
+class MountWatcher:
+    # changed() es True la primera vez y cada vez que cambia la tabla de montajes.
+    # Linux: /proc/self/mountinfo marca POLLPRI/POLLERR al montar o desmontar.
+    # Windows: máscara de GetLogicalDrives. Resto: cada fallback_interval segundos.
+    def __init__(self, path=MOUNTINFO, fallback_interval=60.0):
+        self.fallback_interval = fallback_interval
+        self.first = True
+        self.poller = None
+        self.f = None
+        self.drives = None
+        self.last_check = 0.0
+        try:
+            self.f = open(path, "rb")
+            self.f.read()
+            self.poller = select.poll()
+            self.poller.register(self.f.fileno(), select.POLLPRI | select.POLLERR)
+        except:
+            self.close()
+
+    def changed(self):
+        if self.first:
+            self.first = False
+            return True
+        if self.poller is not None:
+            try:
+                if not self.poller.poll(0): return False
+                # Releer rearma la notificación
+                self.f.seek(0)
+                self.f.read()
+                return True
+            except:
+                return False
+        if sys.platform == "win32":
+            try:
+                import ctypes
+                drives = ctypes.windll.kernel32.GetLogicalDrives()
+                changed = drives != self.drives
+                self.drives = drives
+                return changed
+            except:
+                pass
+        now = time.monotonic()
+        if now - self.last_check >= self.fallback_interval:
+            self.last_check = now
+            return True
+        return False
+
+    def close(self):
+        if self.f is not None:
+            try: self.f.close()
+            except: pass
+        self.f = None
+        self.poller = None
+
+
+class MountState:
+    __slots__ = ('device', 'mountpoint', 'percent', 'updated', 'checked', 'pending', 'submitted', 'unresponsive')
+
+    def __init__(self, device, mountpoint):
+        self.device = device
+        self.mountpoint = mountpoint
+        self.percent = None
+        self.updated = None
+        self.checked = None
+        self.pending = False
+        self.submitted = None
+        self.unresponsive = False
+
+
+def list_mounts():
+    # (dispositivo, punto de montaje) de las particiones con sistema de archivos, sin CD-ROM
+    mounts = []
+    for p in psutil.disk_partitions(all=False):
+        if 'cdrom' in p.opts or p.fstype == '': continue
+        mounts.append((p.device.rstrip("\\"), p.mountpoint))
+    return mounts
+
+
+class DiskProbe:
+    # disk_usage se ejecuta en `workers` hilos daemon y la enumeración de particiones en uno
+    # propio: un montaje NFS/SMB/FUSE colgado bloquea uno de esos hilos, nunca al que llama a
+    # poll() ni a la lista de montajes. Cada punto de montaje tiene como mucho una consulta en
+    # curso (aunque su estado se recree al volver a listar); si no responde en `timeout`
+    # segundos desde que se encargó, esté ya en marcha o todavía en cola detrás de otro
+    # colgado, se marca sin respuesta y se sigue sirviendo el último valor con su antigüedad.
+    def __init__(self, workers=3, timeout=2.0, refresh_interval=30.0, watcher=None,
+                 lister=list_mounts, usage=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.refresh_interval = refresh_interval
+        self.watcher = watcher if watcher is not None else MountWatcher()
+        self.lister = lister
+        self.usage = usage if usage is not None else (lambda path: psutil.disk_usage(path).percent)
+        self.mounts = {}
+        # punto de montaje -> momento en que se encargó su consulta en curso
+        self.inflight = {}
+        self.tasks = queue.Queue()
+        self.lists = queue.Queue()
+        self.results = queue.Queue()
+        self.threads = []
+        self.listing = False
+        self.closed = False
+
+    def _start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"disk-probe-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+        t = threading.Thread(target=self._list, name="disk-probe-list", daemon=True)
+        t.start()
+        self.threads.append(t)
+
+    def _work(self):
+        while True:
+            mountpoint = self.tasks.get()
+            if mountpoint is None: return
+            try: value = self.usage(mountpoint)
+            except: value = None
+            self.results.put(('usage', mountpoint, value))
+
+    def _list(self):
+        while self.lists.get() is not None:
+            try: self.results.put(('list', None, self.lister()))
+            except: self.results.put(('list', None, None))
+
+    def _submit(self, state, now):
+        state.pending = True
+        submitted = self.inflight.get(state.mountpoint)
+        if submitted is None:
+            submitted = self.inflight[state.mountpoint] = now
+            self.tasks.put(state.mountpoint)
+        state.submitted = submitted
+
+    def _set_mounts(self, mounts, now):
+        old = self.mounts
+        self.mounts = {}
+        for device, mountpoint in mounts:
+            state = old.get(device)
+            if state is None or state.mountpoint != mountpoint:
+                state = MountState(device, mountpoint)
+            self.mounts[device] = state
+            if not state.pending: self._submit(state, now)
+
+    def poll(self):
+        # Sin bloqueo: devuelve ({dispositivo: %}, {dispositivo: segundos sin datos frescos})
+        if self.closed: return {}, {}
+        if not self.threads: self._start()
+        if not self.listing and self.watcher.changed():
+            self.listing = True
+            self.lists.put(True)
+
+        now = time.monotonic()
+        while True:
+            try: kind, mountpoint, value = self.results.get_nowait()
+            except queue.Empty: break
+            if kind == 'list':
+                self.listing = False
+                if value is not None: self._set_mounts(value, now)
+                continue
+            self.inflight.pop(mountpoint, None)
+            for state in self.mounts.values():
+                if state.mountpoint != mountpoint: continue
+                state.pending = False
+                state.unresponsive = False
+                state.checked = now
+                if value is not None:
+                    state.percent = value
+                    state.updated = now
+
+        usage = {}
+        stale = {}
+        for device, state in self.mounts.items():
+            if state.pending:
+                if now - state.submitted > self.timeout: state.unresponsive = True
+            elif state.checked is None or now - state.checked >= self.refresh_interval:
+                self._submit(state, now)
+            if state.percent is not None: usage[device] = state.percent
+            if state.unresponsive:
+                stale[device] = now - state.updated if state.updated is not None else -1.0
+        return usage, stale
+
+    def prime(self, timeout=0.2):
+        # Arranque: espera como mucho `timeout` a la lista de montajes y a su primera consulta
+        deadline = time.monotonic() + timeout
+        while True:
+            self.poll()
+            if self.mounts and not self.listing and not any(m.pending for m in self.mounts.values()): return
+            if time.monotonic() >= deadline: return
+            time.sleep(0.005)
+
+    def close(self):
+        self.closed = True
+        for _ in range(self.workers): self.tasks.put(None)
+        self.lists.put(None)
+        self.threads = []
+        self.watcher.close()
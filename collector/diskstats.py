@@ -0,0 +1,140 @@
+import os
+
+from .sources import Source
+from .diskprobe import MountWatcher
+
+SECTOR = 512
+
+
+def diskstats_available(proc_root="/proc"):
+    return os.path.exists(os.path.join(proc_root, "diskstats"))
+
+
+def backing_devices(name, sys_root="/sys"):
+    # Discos físicos bajo un dispositivo del kernel: dm/md por slaves/, particiones por su padre
+    base = os.path.join(sys_root, "class", "block", name)
+    try:
+        slaves = os.listdir(os.path.join(base, "slaves"))
+    except:
+        slaves = []
+    if slaves:
+        out = []
+        for s in sorted(slaves):
+            for d in backing_devices(s, sys_root):
+                if d not in out: out.append(d)
+        return out
+    if os.path.exists(os.path.join(base, "partition")):
+        try:
+            return [os.path.basename(os.path.dirname(os.path.realpath(base)))]
+        except:
+            pass
+    return [name]
+
+
+class DiskStatsSource(Source):
+    # E/S por disco en Linux con una sola lectura de /proc/diskstats por tick. Las claves de
+    # disk_io son los dispositivos de montaje (como en disk_usage) y se resuelven al nombre del
+    # kernel por major:minor de /proc/self/mountinfo, así que /dev/mapper/vg-root lee dm-0 y
+    # /dev/md0 lee md0. La tabla de montajes solo se relee cuando cambia.
+    name = "disk_io"
+
+    def __init__(self, proc_root="/proc", sys_root="/sys", buffer_size=16384, watcher=None):
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+        self.path = os.path.join(proc_root, "diskstats")
+        self.buf = bytearray(buffer_size)
+        self.watcher = watcher
+        self.mounts = {}
+        self.backing = {}
+        self.prev = {}
+
+    def _read(self):
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            n = os.readv(fd, [self.buf])
+            while n == len(self.buf):
+                # El fichero no cabía: se duplica el búfer y se relee desde el principio
+                self.buf = bytearray(2 * len(self.buf))
+                os.lseek(fd, 0, os.SEEK_SET)
+                n = os.readv(fd, [self.buf])
+        finally:
+            os.close(fd)
+        return bytes(memoryview(self.buf)[:n])
+
+    def read_stats(self):
+        # {nombre: (major, minor, lecturas, sectores leídos, ms leyendo, escrituras,
+        #           sectores escritos, ms escribiendo, ms con E/S)}
+        stats = {}
+        for line in self._read().split(b"\n"):
+            f = line.split()
+            if len(f) < 14: continue
+            stats[f[2].decode()] = (int(f[0]), int(f[1]), int(f[3]), int(f[5]), int(f[6]),
+                                    int(f[7]), int(f[9]), int(f[10]), int(f[12]))
+        return stats
+
+    def refresh_mounts(self, stats):
+        by_devno = {(s[0], s[1]): name for name, s in stats.items()}
+        mounts = {}
+        try:
+            with open(os.path.join(self.proc_root, "self", "mountinfo"), "rb") as f:
+                lines = f.read().decode(errors="replace").splitlines()
+        except:
+            lines = []
+        for line in lines:
+            head, _, tail = line.partition(" - ")
+            fields = head.split()
+            rest = tail.split()
+            if len(fields) < 5 or len(rest) < 2: continue
+            source = rest[1]
+            if not source.startswith("/dev/") or source in mounts: continue
+            try:
+                major, minor = fields[2].split(":")
+                name = by_devno.get((int(major), int(minor)))
+            except:
+                name = None
+            if name is None:
+                # btrfs y similares usan un major:minor anónimo: se sigue el enlace del dispositivo
+                name = os.path.basename(os.path.realpath(source))
+                if name not in stats: continue
+            mounts[source] = name
+        self.mounts = mounts
+        self.backing = {name: backing_devices(name, self.sys_root) for name in set(mounts.values())}
+
+    def open(self):
+        if self.watcher is None: self.watcher = MountWatcher(os.path.join(self.proc_root, "self", "mountinfo"))
+        try:
+            self.prev = self.read_stats()
+        except:
+            self.prev = {}
+
+    def sample(self, snap, dt):
+        stats = self.read_stats()
+        if self.watcher is None: self.open()
+        if self.watcher.changed(): self.refresh_mounts(stats)
+        prev = self.prev
+        self.prev = stats
+        disk_io = {}
+        disk_detail = {}
+        mb = SECTOR / (1024 ** 2)
+        for source, name in self.mounts.items():
+            cur = stats.get(name)
+            old = prev.get(name)
+            if cur is None: continue
+            if old is None: old = cur
+            reads = max(cur[2] - old[2], 0)
+            writes = max(cur[5] - old[5], 0)
+            read_mb = max(cur[3] - old[3], 0) * mb / dt
+            write_mb = max(cur[6] - old[6], 0) * mb / dt
+            read_lat = max(cur[4] - old[4], 0) / reads if reads else 0.0
+            write_lat = max(cur[7] - old[7], 0) / writes if writes else 0.0
+            util = min(max(cur[8] - old[8], 0) / (dt * 10.0), 100.0)
+            disk_io[source] = (read_mb, write_mb)
+            # (IOPS lectura, IOPS escritura, latencia media lectura/escritura en ms, % ocupado,
+            #  dispositivo del kernel, discos físicos debajo)
+            disk_detail[source] = (reads / dt, writes / dt, read_lat, write_lat, util, name,
+                                   tuple(self.backing.get(name, (name,))))
+        snap.disk_io = disk_io
+        snap.disk_detail = disk_detail
+
+    def close(self):
+        if self.watcher is not None: self.watcher.close()
@@ -0,0 +1,241 @@
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from .core import SystemCollector, ProcessCollector
+from .scheduler import Scheduler
+
+MB = 1024 ** 2
+TEXT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+DEFAULT_TOP = 20
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsWriter:
+    # Acumula familias en formato de exposición de Prometheus (compatible con OpenMetrics)
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, kind, help_text, samples):
+        # samples: [(labels dict o None, valor)]
+        lines = self.lines
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            if labels:
+                body = ",".join(f'{k}="{escape(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{body}}} {float(value)!r}")
+            else:
+                lines.append(f"{name} {float(value)!r}")
+
+    def render(self, openmetrics=False):
+        text = "\n".join(self.lines) + "\n"
+        if openmetrics: text += "# EOF\n"
+        return text.encode("utf-8")
+
+
+def top_process_groups(records, top=DEFAULT_TOP):
+    # Agrupa por nombre como la tabla de la interfaz y limita la cardinalidad: los `top` grupos
+    # con más RAM más los `top` con más CPU; el resto se suma en name="other"
+    groups = {}
+    for r in records:
+        g = groups.get(r.name)
+        if g is None: groups[r.name] = g = [0.0, 0, 0.0, 0]
+        g[0] += r.cpu
+        g[1] += r.ram
+        g[2] += r.disk
+        g[3] += 1
+    keep = set(sorted(groups, key=lambda n: groups[n][1], reverse=True)[:top])
+    keep.update(sorted(groups, key=lambda n: groups[n][0], reverse=True)[:top])
+    out = {}
+    other = [0.0, 0, 0.0, 0]
+    for name, g in groups.items():
+        if name in keep:
+            out[name] = g
+        else:
+            for i in range(4): other[i] += g[i]
+    if other[3]: out["other"] = other
+    return out
+
+
+def render_metrics(data, records=None, stats=None, top=DEFAULT_TOP):
+    # data: SystemSnapshot.as_dict(); records: ProcessRecord; stats: SystemCollector.stats()
+    w = MetricsWriter()
+    w.family("lesys_cpu_percent", "gauge", "Uso total de CPU.", [(None, data.get('cpu', 0.0))])
+    w.family("lesys_memory_percent", "gauge", "Uso de memoria RAM.", [(None, data.get('ram', 0.0))])
+    w.family("lesys_gpu_percent", "gauge", "Uso de GPU.", [(None, data.get('gpu', 0.0))])
+
+    nics = data.get('net_nics', {})
+    w.family("lesys_network_receive_bytes_per_second", "gauge", "Bajada por interfaz.",
+             [({'interface': n}, down * MB) for n, (up, down) in nics.items()])
+    w.family("lesys_network_transmit_bytes_per_second", "gauge", "Subida por interfaz.",
+             [({'interface': n}, up * MB) for n, (up, down) in nics.items()])
+
+    w.family("lesys_disk_usage_percent", "gauge", "Ocupación del sistema de archivos.",
+             [({'device': d}, pct) for d, pct in data.get('disk_usage', {}).items()])
+    w.family("lesys_disk_unresponsive", "gauge", "Montaje sin respuesta (último valor servido desde caché).",
+             [({'device': d}, 1) for d in data.get('disk_stale', {})])
+    disk_io = data.get('disk_io', {})
+    w.family("lesys_disk_read_bytes_per_second", "gauge", "Lectura por disco.",
+             [({'device': d}, r * MB) for d, (r, wr) in disk_io.items()])
+    w.family("lesys_disk_write_bytes_per_second", "gauge", "Escritura por disco.",
+             [({'device': d}, wr * MB) for d, (r, wr) in disk_io.items()])
+    detail = data.get('disk_detail', {})
+    if detail:
+        w.family("lesys_disk_iops", "gauge", "Operaciones por segundo.",
+                 [s for d, v in detail.items() for s in (({'device': d, 'op': 'read'}, v[0]),
+                                                         ({'device': d, 'op': 'write'}, v[1]))])
+        w.family("lesys_disk_latency_seconds", "gauge", "Latencia media por operación.",
+                 [s for d, v in detail.items() for s in (({'device': d, 'op': 'read'}, v[2] / 1000),
+                                                         ({'device': d, 'op': 'write'}, v[3] / 1000))])
+        w.family("lesys_disk_util_percent", "gauge", "Tiempo con E/S en curso.",
+                 [({'device': d}, v[4]) for d, v in detail.items()])
+    temps = data.get('temps', {})
+    if temps:
+        w.family("lesys_temperature_celsius", "gauge", "Temperatura por sensor.",
+                 [({'sensor': s}, c) for s, c in temps.items()])
+
+    if records is not None:
+        groups = top_process_groups(records, top)
+        w.family("lesys_processes", "gauge", "Procesos en ejecución.", [(None, len(records))])
+        w.family("lesys_process_cpu_percent", "gauge", "CPU por nombre de proceso (top N, resto en other).",
+                 [({'name': n}, g[0]) for n, g in groups.items()])
+        w.family("lesys_process_memory_bytes", "gauge", "Memoria privada por nombre de proceso.",
+                 [({'name': n}, g[1]) for n, g in groups.items()])
+        w.family("lesys_process_disk_bytes_per_second", "gauge", "E/S de disco por nombre de proceso.",
+                 [({'name': n}, g[2] * MB) for n, g in groups.items()])
+        w.family("lesys_process_instances", "gauge", "Instancias por nombre de proceso.",
+                 [({'name': n}, g[3]) for n, g in groups.items()])
+
+    if stats:
+        w.family("lesys_collector_missed_deadlines", "gauge", "Plazos de muestreo perdidos por fuente.",
+                 [({'source': n}, st['missed']) for n, st in stats.items()])
+        w.family("lesys_collector_sample_seconds", "gauge", "Coste de la última muestra por fuente.",
+                 [({'source': n}, st['last_ms'] / 1000) for n, st in stats.items()])
+    return w
+
+
+class MetricsExporter:
+    # Un hilo muestrea en su propio intervalo y deja el texto ya renderizado en `payload`;
+    # cada petición HTTP solo lee esa referencia, así que N scrapers cuestan una recogida.
+    def __init__(self, host="", port=9184, interval=1.0, process_interval=2.0, top=DEFAULT_TOP,
+                 system=None, processes=None):
+        self.address = (host, port)
+        self.interval = interval
+        self.process_interval = process_interval
+        self.top = top
+        self.system = system
+        self.processes = processes if processes is not None else ProcessCollector()
+        self.records = None
+        self.payload = (b"", b"")
+        self.updated = 0.0
+        self.render_seconds = 0.0
+        self.server = None
+        self.stop_event = threading.Event()
+
+    def collect_processes(self, now, dt):
+        self.records = self.processes.sample().records
+
+    def publish(self, data):
+        t0 = time.perf_counter()
+        w = render_metrics(data, self.records, self.system.stats(), self.top)
+        w.family("lesys_exporter_render_seconds", "gauge", "Coste del último renderizado.",
+                 [(None, self.render_seconds)])
+        self.payload = (w.render(False), w.render(True))
+        self.updated = time.time()
+        self.render_seconds = time.perf_counter() - t0
+
+    def run_collector(self):
+        if self.system is None: self.system = SystemCollector(emit_interval=self.interval)
+        self.system.open()
+        procs = Scheduler()
+        procs.add('processes', self.process_interval, self.collect_processes, delay=0)
+        while not self.stop_event.is_set():
+            procs.run_pending()
+            snap = self.system.tick()
+            if snap is not None: self.publish(snap.as_dict())
+            wait = min(self.system.sleep_ms(), procs.sleep_ms()) / 1000
+            self.stop_event.wait(wait)
+        self.system.close()
+
+    def make_handler(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/":
+                    body = b'<html><body><a href="/metrics">/metrics</a></body></html>\n'
+                    ctype = "text/html; charset=utf-8"
+                elif path == "/metrics":
+                    openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                    body = exporter.payload[1 if openmetrics else 0]
+                    ctype = OPENMETRICS_TYPE if openmetrics else TEXT_TYPE
+                    if not body:
+                        self.send_error(503, "sin datos todavía")
+                        return
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        return Handler
+
+    def serve_forever(self):
+        self.server = ThreadingHTTPServer(self.address, self.make_handler())
+        self.server.daemon_threads = True
+        collector = threading.Thread(target=self.run_collector, name="collector", daemon=True)
+        collector.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.stop_event.set()
+            self.server.server_close()
+
+    def shutdown(self):
+        self.stop_event.set()
+        if self.server is not None: self.server.shutdown()
+
+
+def parse_address(text):
+    # ":9184", "9184", "127.0.0.1:9184"
+    host, _, port = text.rpartition(":")
+    return host, int(port)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m collector.exporter",
+                                     description="Exporta las métricas de LeSYS en formato Prometheus/OpenMetrics.")
+    parser.add_argument("address", nargs="?", default=":9184", help="[HOST]:PUERTO")
+    parser.add_argument("-i", "--interval", type=float, default=1.0)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="grupos de procesos exportados por CPU y por RAM")
+    args = parser.parse_args(argv)
+    return serve(args.address, args.interval, args.top)
+
+
+def serve(address, interval=1.0, top=DEFAULT_TOP):
+    host, port = parse_address(address)
+    exporter = MetricsExporter(host, port, interval=interval, top=top)
+    print(f"LeSYS exportando en http://{host or '0.0.0.0'}:{port}/metrics", file=sys.stderr, flush=True)
+    try:
+        exporter.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
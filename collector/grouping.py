@@ -0,0 +1,111 @@
+from operator import attrgetter, itemgetter
+
+COL_KEYS = {0: 'name', 1: 'pid', 2: 'cpu', 3: 'ram', 4: 'disk'}
+DEFAULT_LIMIT = 100
+
+
+def group_by_name(process_list, sort_col=-1, sort_state_name=0, sort_asc=False, limit=DEFAULT_LIMIT):
+    groups = {}
+    for p in process_list:
+        name = p.name
+        if name not in groups: groups[name] = []
+        groups[name].append(p)
+
+    parent_items_data = []
+    for name, children in groups.items():
+        all_pids = [c.pid for c in children]
+        # Icono y ruta del grupo: los del PID más bajo (igual que ColumnarProcessTable)
+        first = min(children, key=attrgetter('pid'))
+        parent_items_data.append({
+            'name': name, 'pid': min(all_pids), 'all_pids': all_pids,
+            'cpu': sum(c.cpu for c in children),
+            'ram': sum(c.ram for c in children),
+            'disk': sum(c.disk for c in children),
+            'exe': first.exe, 'count': len(children), 'children': children
+        })
+
+    key = COL_KEYS.get(sort_col, 'ram')
+    if sort_col == 0:
+        if sort_state_name == 1:
+            parent_items_data.sort(key=lambda x: x['name'].lower())
+        elif sort_state_name == 2:
+            parent_items_data.sort(key=lambda x: x['name'].lower(), reverse=True)
+        else:
+            parent_items_data.sort(key=lambda x: x['ram'], reverse=True)
+    elif sort_col == -1:
+        parent_items_data.sort(key=lambda x: x['ram'], reverse=True)
+    else:
+        parent_items_data.sort(key=lambda x: x[key], reverse=not sort_asc)
+
+    # Ordenar por nombre muestra la lista completa
+    if sort_col != 0 and limit is not None: parent_items_data = parent_items_data[:limit]
+
+    for p_data in parent_items_data:
+        if p_data['count'] < 2: continue
+        if sort_col == 0 and sort_state_name != 0:
+            p_data['children'].sort(key=lambda x: x.name.lower(), reverse=(sort_state_name == 2))
+        else:
+            child_key = 'ram' if sort_col == -1 else key
+            reverse = not sort_asc if sort_col != -1 else True
+            p_data['children'].sort(key=attrgetter(child_key), reverse=reverse)
+
+    return parent_items_data
+
+
+def sort_spec(sort_col=-1, sort_state_name=0, sort_asc=False):
+    # Clave y sentido del orden de grupos (el mismo que group_by_name)
+    if sort_col == 0 and sort_state_name != 0:
+        return (lambda g: g['name'].lower()), sort_state_name == 2
+    key = 'ram' if sort_col in (-1, 0) else COL_KEYS[sort_col]
+    return itemgetter(key), sort_col in (-1, 0) or not sort_asc
+
+
+class GroupView:
+    # Grupos por nombre de la vista agrupada mantenidos con los deltas: tras table.apply solo se
+    # reagrupan los nombres tocados (table.take_touched()) y el orden se recalcula con los
+    # agregados ya hechos, partiendo del anterior. Cambiar orden o filtro lo rehace entero.
+    def __init__(self):
+        self.groups = {}
+        self.order = []
+        self.sort = None
+        self.query = None
+
+    def clear(self):
+        self.groups = {}
+        self.order = []
+        self.sort = None
+        self.query = None
+
+    def refresh(self, table, sort, query):
+        # Devuelve (full, grupos, nombres quitados): full=True, grupos es la vista entera en orden;
+        # si no, solo los grupos que han cambiado
+        touched = table.take_touched()
+        only = table.search(query)
+        if touched is None or sort != self.sort or query != self.query:
+            groups = table.group_by_name(*sort, limit=None, only=only)
+            self.groups = {g['name']: g for g in groups}
+            self.order = [g['name'] for g in groups]
+            self.sort = sort
+            self.query = query
+            return True, groups, []
+        if not touched: return False, [], []
+
+        members = table.members
+        pids = [p for name in touched for p in members.get(name, ())]
+        if only is not None: pids = [p for p in pids if p in only]
+        changed = table.group_by_name(*sort, limit=None, only=pids) if pids else []
+        groups = self.groups
+        fresh = {g['name'] for g in changed}
+        removed = [name for name in touched if name in groups and name not in fresh]
+        for name in removed: del groups[name]
+        order = self.order
+        if removed:
+            gone = set(removed)
+            order = [name for name in order if name not in gone]
+        for g in changed:
+            if g['name'] not in groups: order.append(g['name'])
+            groups[g['name']] = g
+        key, reverse = sort_spec(*sort)
+        order.sort(key=lambda name: key(groups[name]), reverse=reverse)
+        self.order = order
+        return False, changed, removed
@@ -0,0 +1,182 @@
+class ProcessHierarchy:
+    # Árbol padre/hijo por PPID sobre la réplica de ProcessTable, mantenido con cada delta (altas,
+    # bajas y cambios) en lugar de reconstruirse. Un proceso cuelga de su padre si este existe
+    # y no es más nuevo que él (un PID reutilizado no adopta hijos ajenos); si no, es raíz (0) y
+    # queda esperando por si el padre aparece después. Cuando un padre termina, sus hijos pasan
+    # a la raíz. totals[pid] = [cpu, ram, disk] del subárbol: se recalculan solo los ancestros
+    # de lo que ha cambiado, de abajo arriba.
+    def __init__(self):
+        self.records = {}
+        self.parent = {}
+        self.children = {0: set()}
+        self.totals = {}
+        # PPID de cada registro (el registro ya no está en la réplica cuando llega su baja)
+        self.ppid = {}
+        # ppid ausente -> PIDs que lo esperan
+        self.waiting = {}
+        self.dirty = set()
+
+    def rebuild(self, records):
+        # El PID 0 es la raíz virtual (en Windows, System Idle Process, que no se lista)
+        self.records = records
+        self.parent = {}
+        self.children = {0: set()}
+        self.ppid = {}
+        self.waiting = {}
+        self.dirty = set()
+        pids = [pid for pid in records if pid > 0]
+        for pid in pids: self.children[pid] = set()
+        for pid in pids: self._attach(pid)
+        self.totals = {pid: [0.0, 0.0, 0.0] for pid in pids}
+        for pid in self._postorder(0):
+            r = records[pid]
+            t = self.totals[pid]
+            t[0] = r.cpu
+            t[1] = r.ram
+            t[2] = r.disk
+            for c in self.children[pid]:
+                ct = self.totals[c]
+                t[0] += ct[0]
+                t[1] += ct[1]
+                t[2] += ct[2]
+
+    def apply(self, delta, records):
+        # Después de ProcessTable.apply(delta), con su dict de registros
+        if delta.keyframe or records is not self.records:
+            self.rebuild(records)
+            return
+        for pid in delta.removed: self._remove(pid)
+        added = [r.pid for r in delta.added if r.pid > 0 and r.pid in records]
+        for pid in added:
+            if pid in self.parent: self._remove(pid)
+            self.children[pid] = set()
+            self.totals[pid] = [0.0, 0.0, 0.0]
+        for pid in added:
+            self._attach(pid)
+            self._adopt(pid)
+            self._touch(pid)
+        for pid in delta.changed_pids:
+            if pid in self.parent: self._touch(pid)
+        self._recompute()
+
+    def _valid_parent(self, pid, ppid):
+        records = self.records
+        if ppid == pid or ppid not in records: return False
+        a = records[ppid].start
+        b = records[pid].start
+        if a and b and a > b: return False
+        # Sin ciclos (PPID corruptos o reutilizados)
+        p = ppid
+        while p:
+            if p == pid: return False
+            p = self.parent.get(p, 0)
+        return True
+
+    def _attach(self, pid):
+        ppid = self.records[pid].ppid
+        self.ppid[pid] = ppid
+        if self._valid_parent(pid, ppid):
+            parent = ppid
+        else:
+            parent = 0
+            if ppid and ppid != pid: self.waiting.setdefault(ppid, set()).add(pid)
+        self.parent[pid] = parent
+        self.children[parent].add(pid)
+
+    def _adopt(self, pid):
+        # Hijos que ya estaban (huérfanos o llegados antes que el padre) y apuntan a este PID
+        orphans = self.waiting.pop(pid, None)
+        if not orphans: return
+        left = set()
+        for c in orphans:
+            if self.parent.get(c) != 0 or self.ppid.get(c) != pid: continue
+            if not self._valid_parent(c, pid):
+                left.add(c)
+                continue
+            self.children[0].discard(c)
+            self.parent[c] = pid
+            self.children[pid].add(c)
+            self._touch(pid)
+        if left: self.waiting[pid] = left
+
+    def _remove(self, pid):
+        parent = self.parent.pop(pid, None)
+        if parent is None: return
+        self.children[parent].discard(pid)
+        if parent: self._touch(parent)
+        root = self.children[0]
+        for c in self.children.pop(pid, ()):
+            self.parent[c] = 0
+            root.add(c)
+            self.waiting.setdefault(pid, set()).add(c)
+        self.totals.pop(pid, None)
+        self.dirty.discard(pid)
+        ppid = self.ppid.pop(pid, 0)
+        waiters = self.waiting.get(ppid)
+        if waiters is not None:
+            waiters.discard(pid)
+            if not waiters: del self.waiting[ppid]
+
+    def _touch(self, pid):
+        # Marca pid y sus ancestros; se para en el primero ya marcado
+        dirty = self.dirty
+        parent = self.parent
+        while pid and pid not in dirty:
+            dirty.add(pid)
+            pid = parent.get(pid, 0)
+
+    def _recompute(self):
+        if not self.dirty: return
+        parent = self.parent
+        depth = {}
+        for pid in self.dirty:
+            d = 0
+            p = parent.get(pid, 0)
+            while p:
+                d += 1
+                p = parent.get(p, 0)
+            depth[pid] = d
+        records = self.records
+        totals = self.totals
+        for pid in sorted(self.dirty, key=depth.__getitem__, reverse=True):
+            r = records.get(pid)
+            if r is None: continue
+            t = totals[pid]
+            t[0] = r.cpu
+            t[1] = r.ram
+            t[2] = r.disk
+            for c in self.children[pid]:
+                ct = totals[c]
+                t[0] += ct[0]
+                t[1] += ct[1]
+                t[2] += ct[2]
+        self.dirty = set()
+
+    def _postorder(self, pid):
+        # Iterativo: los árboles de procesos pueden ser más profundos que el límite de recursión
+        out = []
+        stack = [pid]
+        children = self.children
+        while stack:
+            p = stack.pop()
+            if p: out.append(p)
+            stack.extend(children.get(p, ()))
+        out.reverse()
+        return out
+
+    def subtree(self, pid):
+        # pid y todos sus descendientes, padres antes que hijos
+        out = []
+        stack = [pid]
+        children = self.children
+        while stack:
+            p = stack.pop()
+            out.append(p)
+            stack.extend(children.get(p, ()))
+        return out
+
+    def roots(self):
+        return self.children[0]
+
+    def __len__(self):
+        return len(self.parent)
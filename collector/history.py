@@ -0,0 +1,186 @@
+import math
+from array import array
+
+DEFAULT_RETENTION = 3600
+
+
+class RingBuffer:
+    # Buffer circular de doubles: append O(1) y lectura por segmentos sin copiar
+    __slots__ = ('capacity', 'buf', 'head', 'count', 'total')
+
+    def __init__(self, capacity=DEFAULT_RETENTION):
+        self.capacity = capacity
+        self.buf = array('d', bytes(8 * capacity))
+        self.head = 0
+        self.count = 0
+        # Número de valores añadidos desde el inicio: sirve como versión para las cachés
+        self.total = 0
+
+    def append(self, value):
+        self.buf[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity: self.count += 1
+        self.total += 1
+
+    def __len__(self):
+        return self.count
+
+    def last(self):
+        return self.buf[self.head - 1] if self.count else 0.0
+
+    def segments(self, n=None):
+        # Los últimos n valores en orden cronológico como uno o dos memoryview
+        n = self.count if n is None else min(n, self.count)
+        if not n: return ()
+        view = memoryview(self.buf)
+        start = (self.head - n) % self.capacity
+        if start + n <= self.capacity: return (view[start:start + n],)
+        return (view[start:], view[:self.head])
+
+    def values(self, n=None):
+        out = array('d')
+        for seg in self.segments(n): out.extend(seg)
+        return out
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+
+def decimate_minmax(ring, n, buckets):
+    # Reduce los últimos n valores a `buckets` cubos (mín, máx) en orden temporal.
+    # Devuelve (índices, valores) con los índices relativos a la ventana de n puntos.
+    count = min(n, len(ring))
+    xs = array('d')
+    ys = array('d')
+    if not count: return xs, ys
+    pad = n - count
+    if count <= buckets * 2:
+        i = pad
+        for seg in ring.segments(count):
+            for v in seg:
+                xs.append(i)
+                ys.append(v)
+                i += 1
+        return xs, ys
+
+    per_bucket = count / buckets
+    values = ring.values(count)
+    for b in range(buckets):
+        lo = int(b * per_bucket)
+        hi = int((b + 1) * per_bucket)
+        if hi <= lo: continue
+        chunk = values[lo:hi]
+        v_min = min(chunk)
+        v_max = max(chunk)
+        i_min = lo + chunk.index(v_min)
+        i_max = lo + chunk.index(v_max)
+        if i_min <= i_max:
+            xs.append(pad + i_min); ys.append(v_min)
+            if i_max != i_min:
+                xs.append(pad + i_max); ys.append(v_max)
+        else:
+            xs.append(pad + i_max); ys.append(v_max)
+            xs.append(pad + i_min); ys.append(v_min)
+    return xs, ys
+
+
+def iter_metrics(data):
+    # Pares (nombre, valor) de un snapshot del WorkerThread (dict de SystemSnapshot.as_dict)
+    yield 'cpu', data.get('cpu', 0.0)
+    yield 'ram', data.get('ram', 0.0)
+    yield 'gpu', data.get('gpu', 0.0)
+    yield 'net_down', data.get('net_down', 0.0)
+    yield 'net_up', data.get('net_up', 0.0)
+    for nic, (up, down) in data.get('net_nics', {}).items():
+        yield f"net_up:{nic}", up
+        yield f"net_down:{nic}", down
+    for label, celsius in data.get('temps', {}).items():
+        yield f"temp:{label}", celsius
+    for dev, pct in data.get('disk_usage', {}).items():
+        yield f"disk_usage:{dev}", pct
+    for dev, (read_mb, write_mb) in data.get('disk_io', {}).items():
+        yield f"disk_read:{dev}", read_mb
+        yield f"disk_write:{dev}", write_mb
+    for dev, detail in data.get('disk_detail', {}).items():
+        yield f"disk_util:{dev}", detail[4]
+
+
+def envelope_minmax(ring, n, buckets):
+    # Envolvente (mín, máx) de los últimos n valores en `buckets` cubos consecutivos.
+    # Devuelve (pad, ancho de cubo en muestras, mínimos, máximos); pad son las muestras
+    # que faltan a la izquierda para llenar la ventana.
+    count = min(n, len(ring))
+    lows = array('d')
+    highs = array('d')
+    if not count: return n, 1.0, lows, highs
+    buckets = min(buckets, count)
+    per_bucket = count / buckets
+    values = ring.values(count)
+    for b in range(buckets):
+        chunk = values[int(b * per_bucket):int((b + 1) * per_bucket)]
+        lows.append(min(chunk))
+        highs.append(max(chunk))
+    return n - count, per_bucket, lows, highs
+
+
+def read_backfill(store, names, now, seconds, step=1):
+    # {nombre: array} con el nivel de 1 s del almacén persistente, remuestreado a un valor cada
+    # `step` segundos (el intervalo de la interfaz; 0 donde no hay datos) para que la gráfica
+    # muestre lo ocurrido antes de abrir la app. Una sola pasada por el nivel para todas las
+    # series; no toca los RingBuffer (se puede llamar desde otro hilo y entregar el resultado
+    # a apply_backfill)
+    n = int(round(seconds / step))
+    start = now - n * step
+    out = {}
+    for name, rows in store.query_many(names, int(start), now, step=1).items():
+        if not rows: continue
+        sums = array('d', bytes(8 * n))
+        counts = array('d', bytes(8 * n))
+        for t, avg, lo, hi in rows:
+            if t + 1 <= start: continue
+            # Huecos de step que cubre el segundo [t, t + 1)
+            first = max(math.floor((t - start) / step), 0)
+            last = min(max(math.floor((t + 1 - start) / step), first + 1), n)
+            for i in range(first, last):
+                sums[i] += avg
+                counts[i] += 1
+        out[name] = array('d', (s / c if c else 0.0 for s, c in zip(sums, counts)))
+    return out
+
+
+class HistoryStore:
+    # Historial compartido de métricas: una serie circular por nombre con su propia retención
+    def __init__(self, retention=DEFAULT_RETENTION):
+        self.retention = retention
+        self.series_map = {}
+
+    def series(self, name, retention=None):
+        s = self.series_map.get(name)
+        if s is None:
+            s = RingBuffer(retention or self.retention)
+            self.series_map[name] = s
+        return s
+
+    def push(self, name, value):
+        self.series(name).append(float(value))
+
+    def record(self, data):
+        push = self.push
+        for name, value in iter_metrics(data): push(name, value)
+
+    def backfill(self, store, names, now, seconds=None, step=1):
+        self.apply_backfill(read_backfill(store, names, now, seconds or self.retention * step, step))
+
+    def apply_backfill(self, arrays):
+        # Lo leído va delante de lo que ya haya llegado en directo, hasta llenar la retención
+        for name, values in arrays.items():
+            ring = self.series(name)
+            live = ring.values()
+            keep = ring.capacity - len(live)
+            ring.clear()
+            for v in (values[len(values) - keep:] if keep > 0 else ()): ring.append(v)
+            for v in live: ring.append(v)
+
+    def names(self):
+        return list(self.series_map)
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+from collections import deque
+
+import psutil
+
+
+class StageStats:
+    __slots__ = ('count', 'last', 'max', 'recent')
+
+    def __init__(self, window):
+        self.count = 0
+        self.last = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, ms):
+        self.count += 1
+        self.last = ms
+        if ms > self.max: self.max = ms
+        self.recent.append(ms)
+
+    def as_dict(self):
+        recent = sorted(self.recent)
+        n = len(recent)
+        return {'count': self.count, 'last_ms': self.last, 'max_ms': self.max,
+                'mean_ms': sum(recent) / n if n else 0.0,
+                'p50_ms': recent[n // 2] if n else 0.0,
+                'p99_ms': recent[min(int(n * 0.99), n - 1)] if n else 0.0}
+
+
+class Instrumentation:
+    # Tiempos de las etapas calientes (ms) y huella del propio proceso. Desactivada, cada punto
+    # de medida es una lectura de `enabled`: los sitios instrumentados hacen
+    #   t0 = time.perf_counter() if INSTRUMENT.enabled else 0.0 ... if t0: INSTRUMENT.record(...)
+    def __init__(self, window=120):
+        self.enabled = False
+        self.window = window
+        self.stages = {}
+        self.lock = threading.Lock()
+        self.process = None
+
+    def record(self, stage, ms):
+        s = self.stages.get(stage)
+        if s is None:
+            with self.lock: s = self.stages.setdefault(stage, StageStats(self.window))
+        s.add(ms)
+
+    def since(self, stage, t0):
+        self.record(stage, (time.perf_counter() - t0) * 1000)
+
+    def reset(self):
+        with self.lock: self.stages = {}
+
+    def snapshot(self):
+        with self.lock: stages = list(self.stages.items())
+        return {name: s.as_dict() for name, s in sorted(stages)}
+
+    def footprint(self):
+        # CPU como en top (100 = un núcleo), memoria residente y número de hilos
+        try:
+            if self.process is None:
+                self.process = psutil.Process(os.getpid())
+                self.process.cpu_percent(None)
+            p = self.process
+            with p.oneshot():
+                return {'cpu_percent': p.cpu_percent(None), 'rss_bytes': p.memory_info().rss,
+                        'threads': p.num_threads()}
+        except:
+            return {}
+
+
+INSTRUMENT = Instrumentation()
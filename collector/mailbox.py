@@ -0,0 +1,45 @@
+import threading
+
+
+class Mailbox:
+    # Buzón de un solo valor entre un hilo productor y el hilo de la interfaz: post() nunca
+    # bloquea ni encola. Si el consumidor todavía no ha recogido el valor anterior, el nuevo lo
+    # sustituye (o se funde con él mediante merge(old, new)) y se cuenta como descartado.
+    def __init__(self, merge=None):
+        self.merge = merge
+        self.lock = threading.Lock()
+        self.value = None
+        self.full = False
+        self.posted = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def post(self, value):
+        # True si el buzón estaba vacío: solo entonces hay que avisar al consumidor
+        with self.lock:
+            self.posted += 1
+            if self.full:
+                self.dropped += 1
+                self.value = self.merge(self.value, value) if self.merge is not None else value
+                return False
+            self.value = value
+            self.full = True
+            return True
+
+    def take(self):
+        with self.lock:
+            if not self.full: return None
+            value = self.value
+            self.value = None
+            self.full = False
+            self.delivered += 1
+            return value
+
+    def clear(self):
+        with self.lock:
+            self.value = None
+            self.full = False
+
+    def stats(self):
+        return {'posted': self.posted, 'delivered': self.delivered, 'dropped': self.dropped,
+                'pending': self.full}
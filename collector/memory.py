@@ -0,0 +1,85 @@
+import heapq
+import os
+import time
+
+import psutil
+
+
+def read_smaps_rollup(pid, proc_root="/proc"):
+    # smaps_rollup (Linux >= 4.14) ya trae los totales: no hay que recorrer cada VMA en Python
+    try:
+        with open(f"{proc_root}/{pid}/smaps_rollup", "rb") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    uss = 0
+    found = False
+    for line in raw.split(b"\n"):
+        if line.startswith(b"Private_Clean:") or line.startswith(b"Private_Dirty:"):
+            uss += int(line.split()[1]) * 1024
+            found = True
+    return uss if found else None
+
+
+def read_psutil_uss(pid):
+    try:
+        return psutil.Process(pid).memory_full_info().uss
+    except:
+        return None
+
+
+def default_uss_reader(proc_root="/proc"):
+    if os.path.exists(f"{proc_root}/self/smaps_rollup"):
+        return lambda pid: read_smaps_rollup(pid, proc_root)
+    return read_psutil_uss
+
+
+class MemoryAccountant:
+    # Por defecto cada proceso lleva la estimación barata que da el backend (RSS privado).
+    # La USS exacta solo se mide para las filas visibles y el top-N por memoria,
+    # se cachea por (pid, start) y caduca pasado max_age.
+    def __init__(self, reader=None, top_n=25, refresh_interval=10.0, max_age=60.0, max_exact_per_scan=64):
+        self.reader = reader or default_uss_reader()
+        self.top_n = top_n
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.max_exact_per_scan = max_exact_per_scan
+        self.cache = {}
+        self.visible = frozenset()
+        self.exact_reads = 0
+
+    def set_visible(self, pids):
+        self.visible = frozenset(pids)
+
+    def apply(self, records):
+        now = time.monotonic()
+        cache = self.cache
+        visible = self.visible
+
+        candidates = [r for r in records if r.pid in visible]
+        candidates.extend(heapq.nlargest(self.top_n, records, key=lambda r: r.ram))
+
+        budget = self.max_exact_per_scan
+        seen = set()
+        for r in candidates:
+            if budget <= 0: break
+            key = (r.pid, r.start)
+            if key in seen: continue
+            seen.add(key)
+            hit = cache.get(key)
+            if hit is not None and now - hit[1] < self.refresh_interval: continue
+            uss = self.reader(r.pid)
+            budget -= 1
+            self.exact_reads += 1
+            # Los fallos también se cachean (hilos del kernel, acceso denegado) para no reintentar cada pasada
+            cache[key] = (uss, now)
+
+        live = set()
+        for r in records:
+            key = (r.pid, r.start)
+            live.add(key)
+            hit = cache.get(key)
+            if hit is not None and hit[0] is not None and now - hit[1] <= self.max_age: r.ram = hit[0]
+
+        self.cache = {k: v for k, v in cache.items() if k in live and now - v[1] <= self.max_age}
+        return records
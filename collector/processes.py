@@ -0,0 +1,74 @@
+import time
+import psutil
+
+from .snapshot import ProcessRecord
+from .memory import MemoryAccountant, read_psutil_uss
+
+IGNORED_PROCESSES = {
+    "System Idle Process", "System", "Registry", "MemCompression", "vmmem",
+    "smss.exe", "csrss.exe", "wininit.exe", "services.exe", "lsass.exe",
+    "winlogon.exe", "Memory Compression", "svchost.exe", "RuntimeBroker.exe"
+}
+
+
+def private_estimate(mem_info):
+    # Estimación barata de la memoria privada a partir de memory_info (sin leer smaps)
+    if mem_info is None: return 0
+    private = getattr(mem_info, 'private', None)
+    if private is not None: return private
+    shared = getattr(mem_info, 'shared', None)
+    if shared is not None: return max(mem_info.rss - shared, 0)
+    return mem_info.rss
+
+
+class PsutilProcessBackend:
+    name = "psutil"
+
+    def __init__(self, memory=None):
+        self.memory = memory if memory is not None else MemoryAccountant(read_psutil_uss)
+        self.prev_io_data = {}
+        self.logical_cores = psutil.cpu_count(logical=True) or 1
+
+    def scan(self):
+        procs = []
+        try:
+            current_time = time.monotonic()
+            for p in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info', 'exe', 'io_counters', 'create_time',
+                                           'ppid']):
+                try:
+                    p_info = p.info
+                    name = p_info['name']
+                    if not name: continue
+                    if name in IGNORED_PROCESSES: continue
+
+                    pid = p_info['pid']
+
+                    disk_usage = 0.0
+                    io = p_info['io_counters']
+                    if io:
+                        current_total = io.read_bytes + io.write_bytes
+                        if pid in self.prev_io_data:
+                            prev = self.prev_io_data[pid]
+                            dt = current_time - prev['time']
+                            if dt > 0:
+                                diff = current_total - prev['total']
+                                if diff < 0: diff = 0
+                                disk_usage = (diff / dt) / (1024 * 1024)
+                        self.prev_io_data[pid] = {'total': current_total, 'time': current_time}
+
+                    raw_cpu = p_info['cpu_percent'] or 0.0
+                    normalized_cpu = raw_cpu / self.logical_cores
+
+                    ram_bytes = private_estimate(p_info['memory_info'])
+
+                    procs.append(ProcessRecord(pid, name, normalized_cpu, ram_bytes, disk_usage,
+                                               p_info['exe'] or "", p_info['create_time'] or 0.0,
+                                               p_info['ppid'] or 0))
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    pass
+        except:
+            pass
+
+        current_pids = {p.pid for p in procs}
+        self.prev_io_data = {k: v for k, v in self.prev_io_data.items() if k in current_pids}
+        return self.memory.apply(procs)
@@ -0,0 +1,148 @@
+import os
+import sys
+import time
+
+from .snapshot import ProcessRecord
+from .processes import IGNORED_PROCESSES
+from .memory import MemoryAccountant, default_uss_reader
+
+PROC_ROOT = "/proc"
+
+
+def procfs_available(proc_root=PROC_ROOT):
+    return sys.platform.startswith("linux") and os.path.exists(os.path.join(proc_root, "self", "stat"))
+
+
+class ProcfsProcessBackend:
+    # Escaneo de /proc en una sola pasada: stat + statm + io por PID, exe cacheado
+    # mientras el proceso siga vivo (pid, starttime). Calcula los deltas de CPU y disco.
+    name = "procfs"
+
+    def __init__(self, proc_root=PROC_ROOT, buffer_size=4096, memory=None):
+        self.proc_root = proc_root
+        self.memory = memory if memory is not None else MemoryAccountant(default_uss_reader(proc_root))
+        self.clk_tck = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self.page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self.logical_cores = os.cpu_count() or 1
+        self.buf = bytearray(buffer_size)
+        self.view = memoryview(self.buf)
+        # pid -> (starttime, cpu_ticks, io_total, t)
+        self.prev = {}
+        # (pid, starttime) -> (comm, name, exe)
+        self.identity = {}
+        self.io_denied = set()
+
+    def _read(self, path):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            n = os.readv(fd, [self.buf])
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+        return bytes(self.view[:n])
+
+    def _resolve_identity(self, base, pid, comm):
+        exe = ""
+        try:
+            exe = os.readlink(base + "/exe")
+            if exe.endswith(" (deleted)") and not os.path.exists(exe): exe = exe[:-10]
+        except OSError:
+            pass
+        name = comm
+        # comm se trunca a 15 caracteres: se completa con el ejecutable como hace psutil
+        if len(comm) >= 15:
+            full = os.path.basename(exe) if exe else ""
+            if not full:
+                raw = self._read(base + "/cmdline")
+                if raw: full = os.path.basename(raw.split(b"\0", 1)[0].decode("utf-8", "replace"))
+            if full.startswith(comm): name = full
+        return name, exe
+
+    def _read_io(self, base):
+        raw = self._read(base + "/io")
+        if raw is None: return None
+        total = 0
+        for line in raw.split(b"\n"):
+            if line.startswith(b"read_bytes:") or line.startswith(b"write_bytes:"):
+                total += int(line.split(b":", 1)[1])
+        return total
+
+    def scan(self):
+        now = time.monotonic()
+        root = self.proc_root
+        prev = self.prev
+        identity = self.identity
+        cpu_scale = 100.0 / (self.clk_tck * self.logical_cores)
+        page_size = self.page_size
+
+        new_prev = {}
+        live_keys = set()
+        procs = []
+        try:
+            entries = os.listdir(root)
+        except OSError:
+            return procs
+
+        for entry in entries:
+            if not entry.isdigit(): continue
+            pid = int(entry)
+            base = root + "/" + entry
+            raw = self._read(base + "/stat")
+            if not raw: continue
+            try:
+                lpar = raw.index(b"(")
+                rpar = raw.rindex(b")")
+                comm = raw[lpar + 1:rpar].decode("utf-8", "replace")
+                fields = raw[rpar + 2:].split()
+                ppid = int(fields[1])
+                ticks = int(fields[11]) + int(fields[12])
+                start = int(fields[19])
+            except (ValueError, IndexError):
+                continue
+
+            key = (pid, start)
+            ident = identity.get(key)
+            if ident is None or ident[0] != comm:
+                name, exe = self._resolve_identity(base, pid, comm)
+                ident = (comm, name, exe)
+                identity[key] = ident
+            live_keys.add(key)
+            name = ident[1]
+            if not name or name in IGNORED_PROCESSES: continue
+
+            statm = self._read(base + "/statm")
+            ram_bytes = 0
+            if statm:
+                parts = statm.split()
+                # resident - shared: memoria privada aproximada sin recorrer smaps
+                ram_bytes = max(int(parts[1]) - int(parts[2]), 0) * page_size
+
+            io_total = None
+            if key not in self.io_denied:
+                io_total = self._read_io(base)
+                if io_total is None: self.io_denied.add(key)
+
+            cpu = 0.0
+            disk = 0.0
+            last = prev.get(pid)
+            if last is not None and last[0] == start:
+                dt = now - last[3]
+                if dt > 0:
+                    d_ticks = ticks - last[1]
+                    if d_ticks > 0: cpu = d_ticks / dt * cpu_scale
+                    if io_total is not None and last[2] is not None:
+                        diff = io_total - last[2]
+                        if diff > 0: disk = (diff / dt) / (1024 * 1024)
+            new_prev[pid] = (start, ticks, io_total, now)
+
+            procs.append(ProcessRecord(pid, name, cpu, ram_bytes, disk, ident[2], start, ppid))
+
+        self.prev = new_prev
+        if len(identity) > len(live_keys):
+            self.identity = {k: v for k, v in identity.items() if k in live_keys}
+            self.io_denied &= live_keys
+        return self.memory.apply(procs)
@@ -0,0 +1,160 @@
+import json
+import socket
+import struct
+import sys
+import threading
+import time
+
+from . import wire
+
+# Grabación: MAGIC, cabecera JSON y después registros [t f64][tipo u8][longitud u32][carga].
+# t son segundos desde el inicio de la grabación; las cargas usan los códecs de wire
+# (dict de sistema con compresión delta y ProcessDelta binario).
+MAGIC = b"LSR2"
+# LSR1: mismas tramas sin ppid en las altas de procesos, se sigue pudiendo leer
+MAGIC_V1 = b"LSR1"
+RECORD = struct.Struct("<dBI")
+VERSION = 1
+
+
+class Recorder:
+    def __init__(self, path, clock=time.monotonic):
+        self.path = path
+        self.clock = clock
+        self.file = open(path, "wb")
+        self.system = wire.SystemDeltaEncoder()
+        self.lock = threading.Lock()
+        self.t0 = clock()
+        self.records = 0
+        header = {'version': VERSION, 'host': socket.gethostname(), 'platform': sys.platform,
+                  'started': time.time()}
+        body = json.dumps(header).encode("utf-8")
+        self.file.write(MAGIC + struct.pack("<I", len(body)) + body)
+
+    def _write(self, kind, payload):
+        with self.lock:
+            if self.file is None: return
+            self.file.write(RECORD.pack(self.clock() - self.t0, kind, len(payload)))
+            self.file.write(payload)
+            self.records += 1
+            # Una vez por snapshot de sistema (~1 s): un cierre brusco pierde como mucho eso
+            if kind == wire.SYSTEM: self.file.flush()
+
+    def write_system(self, data):
+        self._write(wire.SYSTEM, self.system.encode(data))
+
+    def write_processes(self, delta):
+        self._write(wire.PROCS, wire.encode_process_delta(delta))
+
+    def close(self):
+        with self.lock:
+            if self.file is None: return
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Recording:
+    # Lectura secuencial: iterar devuelve (t, 'system', dict) o (t, 'procs', ProcessDelta).
+    # Un último registro incompleto (grabación cortada) se ignora.
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if magic not in (MAGIC, MAGIC_V1): raise ValueError(f"{path}: no es una grabación de LeSYS")
+            self.version = 2 if magic == MAGIC else 1
+            n = struct.unpack("<I", f.read(4))[0]
+            self.header = json.loads(f.read(n))
+            self.offset = f.tell()
+
+    def records(self):
+        # Sin decodificar: (t, tipo, carga)
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            while True:
+                head = f.read(RECORD.size)
+                if len(head) < RECORD.size: return
+                t, kind, length = RECORD.unpack(head)
+                payload = f.read(length)
+                if len(payload) < length: return
+                yield t, kind, payload
+
+    def __iter__(self):
+        system = wire.SystemDeltaDecoder()
+        for t, kind, payload in self.records():
+            if kind == wire.SYSTEM:
+                yield t, 'system', system.decode(payload)
+            elif kind == wire.PROCS:
+                yield t, 'procs', wire.decode_process_delta(payload, self.version)
+
+    def summary(self):
+        out = {'path': self.path, 'host': self.header.get('host'), 'started': self.header.get('started'),
+               'duration': 0.0, 'system': 0, 'procs': 0, 'bytes': 0, 'max_processes': 0}
+        live = 0
+        for t, kind, payload in self.records():
+            out['duration'] = t
+            out['bytes'] += RECORD.size + len(payload)
+            if kind == wire.SYSTEM:
+                out['system'] += 1
+            elif kind == wire.PROCS:
+                out['procs'] += 1
+                delta = wire.decode_process_delta(payload, self.version)
+                if delta.keyframe: live = 0
+                live += len(delta.added) - len(delta.removed)
+                out['max_processes'] = max(out['max_processes'], live)
+        return out
+
+
+def record(path, duration=None, interval=1.0, process_interval=2.0):
+    # Grabación sin interfaz (servidores): mismo muestreo que la aplicación
+    from .core import SystemCollector, ProcessCollector
+    from .delta import DeltaEncoder
+    from .scheduler import Scheduler
+    system = SystemCollector(emit_interval=interval)
+    processes = ProcessCollector()
+    encoder = DeltaEncoder()
+    with Recorder(path) as recorder, system:
+        procs = Scheduler()
+        procs.add('processes', process_interval,
+                  lambda now, dt: recorder.write_processes(encoder.encode(processes.sample())), delay=0)
+        end = time.monotonic() + duration if duration else None
+        try:
+            while end is None or time.monotonic() < end:
+                procs.run_pending()
+                snap = system.tick()
+                if snap is not None: recorder.write_system(snap.as_dict())
+                time.sleep(min(system.sleep_ms(), procs.sleep_ms()) / 1000)
+        except KeyboardInterrupt:
+            pass
+        return recorder.records
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m collector.recording",
+                                     description="Graba el flujo de snapshots de LeSYS o muestra el resumen de una grabación.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("record", help="grabar sin interfaz")
+    p.add_argument("path")
+    p.add_argument("-d", "--duration", type=float, help="segundos (por defecto hasta Ctrl+C)")
+    p.add_argument("-i", "--interval", type=float, default=1.0)
+    p.add_argument("-p", "--process-interval", type=float, default=2.0)
+    p = sub.add_parser("info", help="resumen de una grabación")
+    p.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        n = record(args.path, args.duration, args.interval, args.process_interval)
+        print(f"{n} registros en {args.path}", file=sys.stderr)
+        return 0
+    print(json.dumps(Recording(args.path).summary(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
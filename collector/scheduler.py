@@ -0,0 +1,99 @@
+import math
+import time
+
+
+class Job:
+    __slots__ = ('name', 'interval', 'base', 'fn', 'next', 'last_run', 'runs', 'missed', 'last_cost', 'max_cost', 'max_late')
+
+    def __init__(self, name, interval, fn, start):
+        self.name = name
+        self.interval = interval
+        # Intervalo sin estirar (stretch)
+        self.base = interval
+        self.fn = fn
+        self.next = start
+        self.last_run = None
+        self.runs = 0
+        self.missed = 0
+        self.last_cost = 0.0
+        self.max_cost = 0.0
+        self.max_late = 0.0
+
+    def as_dict(self):
+        return {'interval': self.interval, 'runs': self.runs, 'missed': self.missed,
+                'last_ms': self.last_cost * 1000, 'max_ms': self.max_cost * 1000,
+                'max_late_ms': self.max_late * 1000}
+
+
+class Scheduler:
+    # Plazos sobre time.monotonic: cada trabajo avanza su plazo en múltiplos exactos de su
+    # intervalo (sin deriva por el coste del trabajo ni saltos del reloj de pared). Si un
+    # trabajo tarda más que su intervalo, los plazos vencidos se saltan y se cuentan en `missed`.
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.jobs = []
+
+    def add(self, name, interval, fn, delay=None):
+        # fn(now, dt) con dt = segundos desde la ejecución anterior del mismo trabajo
+        now = self.clock()
+        job = Job(name, interval, fn, now + (interval if delay is None else delay))
+        job.last_run = now
+        self.jobs.append(job)
+        return job
+
+    def expedite(self):
+        # Todos los trabajos vencen ya (p. ej. al reanudar tras una pausa)
+        now = self.clock()
+        for job in self.jobs:
+            if job.next > now: job.next = now
+
+    def stretch(self, factor, keep=()):
+        # Intervalos multiplicados por factor salvo los de `keep` (1 los restaura); al acortarse,
+        # el plazo pendiente se adelanta para no esperar al intervalo largo
+        for job in self.jobs:
+            if job.name in keep: continue
+            job.interval = job.base * factor
+            job.next = min(job.next, job.last_run + job.interval)
+
+    def next_deadline(self):
+        return min(job.next for job in self.jobs) if self.jobs else None
+
+    def time_to_next(self):
+        deadline = self.next_deadline()
+        if deadline is None: return 1.0
+        return max(0.0, deadline - self.clock())
+
+    def sleep_ms(self):
+        return math.ceil(self.time_to_next() * 1000)
+
+    def run_pending(self, now=None):
+        # Ejecuta en orden de alta los trabajos vencidos; devuelve sus nombres
+        clock = self.clock
+        if now is None: now = clock()
+        ran = []
+        for job in self.jobs:
+            if job.next > now: continue
+            late = now - job.next
+            if late > job.max_late: job.max_late = late
+            dt = now - job.last_run
+            if dt <= 0: dt = 0.001
+            t0 = clock()
+            try:
+                job.fn(now, dt)
+            except:
+                pass
+            t1 = clock()
+            job.last_run = now
+            job.runs += 1
+            job.last_cost = t1 - t0
+            if job.last_cost > job.max_cost: job.max_cost = job.last_cost
+            job.next += job.interval
+            if job.next <= t1:
+                skipped = int((t1 - job.next) // job.interval) + 1
+                job.next += skipped * job.interval
+                job.missed += skipped
+            ran.append(job.name)
+        return ran
+
+    def stats(self):
+        return {job.name: job.as_dict() for job in self.jobs}
@@ -0,0 +1,44 @@
+class ProcessIndex:
+    # Texto de búsqueda por PID (nombre, PID y ruta en minúsculas) mantenido con los deltas: el
+    # nombre y el ejecutable no cambian en la vida de un PID, así que solo cuestan las altas.
+    # match() reutiliza el resultado anterior si la consulta nueva lo contiene (se ha seguido
+    # escribiendo) y las altas/bajas posteriores actualizan ese resultado sin volver a recorrer.
+    def __init__(self):
+        self.text = {}
+        self.query = ""
+        self.matches = set()
+
+    def clear(self):
+        self.text = {}
+        self.matches = set()
+
+    def add(self, r):
+        text = f"{r.name}\0{r.pid}\0{r.exe}".lower()
+        self.text[r.pid] = text
+        if self.query:
+            if self.query in text: self.matches.add(r.pid)
+            else: self.matches.discard(r.pid)
+
+    def remove(self, pid):
+        self.text.pop(pid, None)
+        self.matches.discard(pid)
+
+    def match(self, query):
+        # PIDs cuyo nombre, PID o ruta contienen query; None sin filtro
+        query = query.strip().lower()
+        if not query:
+            self.query = ""
+            self.matches = set()
+            return None
+        if query != self.query:
+            text = self.text
+            if self.query and self.query in query:
+                candidates = self.matches
+            else:
+                candidates = text
+            self.matches = {pid for pid in candidates if query in text[pid]}
+            self.query = query
+        return self.matches
+
+    def __len__(self):
+        return len(self.text)
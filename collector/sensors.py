@@ -0,0 +1,293 @@
+import glob
+import os
+import sys
+
+from .sources import Source, WmiSession
+
+
+class SensorBackend:
+    # Un backend declara qué métricas del snapshot puede rellenar, su prioridad (menor gana:
+    # qué fuente se prefiere cuando hay varias, p. ej. la NVIDIA antes que la integrada) y su
+    # coste aproximado por muestra (ms), que desempata. probe() hace las importaciones y
+    # comprobaciones; solo se llama si el registro necesita el backend, y sample() ya no
+    # comprueba modos en cada tick.
+    name = ""
+    metrics = ()
+    priority = 0
+    cost = 1.0
+
+    def probe(self):
+        return False
+
+    def sample(self, snap):
+        pass
+
+    def close(self):
+        pass
+
+
+class NvmlBackend(SensorBackend):
+    name = "nvml"
+    metrics = ('gpu',)
+    priority = 0
+    cost = 0.3
+
+    def __init__(self, index=0, proc_root="/proc"):
+        self.index = index
+        self.proc_root = proc_root
+        self.nvml = None
+        self.handle = None
+
+    def probe(self):
+        # Va primero por prioridad: en Linux, sin el driver de NVIDIA cargado no se llega a
+        # importar ni inicializar pynvml y el registro pasa a sysfs
+        if sys.platform.startswith("linux") and not os.path.isdir(os.path.join(self.proc_root, "driver", "nvidia")):
+            return False
+        try:
+            import pynvml
+            pynvml.nvmlInit()
+            self.handle = pynvml.nvmlDeviceGetHandleByIndex(self.index)
+            self.nvml = pynvml
+            return True
+        except:
+            return False
+
+    def sample(self, snap):
+        util = self.nvml.nvmlDeviceGetUtilizationRates(self.handle)
+        snap.gpu = util.gpu
+        mem_info = self.nvml.nvmlDeviceGetMemoryInfo(self.handle)
+        vram_used = mem_info.used / (1024 ** 3)
+        vram_total = mem_info.total / (1024 ** 3)
+        snap.gpu_extra = f"{vram_used:.1f} / {vram_total:.1f} GB"
+
+    def close(self):
+        if self.nvml is not None:
+            try: self.nvml.nvmlShutdown()
+            except: pass
+
+
+class WmiGpuBackend(SensorBackend):
+    name = "wmi"
+    metrics = ('gpu',)
+    priority = 2
+    cost = 25.0
+
+    def __init__(self, wmi_session=None):
+        self.wmi_session = wmi_session if wmi_session is not None else WmiSession()
+
+    def probe(self):
+        if sys.platform != "win32": return False
+        wmi_c = self.wmi_session.get()
+        if not wmi_c: return False
+        try:
+            return bool(wmi_c.Win32_VideoController())
+        except:
+            return False
+
+    def sample(self, snap):
+        gpu_list = self.wmi_session.get().Win32_VideoController()
+        if not gpu_list: return
+        if hasattr(gpu_list[0], 'LoadPercentage'):
+            snap.gpu = gpu_list[0].LoadPercentage
+        if hasattr(gpu_list[0], 'AdapterRAM') and gpu_list[0].AdapterRAM:
+            vram_total = int(gpu_list[0].AdapterRAM) / (1024 ** 3)
+            snap.gpu_extra = f"Total: {vram_total:.1f} GB"
+
+
+def read_int(path):
+    with open(path, "rb") as f: return int(f.read())
+
+
+class SysfsGpuBackend(SensorBackend):
+    # amdgpu (y otros drivers DRM que exponen gpu_busy_percent) en Linux
+    name = "sysfs"
+    metrics = ('gpu',)
+    priority = 1
+    cost = 0.05
+
+    def __init__(self, sys_root="/sys"):
+        self.sys_root = sys_root
+        self.device = None
+
+    def probe(self):
+        for busy in sorted(glob.glob(os.path.join(self.sys_root, "class", "drm", "card*", "device", "gpu_busy_percent"))):
+            try:
+                read_int(busy)
+            except:
+                continue
+            self.device = os.path.dirname(busy)
+            return True
+        return False
+
+    def sample(self, snap):
+        snap.gpu = read_int(os.path.join(self.device, "gpu_busy_percent"))
+        try:
+            used = read_int(os.path.join(self.device, "mem_info_vram_used")) / (1024 ** 3)
+            total = read_int(os.path.join(self.device, "mem_info_vram_total")) / (1024 ** 3)
+            snap.gpu_extra = f"{used:.1f} / {total:.1f} GB"
+        except:
+            pass
+
+
+class HwmonBackend(SensorBackend):
+    # Temperaturas de /sys/class/hwmon: {"chip etiqueta": °C}
+    name = "hwmon"
+    metrics = ('temps',)
+    cost = 0.2
+
+    def __init__(self, sys_root="/sys"):
+        self.sys_root = sys_root
+        self.inputs = []
+
+    def probe(self):
+        inputs = []
+        for chip in sorted(glob.glob(os.path.join(self.sys_root, "class", "hwmon", "hwmon*"))):
+            try:
+                with open(os.path.join(chip, "name")) as f: chip_name = f.read().strip()
+            except:
+                chip_name = os.path.basename(chip)
+            for path in sorted(glob.glob(os.path.join(chip, "temp*_input"))):
+                label = os.path.basename(path)[:-len("_input")]
+                try:
+                    with open(path[:-len("input")] + "label") as f: label = f.read().strip()
+                except:
+                    pass
+                inputs.append((f"{chip_name} {label}", path))
+        self.inputs = inputs
+        return bool(inputs)
+
+    def sample(self, snap):
+        temps = {}
+        for label, path in self.inputs:
+            try:
+                temps[label] = read_int(path) / 1000.0
+            except:
+                pass
+        snap.temps = temps
+
+
+class NullBackend(SensorBackend):
+    # Siempre disponible y sin métricas: registro vacío explícito
+    name = "null"
+
+    def probe(self):
+        return True
+
+
+class FakeBackend(SensorBackend):
+    # Valores fijos o calculados (callable) para pruebas y benchmarks sin hardware
+    name = "fake"
+
+    def __init__(self, values=None, cost=0.0, available=True, name=None, priority=0):
+        self.values = values or {}
+        self.metrics = tuple(self.values)
+        self.cost = cost
+        self.priority = priority
+        self.available = available
+        if name: self.name = name
+        self.probes = 0
+        self.samples = 0
+
+    def probe(self):
+        self.probes += 1
+        return self.available
+
+    def sample(self, snap):
+        self.samples += 1
+        for metric, value in self.values.items():
+            setattr(snap, metric, value() if callable(value) else value)
+
+
+BACKENDS = {
+    'nvml': NvmlBackend,
+    'sysfs': SysfsGpuBackend,
+    'hwmon': HwmonBackend,
+    'wmi': WmiGpuBackend,
+    'null': NullBackend,
+}
+
+
+class SensorRegistry:
+    # Para cada métrica se prueba a los candidatos por prioridad (y a igual prioridad, del más
+    # barato al más caro) y se queda el primero disponible; cada backend se prueba como mucho
+    # una vez y solo muestrean los activos.
+    def __init__(self, backends=()):
+        self.backends = list(backends)
+        self.available = {}
+        self.owner = {}
+        self.active = []
+
+    def register(self, backend):
+        self.backends.append(backend)
+        return backend
+
+    def _probe(self, backend):
+        ok = self.available.get(id(backend))
+        if ok is None:
+            try: ok = bool(backend.probe())
+            except: ok = False
+            self.available[id(backend)] = ok
+        return ok
+
+    def open(self):
+        metrics = []
+        for b in self.backends:
+            for m in b.metrics:
+                if m not in metrics: metrics.append(m)
+        self.owner = {}
+        for metric in metrics:
+            candidates = sorted((b for b in self.backends if metric in b.metrics), key=lambda b: (b.priority, b.cost))
+            for b in candidates:
+                if self._probe(b):
+                    self.owner[metric] = b
+                    break
+        self.active = [b for b in self.backends if any(o is b for o in self.owner.values())]
+        for b in self.backends:
+            if b not in self.active and self.available.get(id(b)): b.close()
+        return self.active
+
+    def sample(self, snap):
+        for b in self.active:
+            try:
+                b.sample(snap)
+            except:
+                pass
+
+    def describe(self):
+        out = []
+        for b in self.backends:
+            out.append({'name': b.name, 'priority': b.priority, 'cost_ms': b.cost, 'metrics': list(b.metrics),
+                        'available': self.available.get(id(b)),
+                        'provides': [m for m, o in self.owner.items() if o is b]})
+        return out
+
+    def close(self):
+        for b in self.active: b.close()
+        self.active = []
+
+
+def default_registry(wmi_session=None, names=None):
+    # names: lista de backends a usar (config.SENSOR_BACKENDS); None = todos
+    names = names if names is not None else ['nvml', 'sysfs', 'hwmon', 'wmi']
+    backends = []
+    for name in names:
+        cls = BACKENDS.get(name)
+        if cls is None: continue
+        backends.append(cls(wmi_session) if cls is WmiGpuBackend else cls())
+    return SensorRegistry(backends)
+
+
+class SensorSource(Source):
+    name = "sensors"
+
+    def __init__(self, registry=None):
+        self.registry = registry if registry is not None else default_registry()
+
+    def open(self):
+        self.registry.open()
+
+    def sample(self, snap, dt):
+        self.registry.sample(snap)
+
+    def close(self):
+        self.registry.close()
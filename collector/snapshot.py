@@ -0,0 +1,61 @@
+from dataclasses import dataclass, field, asdict, replace
+
+
+@dataclass(slots=True)
+class SystemSnapshot:
+    timestamp: float = 0.0
+    cpu: float = 0.0
+    cpu_extra: str = ""
+    ram: float = 0.0
+    ram_extra: str = ""
+    gpu: float = 0.0
+    gpu_extra: str = ""
+    # Temperaturas por sensor (°C), solo si hay un backend que las proporcione
+    temps: dict = field(default_factory=dict)
+    net_up: float = 0.0
+    net_down: float = 0.0
+    net_iface: str = ""
+    # MB/s por interfaz: {nombre: (subida, bajada)}
+    net_nics: dict = field(default_factory=dict)
+    disk_io: dict = field(default_factory=dict)
+    # Solo con /proc/diskstats: {dispositivo: (IOPS lect., IOPS escr., ms lect., ms escr., %util,
+    # dispositivo del kernel, discos físicos)}
+    disk_detail: dict = field(default_factory=dict)
+    disk_usage: dict = field(default_factory=dict)
+    # Montajes que no responden: {dispositivo: segundos desde el último dato, -1 si nunca hubo}
+    disk_stale: dict = field(default_factory=dict)
+
+    def as_dict(self):
+        # Formato que consume MonitorFinal.update_ui
+        return asdict(self)
+
+    def copy(self):
+        return replace(self, disk_io=dict(self.disk_io), disk_detail=dict(self.disk_detail),
+                       disk_usage=dict(self.disk_usage), disk_stale=dict(self.disk_stale),
+                       net_nics=dict(self.net_nics), temps=dict(self.temps))
+
+
+@dataclass(slots=True)
+class ProcessRecord:
+    pid: int
+    name: str
+    cpu: float = 0.0
+    ram: float = 0.0
+    disk: float = 0.0
+    exe: str = ""
+    # Identifica la instancia del proceso junto al pid (reutilización de PIDs)
+    start: float = 0.0
+    ppid: int = 0
+
+    def as_dict(self):
+        return {'pid': self.pid, 'name': self.name, 'cpu': self.cpu,
+                'ram': self.ram, 'disk': self.disk, 'exe': self.exe, 'ppid': self.ppid}
+
+
+@dataclass(slots=True)
+class ProcessSnapshot:
+    timestamp: float = 0.0
+    records: list = field(default_factory=list)
+
+    def as_dicts(self):
+        return [r.as_dict() for r in self.records]
@@ -0,0 +1,175 @@
+import abc
+
+import psutil
+
+from .diskprobe import DiskProbe
+
+NET_BLACKLIST = ['loopback', 'vethernet', 'wsl', 'vmware', 'virtualbox', 'adapter', 'pseudo', 'teredo']
+
+
+class Source(abc.ABC):
+    name = ""
+    # Segundos entre muestras; SystemCollector lo usa como plazo en su planificador
+    interval = 1.0
+
+    def open(self):
+        pass
+
+    @abc.abstractmethod
+    def sample(self, snap, dt):
+        pass
+
+    def close(self):
+        pass
+
+
+class WmiSession:
+    # Una sola conexión COM por hilo, compartida entre las fuentes que usan WMI
+    def __init__(self):
+        self.conn = None
+        self.opened = False
+
+    def get(self):
+        if not self.opened:
+            self.opened = True
+            try:
+                import pythoncom
+                import wmi
+                pythoncom.CoInitialize()
+                self.conn = wmi.WMI(namespace="root\\cimv2")
+            except:
+                self.conn = None
+        return self.conn
+
+
+class CpuSource(Source):
+    name = "cpu"
+
+    def open(self):
+        # cpu_percent(None) mide desde la llamada anterior: la primera fija la referencia
+        psutil.cpu_percent(interval=None)
+
+    def sample(self, snap, dt):
+        snap.cpu = psutil.cpu_percent(interval=None)
+        try:
+            freq = psutil.cpu_freq()
+            if freq:
+                val = freq.current if freq.current > 100 else freq.max
+                snap.cpu_extra = f"{val / 1000:.2f} GHz"
+        except:
+            pass
+
+
+class MemorySource(Source):
+    name = "ram"
+
+    def sample(self, snap, dt):
+        mem = psutil.virtual_memory()
+        snap.ram = mem.percent
+        used_gb = mem.used / (1024 ** 3)
+        total_gb = mem.total / (1024 ** 3)
+        snap.ram_extra = f"{used_gb:.1f} / {total_gb:.1f} GB"
+
+
+class NetSource(Source):
+    name = "net"
+
+    def __init__(self):
+        self.prev_net_per_nic = {}
+
+    def open(self):
+        self.prev_net_per_nic = psutil.net_io_counters(pernic=True)
+
+    def sample(self, snap, dt):
+        curr_net_per_nic = psutil.net_io_counters(pernic=True)
+        total_sent_delta = 0
+        total_recv_delta = 0
+        active_iface_name = "Ethernet"
+        max_activity = -1
+        nics = {}
+
+        for name, io in curr_net_per_nic.items():
+            if any(x in name.lower() for x in NET_BLACKLIST): continue
+            prev_io = self.prev_net_per_nic.get(name, io)
+            delta_s = io.bytes_sent - prev_io.bytes_sent
+            delta_r = io.bytes_recv - prev_io.bytes_recv
+            if delta_s < 0: delta_s = 0
+            if delta_r < 0: delta_r = 0
+            total_sent_delta += delta_s
+            total_recv_delta += delta_r
+            nics[name] = ((delta_s / dt) / (1024 ** 2), (delta_r / dt) / (1024 ** 2))
+            if (delta_s + delta_r) > max_activity:
+                max_activity = (delta_s + delta_r)
+                active_iface_name = name
+
+        self.prev_net_per_nic = curr_net_per_nic
+        snap.net_up = (total_sent_delta / dt) / (1024 ** 2)
+        snap.net_down = (total_recv_delta / dt) / (1024 ** 2)
+        snap.net_iface = active_iface_name
+        snap.net_nics = nics
+
+
+class WmiDiskIOSource(Source):
+    name = "disk_io"
+
+    def __init__(self, wmi_session):
+        self.wmi_session = wmi_session
+
+    def sample(self, snap, dt):
+        wmi_c = self.wmi_session.get()
+        if not wmi_c: return
+        try:
+            for i in wmi_c.Win32_PerfFormattedData_PerfDisk_LogicalDisk():
+                read_mb = int(i.DiskReadBytesPerSec) / (1024 ** 2)
+                write_mb = int(i.DiskWriteBytesPerSec) / (1024 ** 2)
+                snap.disk_io[i.Name] = (read_mb, write_mb)
+        except:
+            pass
+
+
+def list_partitions():
+    parts = []
+    try:
+        for p in psutil.disk_partitions(all=False):
+            if 'cdrom' in p.opts or p.fstype == '': continue
+            parts.append(p)
+    except:
+        pass
+    return parts
+
+
+class DiskUsageSource(Source):
+    # Consultar el DiskProbe no bloquea: cada montaje se refresca en su pool cada
+    # refresh_interval segundos y la lista de particiones solo cuando cambian los montajes
+    name = "disk_usage"
+
+    def __init__(self, probe=None, refresh_interval=30.0, timeout=2.0):
+        self.probe = probe
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+
+    def open(self):
+        if self.probe is None: self.probe = DiskProbe(refresh_interval=self.refresh_interval, timeout=self.timeout)
+        self.probe.prime()
+
+    def sample(self, snap, dt):
+        if self.probe is None: self.open()
+        snap.disk_usage, snap.disk_stale = self.probe.poll()
+
+    def close(self):
+        if self.probe is not None: self.probe.close()
+
+
+def default_sources(sensors=None):
+    # sensors: nombres de backends de sensores (collector.sensors.BACKENDS); None = todos
+    from .diskstats import DiskStatsSource, diskstats_available
+    from .sensors import SensorSource, default_registry
+    wmi_session = WmiSession()
+    return [
+        CpuSource(),
+        MemorySource(),
+        SensorSource(default_registry(wmi_session, sensors)),
+        NetSource(),
+        DiskStatsSource() if diskstats_available() else WmiDiskIOSource(wmi_session),
+        DiskUsageSource(),
+    ]
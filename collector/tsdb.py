@@ -0,0 +1,417 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+from .history import iter_metrics
+
+MAGIC = b"LSTS"
+VERSION = 1
+# magic, versión, tamaño de registro, capacidad, registros escritos (total), paso en segundos
+HEADER = struct.Struct("<4sIIIQd")
+WRITTEN_OFFSET = 16
+# tiempo, id de serie, media, mínimo, máximo
+RECORD = struct.Struct("<dIfff")
+
+# (paso en segundos, retención en segundos)
+DEFAULT_TIERS = ((1, 2 * 3600), (10, 24 * 3600), (60, 7 * 24 * 3600))
+# Series que se guardan a la vez: dimensiona la capacidad de cada nivel para que cada una
+# conserve la retención anunciada. Si hay más, se prefieren por series_rank
+DEFAULT_SERIES_BUDGET = 32
+# Segundos entre escrituras de series.json cuando aparecen series nuevas
+CATALOG_INTERVAL = 10.0
+
+
+def series_rank(name):
+    # Preferencia cuando no caben todas (menor gana): totales, discos, interfaces, sensores
+    if ':' not in name: return 0
+    if name.startswith('disk_'): return 1
+    if name.startswith('net_'): return 2
+    return 3
+
+
+def default_path():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "LeSYS", "history")
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "lesys", "history")
+
+
+class Tier:
+    # Fichero circular de registros de tamaño fijo mapeado en memoria. Escribir un punto es
+    # un pack_into sobre el mmap: sin syscalls, el sistema vuelca las páginas por su cuenta.
+    def __init__(self, path, step, capacity, readonly=False):
+        self.path = path
+        self.step = step
+        self.capacity = capacity
+        self.size = HEADER.size + capacity * RECORD.size
+        self.written = 0
+
+        exists = os.path.exists(path)
+        if exists and not readonly:
+            with open(path, "rb") as f: head = f.read(HEADER.size)
+            if len(head) < HEADER.size or HEADER.unpack(head)[:4] != (MAGIC, VERSION, RECORD.size, capacity) \
+                    or os.path.getsize(path) != self.size:
+                # Formato o capacidad distintos: se empieza de cero
+                exists = False
+        if not exists and not readonly:
+            with open(path, "wb") as f:
+                f.truncate(self.size)
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, capacity, 0, step))
+
+        self.f = open(path, "rb" if readonly else "r+b")
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+        magic, version, rec_size, cap, written, _ = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION or rec_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path}: formato desconocido")
+        self.capacity = cap
+        self.written = written
+
+    def append(self, t, sid, avg, lo, hi):
+        pos = HEADER.size + (self.written % self.capacity) * RECORD.size
+        RECORD.pack_into(self.mm, pos, t, sid, avg, lo, hi)
+        self.written += 1
+        struct.pack_into("<Q", self.mm, WRITTEN_OFFSET, self.written)
+
+    def put(self, i, t, sid, avg, lo, hi):
+        RECORD.pack_into(self.mm, HEADER.size + (i % self.capacity) * RECORD.size, t, sid, avg, lo, hi)
+
+    def tail(self, t):
+        # {id: índice} de los últimos registros con tiempo t
+        first, end = self.bounds()
+        out = {}
+        while end > first:
+            rec = RECORD.unpack_from(self.mm, HEADER.size + ((end - 1) % self.capacity) * RECORD.size)
+            if rec[0] != t: break
+            end -= 1
+            out.setdefault(rec[1], end)
+        return out
+
+    def refresh(self):
+        # Lectores de solo lectura: recoger lo que haya escrito otro proceso
+        self.written = struct.unpack_from("<Q", self.mm, WRITTEN_OFFSET)[0]
+
+    def _time_at(self, i):
+        return RECORD.unpack_from(self.mm, HEADER.size + (i % self.capacity) * RECORD.size)[0]
+
+    def bounds(self):
+        # Índices lógicos [first, end) de los registros conservados
+        end = self.written
+        return max(0, end - self.capacity), end
+
+    def oldest(self):
+        first, end = self.bounds()
+        return self._time_at(first) if end > first else None
+
+    def newest(self):
+        first, end = self.bounds()
+        return self._time_at(end - 1) if end > first else None
+
+    def scan(self, t0, t1):
+        # Los registros se añaden en orden temporal: búsqueda binaria del primero >= t0
+        lo, end = self.bounds()
+        hi = end
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._time_at(mid) < t0: lo = mid + 1
+            else: hi = mid
+        mm = self.mm
+        capacity = self.capacity
+        unpack_from = RECORD.unpack_from
+        for i in range(lo, end):
+            rec = unpack_from(mm, HEADER.size + (i % capacity) * RECORD.size)
+            if rec[0] > t1: break
+            yield rec
+
+    def flush(self):
+        try: self.mm.flush()
+        except: pass
+
+    def close(self):
+        try: self.mm.close()
+        except: pass
+        try: self.f.close()
+        except: pass
+
+
+class TimeSeriesStore:
+    # Historial persistente: el nivel de 1 s guarda cada muestra y los niveles más gruesos
+    # reciben agregados (media, mín, máx) al cerrarse cada cubo. Los nombres de serie se
+    # guardan en series.json con un id entero que es lo que va en cada registro; el catálogo
+    # se reescribe como mucho cada CATALOG_INTERVAL segundos y al cerrar, nunca por cada serie.
+    # Los niveles son anillos compartidos: solo se guardan `series_budget` series por sesión;
+    # si llega una más preferente (series_rank: totales y discos antes que interfaces y
+    # sensores) sustituye a la última admitida de la clase menos preferente, y si no, se
+    # descarta. Cada serie que se deja de guardar se avisa una vez por stderr.
+    def __init__(self, path=None, tiers=DEFAULT_TIERS, series_budget=DEFAULT_SERIES_BUDGET, readonly=False):
+        self.path = path or default_path()
+        self.readonly = readonly
+        if not readonly: os.makedirs(self.path, exist_ok=True)
+        self.lock_file = None
+        if not readonly and not self._lock():
+            # Otra instancia ya escribe aquí: esta solo lee
+            self.readonly = readonly = True
+
+        self.catalog_path = os.path.join(self.path, "series.json")
+        self.ids = {}
+        self._load_catalog()
+        self.catalog_dirty = False
+        self.catalog_saved = time.monotonic()
+        self.series_budget = series_budget
+        # sid -> series_rank de las series que se guardan en esta sesión (en orden de admisión)
+        self.active = {}
+        self.dropped = set()
+
+        self.tiers = []
+        for step, retention in tiers:
+            capacity = int(retention // step) * series_budget
+            self.tiers.append(Tier(os.path.join(self.path, f"tier_{step}s.dat"), step, capacity, readonly))
+        # Acumuladores de los niveles agregados: {id: [cubo, suma, n, mín, máx]} por nivel, y
+        # el cubo en curso de cada nivel
+        self.pending = [{} for _ in self.tiers[1:]]
+        self.buckets = [None for _ in self.tiers[1:]]
+        # Registros del último cubo guardado por close(): {id: índice} por nivel
+        self.reopened = [{} for _ in self.tiers[1:]]
+        if not readonly: self._reopen_buckets()
+        # La búsqueda binaria de Tier.scan necesita tiempos crecientes: si el reloj de pared
+        # retrocede, los registros se quedan en el último tiempo escrito hasta que lo alcance
+        self.last_t = self.tiers[0].newest() or 0.0
+
+    def _lock(self):
+        try:
+            self.lock_file = open(os.path.join(self.path, "lock"), "a+b")
+            if sys.platform == "win32":
+                import msvcrt
+                msvcrt.locking(self.lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except:
+            if self.lock_file: self.lock_file.close()
+            self.lock_file = None
+            return False
+
+    def _load_catalog(self):
+        try:
+            with open(self.catalog_path, encoding="utf-8") as f: self.ids = json.load(f)
+        except:
+            self.ids = {}
+        self.names = {sid: name for name, sid in self.ids.items()}
+
+    def series_id(self, name, create=False):
+        sid = self.ids.get(name)
+        if sid is None and create:
+            sid = len(self.ids)
+            self.ids[name] = sid
+            self.names[sid] = name
+            self.catalog_dirty = True
+        return sid
+
+    def series_names(self):
+        if self.readonly: self._load_catalog()
+        return list(self.ids)
+
+    def _reopen_buckets(self):
+        # close() guarda los cubos a medio llenar; al volver a abrir se rehacen con las muestras
+        # del nivel de 1 s y al cerrarse se reescriben en su sitio, así un reinicio dentro del
+        # mismo cubo no deja dos registros con el mismo tiempo
+        fine = self.tiers[0]
+        for i, tier in enumerate(self.tiers[1:]):
+            last = tier.newest()
+            if last is None: continue
+            self.reopened[i] = tier.tail(last)
+            pending = self.pending[i]
+            for t, sid, avg, lo, hi in fine.scan(last, last + tier.step):
+                if t >= last + tier.step: break
+                if sid not in self.reopened[i]: continue
+                acc = pending.get(sid)
+                if acc is None:
+                    pending[sid] = [int(last // tier.step), avg, 1, avg, avg]
+                else:
+                    acc[1] += avg
+                    acc[2] += 1
+                    if avg < acc[3]: acc[3] = avg
+                    if avg > acc[4]: acc[4] = avg
+            self.buckets[i] = int(last // tier.step)
+
+    def _warn(self, name, text):
+        if name in self.dropped: return
+        self.dropped.add(name)
+        print(f"historial: más de {self.series_budget} series, {text} {name}", file=sys.stderr, flush=True)
+
+    def admit(self, name):
+        # Id de la serie si se guarda en esta sesión; None si se descarta
+        sid = self.ids.get(name)
+        active = self.active
+        if sid is not None and sid in active: return sid
+        rank = series_rank(name)
+        if len(active) >= self.series_budget:
+            worst = max(active.values())
+            if worst <= rank:
+                self._warn(name, "no se guarda")
+                return None
+            victim = next(s for s in reversed(active) if active[s] == worst)
+            del active[victim]
+            self._warn(self.names[victim], "se deja de guardar")
+        sid = self.series_id(name, create=True)
+        active[sid] = rank
+        self.dropped.discard(name)
+        return sid
+
+    def append(self, name, t, value):
+        if self.readonly: return
+        sid = self.admit(name)
+        if sid is None: return
+        if t < self.last_t: t = self.last_t
+        else: self.last_t = t
+        value = float(value)
+        self.tiers[0].append(t, sid, value, value, value)
+        for i, (tier, pending) in enumerate(zip(self.tiers[1:], self.pending)):
+            bucket = int(t // tier.step)
+            if bucket != self.buckets[i]:
+                # Cubo nuevo: se cierran todos los anteriores (también los de series que ya no
+                # llegan) en orden, así los tiempos del nivel siguen siendo crecientes
+                self._close_buckets(i, bucket)
+                self.buckets[i] = bucket
+            acc = pending.get(sid)
+            if acc is None:
+                pending[sid] = [bucket, value, 1, value, value]
+            else:
+                acc[1] += value
+                acc[2] += 1
+                if value < acc[3]: acc[3] = value
+                if value > acc[4]: acc[4] = value
+
+    def _close_buckets(self, i, before=None):
+        tier = self.tiers[i + 1]
+        pending = self.pending[i]
+        reopened = self.reopened[i]
+        done = [(acc[0], sid) for sid, acc in pending.items() if before is None or acc[0] < before]
+        for bucket, sid in sorted(done):
+            acc = pending.pop(sid)
+            t = bucket * tier.step
+            pos = reopened.pop(sid, None) if bucket == self.buckets[i] else None
+            if pos is not None: tier.put(pos, t, sid, acc[1] / acc[2], acc[3], acc[4])
+            else: tier.append(t, sid, acc[1] / acc[2], acc[3], acc[4])
+        if before is not None: reopened.clear()
+
+    def record(self, data, t=None):
+        if self.readonly: return
+        if t is None: t = data.get('timestamp') or time.time()
+        append = self.append
+        for name, value in iter_metrics(data): append(name, t, value)
+        if self.catalog_dirty and time.monotonic() - self.catalog_saved >= CATALOG_INTERVAL: self.save_catalog()
+
+    def save_catalog(self):
+        self.catalog_dirty = False
+        self.catalog_saved = time.monotonic()
+        tmp = self.catalog_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(self.ids, f)
+        os.replace(tmp, self.catalog_path)
+
+    def pick_tier(self, t0, step=None):
+        if step is not None:
+            for tier in self.tiers:
+                if tier.step == step: return tier
+            raise ValueError(f"no hay nivel de {step} s")
+        # El nivel más fino que todavía conserva el inicio del rango (o que nunca ha dado la vuelta)
+        for tier in self.tiers:
+            if self.readonly: tier.refresh()
+            if tier.written <= tier.capacity: return tier
+            oldest = tier.oldest()
+            if oldest is not None and oldest <= t0: return tier
+        return self.tiers[-1]
+
+    def query(self, name, t0, t1=None, step=None):
+        # Lista de (t, media, mín, máx) de la serie entre t0 y t1 (segundos epoch)
+        return self.query_many((name,), t0, t1, step)[name]
+
+    def query_many(self, names, t0, t1=None, step=None):
+        # {nombre: [(t, media, mín, máx)]} de varias series con una sola pasada por el nivel
+        if t1 is None: t1 = time.time()
+        if self.readonly: self._load_catalog()
+        out = {name: [] for name in names}
+        wanted = {self.ids[name]: out[name] for name in names if name in self.ids}
+        if not wanted: return out
+        tier = self.pick_tier(t0, step)
+        if self.readonly: tier.refresh()
+        get = wanted.get
+        for t, s, avg, lo, hi in tier.scan(t0, t1):
+            rows = get(s)
+            if rows is not None: rows.append((t, avg, lo, hi))
+        return out
+
+    def flush(self):
+        for tier in self.tiers: tier.flush()
+
+    def close(self):
+        if not self.readonly:
+            # Los cubos a medio llenar se guardan con lo acumulado hasta ahora (y se rehacen al abrir)
+            for i in range(len(self.pending)): self._close_buckets(i)
+            if self.catalog_dirty:
+                try: self.save_catalog()
+                except: pass
+        self.flush()
+        for tier in self.tiers: tier.close()
+        if self.lock_file:
+            self.lock_file.close()
+            self.lock_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_store(path=None):
+    # None si el directorio no es utilizable: el monitor sigue sin historial persistente
+    try:
+        return TimeSeriesStore(path)
+    except:
+        return None
+
+
+def parse_span(text):
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    if text[-1:] in units: return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m collector.tsdb",
+                                     description="Consulta el historial persistente de LeSYS.")
+    parser.add_argument("series", nargs="?", help="nombre de la serie; sin él se listan las series")
+    parser.add_argument("--path", default=None)
+    parser.add_argument("--since", default="1h", help="inicio relativo a ahora: 90s, 15m, 3h, 2d")
+    parser.add_argument("--until", default="0s")
+    parser.add_argument("--step", type=int, default=None, help="nivel: 1, 10 o 60")
+    args = parser.parse_args(argv)
+
+    path = args.path or default_path()
+    if not os.path.exists(os.path.join(path, "tier_1s.dat")):
+        print(f"No hay historial en {path}", file=sys.stderr)
+        return 1
+    store = TimeSeriesStore(path, readonly=True)
+    try:
+        if not args.series:
+            for name in sorted(store.series_names()): print(name)
+            return 0
+        now = time.time()
+        rows = store.query(args.series, now - parse_span(args.since), now - parse_span(args.until), args.step)
+        print("time,avg,min,max")
+        for t, avg, lo, hi in rows:
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))},{avg:.3f},{lo:.3f},{hi:.3f}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
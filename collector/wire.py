@@ -0,0 +1,221 @@
+import struct
+import sys
+from array import array
+
+from .snapshot import ProcessRecord
+from .delta import ProcessDelta
+
+# Flujo binario: MAGIC y después tramas [tipo u8][longitud u32][carga]
+MAGIC = b"LSW2"
+FRAME = struct.Struct("<BI")
+# Longitud máxima de una trama: la longitud la envía el otro extremo y no se reserva más
+MAX_FRAME = 64 << 20
+HELLO, SYSTEM, PROCS, KEYFRAME_REQUEST, VISIBLE = 1, 2, 3, 4, 5
+
+SWAP = sys.byteorder != "little"
+
+_q = struct.Struct("<q")
+_d = struct.Struct("<d")
+_I = struct.Struct("<I")
+
+
+def pack_value(out, v):
+    # Codificación compacta de los valores de un snapshot: None, bool, int, float, str, list, dict
+    if v is None:
+        out += b"N"
+    elif v is True:
+        out += b"T"
+    elif v is False:
+        out += b"F"
+    elif isinstance(v, int):
+        out += b"i"
+        out += _q.pack(v)
+    elif isinstance(v, float):
+        out += b"d"
+        out += _d.pack(v)
+    elif isinstance(v, str):
+        b = v.encode("utf-8")
+        out += b"s"
+        out += _I.pack(len(b))
+        out += b
+    elif isinstance(v, (list, tuple)):
+        out += b"l"
+        out += _I.pack(len(v))
+        for item in v: pack_value(out, item)
+    elif isinstance(v, dict):
+        out += b"m"
+        out += _I.pack(len(v))
+        for k, item in v.items():
+            pack_value(out, k)
+            pack_value(out, item)
+    else:
+        pack_value(out, float(v))
+
+
+def unpack_value(buf, pos):
+    tag = buf[pos]
+    pos += 1
+    if tag == 0x64:  # d
+        return _d.unpack_from(buf, pos)[0], pos + 8
+    if tag == 0x69:  # i
+        return _q.unpack_from(buf, pos)[0], pos + 8
+    if tag == 0x73:  # s
+        n = _I.unpack_from(buf, pos)[0]
+        pos += 4
+        return bytes(buf[pos:pos + n]).decode("utf-8"), pos + n
+    if tag == 0x6d:  # m
+        n = _I.unpack_from(buf, pos)[0]
+        pos += 4
+        out = {}
+        for _ in range(n):
+            k, pos = unpack_value(buf, pos)
+            out[k], pos = unpack_value(buf, pos)
+        return out, pos
+    if tag == 0x6c:  # l
+        n = _I.unpack_from(buf, pos)[0]
+        pos += 4
+        out = []
+        for _ in range(n):
+            item, pos = unpack_value(buf, pos)
+            out.append(item)
+        return out, pos
+    if tag == 0x4e: return None, pos
+    if tag == 0x54: return True, pos
+    if tag == 0x46: return False, pos
+    raise ValueError(f"etiqueta desconocida {tag!r}")
+
+
+def frame(kind, payload):
+    return FRAME.pack(kind, len(payload)) + payload
+
+
+class SystemDeltaEncoder:
+    # Solo viajan las claves del dict de SystemSnapshot que cambiaron desde el último envío
+    def __init__(self):
+        self.last = None
+
+    def encode(self, data, keyframe=False):
+        last = self.last
+        if keyframe or last is None:
+            changed = data
+            keyframe = True
+        else:
+            changed = {k: v for k, v in data.items() if last.get(k) != v}
+        self.last = data
+        out = bytearray(b"K" if keyframe else b"D")
+        pack_value(out, changed)
+        return bytes(out)
+
+
+class SystemDeltaDecoder:
+    def __init__(self):
+        self.state = {}
+
+    def decode(self, payload):
+        changed, _ = unpack_value(payload, 1)
+        if payload[:1] == b"K": self.state = {}
+        self.state.update(changed)
+        return dict(self.state)
+
+
+_HEAD = struct.Struct("<qdBIII")
+_REC = struct.Struct("<qqdddd")
+# Altas de LSW1/LSR1, sin ppid
+_REC_V1 = struct.Struct("<qdddd")
+
+
+def _raw(a):
+    if SWAP:
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def _arr(typecode, data):
+    a = array(typecode)
+    a.frombytes(data)
+    if SWAP: a.byteswap()
+    return a
+
+
+def encode_process_delta(delta):
+    # Cabecera, luego los arrays planos tal cual (bajas, PIDs cambiados, cpu/ram/disk) y las altas.
+    # `span` no viaja: solo se funden deltas en el buzón del receptor, ya decodificados
+    if delta.span != 1: raise ValueError("un delta fundido (span > 1) no se puede codificar")
+    out = bytearray(_HEAD.pack(delta.seq, delta.timestamp, delta.keyframe, len(delta.added),
+                               len(delta.removed), len(delta.changed_pids)))
+    out += _raw(delta.removed)
+    out += _raw(delta.changed_pids)
+    out += _raw(delta.changed)
+    for r in delta.added:
+        out += _REC.pack(r.pid, r.ppid, r.start, r.cpu, r.ram, r.disk)
+        name = r.name.encode("utf-8")
+        exe = (r.exe or "").encode("utf-8")
+        out += _I.pack(len(name))
+        out += name
+        out += _I.pack(len(exe))
+        out += exe
+    return bytes(out)
+
+
+def decode_process_delta(payload, version=2):
+    seq, ts, keyframe, n_added, n_removed, n_changed = _HEAD.unpack_from(payload, 0)
+    delta = ProcessDelta(seq, ts, bool(keyframe))
+    pos = _HEAD.size
+    delta.removed = _arr('q', payload[pos:pos + 8 * n_removed])
+    pos += 8 * n_removed
+    delta.changed_pids = _arr('q', payload[pos:pos + 8 * n_changed])
+    pos += 8 * n_changed
+    delta.changed = _arr('d', payload[pos:pos + 24 * n_changed])
+    pos += 24 * n_changed
+    added = delta.added
+    rec = _REC if version >= 2 else _REC_V1
+    ppid = 0
+    for _ in range(n_added):
+        if version >= 2:
+            pid, ppid, start, cpu, ram, disk = rec.unpack_from(payload, pos)
+        else:
+            pid, start, cpu, ram, disk = rec.unpack_from(payload, pos)
+        pos += rec.size
+        n = _I.unpack_from(payload, pos)[0]
+        pos += 4
+        name = bytes(payload[pos:pos + n]).decode("utf-8", "replace")
+        pos += n
+        n = _I.unpack_from(payload, pos)[0]
+        pos += 4
+        exe = bytes(payload[pos:pos + n]).decode("utf-8", "replace")
+        pos += n
+        added.append(ProcessRecord(pid, name, cpu, ram, disk, exe, start, ppid))
+    return delta
+
+
+def keyframe_delta(seq, timestamp, records):
+    # Keyframe sintético con el estado completo, numerado como el último delta emitido
+    delta = ProcessDelta(seq, timestamp, True)
+    delta.added = list(records)
+    return delta
+
+
+class FrameReader:
+    # Lee tramas completas de un socket o de un fichero binario; una longitud mayor que
+    # max_frame es un error (quien llama cierra la conexión)
+    def __init__(self, read, max_frame=MAX_FRAME):
+        self.read = read
+        self.max_frame = max_frame
+
+    def read_exact(self, n):
+        chunks = []
+        while n:
+            chunk = self.read(n)
+            if not chunk: raise EOFError
+            chunks.append(chunk)
+            n -= len(chunk)
+        return b"".join(chunks)
+
+    def read_magic(self):
+        if self.read_exact(len(MAGIC)) != MAGIC: raise ValueError("flujo LeSYS no reconocido")
+
+    def next(self):
+        kind, length = FRAME.unpack(self.read_exact(FRAME.size))
+        if length > self.max_frame: raise ValueError(f"trama de {length} bytes (máximo {self.max_frame})")
+        return kind, self.read_exact(length) if length else b""
@@ -31,6 +31,37 @@ THEMES = {
 
 active_theme = THEMES["Dark"]
 
+# Historial de métricas en memoria (segundos; una muestra cada UI_INTERVAL) y ventanas
+# seleccionables de los gráficos, también en segundos
+HISTORY_RETENTION = 3600
+# Segundos entre muestras por fuente (vacío: el intervalo propio de cada fuente, p. ej.
+# disk_usage cada 30 s) y cadencia de emisión hacia la interfaz
+SAMPLE_INTERVALS = {}
+UI_INTERVAL = 1.0
+# Arranque: el primer snapshot llega antes para cerrar el splash cuanto antes; si no llega en
+# STARTUP_TIMEOUT segundos la ventana se muestra igualmente
+FIRST_SAMPLE_DELAY = 0.25
+STARTUP_TIMEOUT = 3.0
+# Backends de sensores a probar (nvml, sysfs, hwmon, wmi, null); None prueba todos
+SENSOR_BACKENDS = None
+PROCESS_INTERVAL = 2.0
+# Ventana minimizada u oculta: se detiene el escaneo de procesos (salvo al grabar)
+PAUSE_HIDDEN = True
+# Ventana oculta: discos y sensores (GPU, temperaturas) se muestrean este número de veces más
+# despacio; CPU, RAM y red siguen cada segundo para el historial. 1 no cambia nada
+HIDDEN_SLOWDOWN = 5
+# Tabla de procesos como árbol padre/hijo (PPID) en lugar de agrupada por nombre
+PROCESS_HIERARCHY = False
+# Historial en disco (collector.tsdb); None usa el directorio de datos del usuario
+HISTORY_PERSIST = True
+HISTORY_PATH = None
+GRAPH_WINDOWS = [("1 min", 60), ("5 min", 300), ("15 min", 900), ("1 h", 3600)]
+# Iconos de la tabla de procesos: rutas en memoria (LRU) y caché PNG en disco junto al historial
+ICON_CACHE_SIZE = 256
+ICON_DISK_CACHE = True
+# Panel de diagnóstico (F12) visible al arrancar; oculto, la instrumentación no mide nada
+DEBUG_OVERLAY = False
+
 
 def get_stylesheet(theme):
     return f"""
@@ -43,6 +74,9 @@ def get_stylesheet(theme):
         QLabel#Value {{ font-size: 26px; font-weight: bold; color: {theme['text_main']}; }}
         QLabel#HeaderTitle {{ font-size: 22px; font-weight: 800; color: {theme['text_main']}; letter-spacing: 1px; }}
 
+        QLineEdit#Filter {{ background-color: {theme['bg_card']}; border: 1px solid {theme['border']}; border-radius: 6px; padding: 4px 8px; font-size: 12px; }}
+        QLineEdit#Filter:focus {{ border: 1px solid {theme['accent_blue']}; }}
+
         QProgressBar {{ border: none; background-color: {theme['bar_bg']}; border-radius: 4px; height: 6px; text-align: center; }}
         QPushButton {{ background-color: transparent; border: none; border-radius: 6px; color: {theme['text_dim']}; font-size: 16px; padding: 4px; }}
         QPushButton:hover {{ background-color: {theme['btn_hover']}; color: {theme['text_main']}; }}
@@ -57,7 +91,7 @@ def get_stylesheet(theme):
         QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{ height: 0px; }}
         QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {{ background: none; }}
 
-        QTreeWidget {{
+        QTreeView {{
             background-color: {theme['bg_card']};
             border: 1px solid {theme['border']};
             border-radius: 8px;
@@ -65,14 +99,14 @@ def get_stylesheet(theme):
             outline: none;
         }}
         /* Padding horizontal para que el texto no toque los bordes al alinear */
-        QTreeWidget::item {{ 
+        QTreeView::item {{ 
             padding: 4px; 
             padding-left: 5px; 
             padding-right: 5px; 
             border-bottom: 1px solid {theme['grid_line']}; 
         }}
-        QTreeWidget::item:hover {{ background-color: {theme['btn_hover']}; }}
-        QTreeWidget::item:selected {{ background-color: {theme['menu_sel']}; color: {theme['text_main']}; }}
+        QTreeView::item:hover {{ background-color: {theme['btn_hover']}; }}
+        QTreeView::item:selected {{ background-color: {theme['menu_sel']}; color: {theme['text_main']}; }}
 
         QHeaderView::section {{
             background-color: {theme['bg_main']};
@@ -0,0 +1,90 @@
+from PySide6.QtWidgets import QWidget, QLabel, QVBoxLayout, QHBoxLayout, QComboBox, QStackedWidget
+from PySide6.QtCore import Signal
+
+import config
+from remote import RemoteWorker
+from window import MonitorFinal
+
+
+class HostsWindow(QWidget):
+    # Varias máquinas en una ventana: un MonitorFinal por agente, alimentado por su RemoteWorker,
+    # y un selector con el estado y la CPU/RAM de cada host. Cada host tiene su propio hilo y su
+    # propio enlace, así que uno lento o caído no afecta a los demás.
+    first_data = Signal()
+    first_paint = Signal()
+
+    def __init__(self, addresses):
+        super().__init__()
+        self.got_data = False
+        self.painted = False
+        self.setWindowTitle("LeSYS")
+        self.resize(1450, 720)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 10, 0, 0)
+        layout.setSpacing(0)
+        bar = QHBoxLayout()
+        bar.setContentsMargins(20, 0, 20, 0)
+        bar.addWidget(QLabel("HOSTS", objectName="HeaderTitle"))
+        self.selector = QComboBox()
+        self.selector.setMinimumWidth(380)
+        bar.addWidget(self.selector)
+        bar.addStretch()
+        layout.addLayout(bar)
+        self.stack = QStackedWidget()
+        layout.addWidget(self.stack, stretch=1)
+
+        self.hosts = []
+        for i, address in enumerate(addresses):
+            worker = RemoteWorker(address)
+            host = {'address': address, 'name': address, 'connected': False, 'data': None}
+            self.hosts.append(host)
+            self.selector.addItem(self.describe(host))
+            worker.hello_signal.connect(lambda hello, i=i: self.on_hello(i, hello))
+            worker.status_signal.connect(lambda ok, i=i: self.on_status(i, ok))
+            worker.data_signal.connect(lambda data, i=i: self.on_data(i, data))
+            monitor = MonitorFinal(feed=worker, title=address)
+            monitor.first_data.connect(self.on_first_data)
+            monitor.first_paint.connect(self.on_first_paint)
+            host['worker'] = worker
+            host['monitor'] = monitor
+            self.stack.addWidget(monitor)
+        self.selector.currentIndexChanged.connect(self.stack.setCurrentIndex)
+        self.setStyleSheet(config.get_stylesheet(config.active_theme))
+
+    def describe(self, host):
+        if not host['connected']: return f"{host['name']}  ·  desconectado"
+        data = host['data']
+        if data is None: return f"{host['name']}  ·  conectando…"
+        return f"{host['name']}  ·  CPU {data.get('cpu', 0):.0f}%  ·  RAM {data.get('ram', 0):.0f}%"
+
+    def refresh_item(self, i):
+        self.selector.setItemText(i, self.describe(self.hosts[i]))
+
+    def on_hello(self, i, hello):
+        self.hosts[i]['name'] = f"{hello.get('host', '?')} ({self.hosts[i]['address']})"
+        self.refresh_item(i)
+
+    def on_status(self, i, ok):
+        host = self.hosts[i]
+        host['connected'] = ok
+        if not ok: host['data'] = None
+        self.refresh_item(i)
+
+    def on_data(self, i, data):
+        self.hosts[i]['data'] = data
+        self.refresh_item(i)
+
+    def on_first_data(self):
+        if self.got_data: return
+        self.got_data = True
+        self.first_data.emit()
+
+    def on_first_paint(self):
+        if self.painted: return
+        self.painted = True
+        self.first_paint.emit()
+
+    def closeEvent(self, event):
+        for host in self.hosts: host['worker'].stop()
+        super().closeEvent(event)
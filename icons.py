@@ -0,0 +1,183 @@
+import hashlib
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+from PySide6.QtCore import QObject, QFileInfo, QTimer, Signal
+from PySide6.QtGui import QIcon, QImage, QPixmap
+from PySide6.QtWidgets import QFileIconProvider
+
+import config
+from collector.tsdb import default_path
+
+ICON_SIZE = 20
+# Ficheros en la caché de disco; al superarlo se borran los más antiguos
+DISK_CAPACITY = 1024
+
+
+def default_cache_dir():
+    return os.path.join(os.path.dirname(default_path()), "icons")
+
+
+def image_digest(image):
+    return hashlib.blake2b(bytes(image.constBits()), digest_size=16).hexdigest()
+
+
+class IconService(QObject):
+    # Iconos de ejecutables para la tabla de procesos sin bloquear la interfaz: icon() devuelve
+    # al momento el de la caché o un icono genérico y encarga el real; `ready` avisa (agrupado)
+    # cuando llegan. El hilo de fondo hace el stat, lee la caché de disco (PNG por ruta + mtime)
+    # y guarda los nuevos. QFileIconProvider devuelve QIcon/QPixmap, que solo se pueden crear en
+    # el hilo de la interfaz: los fallos se resuelven ahí en tandas de `budget_ms` por vuelta del
+    # bucle de eventos. En memoria, LRU de `capacity` rutas; imágenes idénticas (el icono
+    # genérico de casi todos los binarios) comparten un solo QIcon.
+    loaded = Signal(str, object, str)
+    ready = Signal()
+
+    def __init__(self, capacity=256, cache_dir=None, budget_ms=4.0):
+        super().__init__()
+        self.capacity = capacity
+        self.cache_dir = cache_dir
+        self.budget = budget_ms / 1000
+        self.provider = QFileIconProvider()
+        self.placeholder = self.provider.icon(QFileIconProvider.File)
+        # ruta -> digest; digest -> [QIcon, referencias]
+        self.cache = OrderedDict()
+        self.images = {}
+        self.pending = set()
+        self.misses = deque()
+        self.stats_counts = {'hits': 0, 'requests': 0, 'disk_hits': 0, 'resolved': 0, 'evicted': 0}
+        self.requests = queue.Queue()
+        self.loaded.connect(self.on_loaded)
+        self.slice_timer = QTimer(self)
+        self.slice_timer.setSingleShot(True)
+        self.slice_timer.timeout.connect(self.resolve_slice)
+        self.notify_timer = QTimer(self)
+        self.notify_timer.setSingleShot(True)
+        self.notify_timer.timeout.connect(self.ready.emit)
+        self.thread = threading.Thread(target=self.run, name="icons", daemon=True)
+        self.thread.start()
+
+    def icon(self, path):
+        digest = self.cache.get(path)
+        if digest is not None:
+            self.cache.move_to_end(path)
+            self.stats_counts['hits'] += 1
+            return self.images[digest][0]
+        if path not in self.pending:
+            self.pending.add(path)
+            self.stats_counts['requests'] += 1
+            self.requests.put(('load', path, None))
+        return self.placeholder
+
+    def store(self, path, image, digest):
+        entry = self.images.get(digest)
+        if entry is None:
+            icon = QIcon(QPixmap.fromImage(image)) if image is not None else self.placeholder
+            entry = self.images[digest] = [icon, 0]
+        entry[1] += 1
+        old = self.cache.pop(path, None)
+        if old is not None: self.release(old)
+        self.cache[path] = digest
+        self.pending.discard(path)
+        while len(self.cache) > self.capacity:
+            _, evicted = self.cache.popitem(last=False)
+            self.release(evicted)
+            self.stats_counts['evicted'] += 1
+        if not self.notify_timer.isActive(): self.notify_timer.start(50)
+
+    def release(self, digest):
+        entry = self.images[digest]
+        entry[1] -= 1
+        if entry[1] <= 0: del self.images[digest]
+
+    def on_loaded(self, path, image, key):
+        # Respuesta del hilo: imagen de la caché de disco o fallo a resolver aquí
+        if image is not None:
+            self.stats_counts['disk_hits'] += 1
+            self.store(path, image, image_digest(image))
+            return
+        self.misses.append((path, key))
+        if not self.slice_timer.isActive(): self.slice_timer.start(0)
+
+    def resolve_slice(self):
+        t0 = time.perf_counter()
+        while self.misses and time.perf_counter() - t0 < self.budget:
+            path, key = self.misses.popleft()
+            try:
+                image = self.provider.icon(QFileInfo(path)).pixmap(ICON_SIZE, ICON_SIZE).toImage()
+            except:
+                image = QImage()
+            self.stats_counts['resolved'] += 1
+            if image.isNull():
+                self.store(path, None, "")
+                continue
+            self.store(path, image, image_digest(image))
+            if key and self.cache_dir: self.requests.put(('save', key, image))
+        if self.misses: self.slice_timer.start(0)
+
+    def run(self):
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self.prune()
+            except:
+                self.cache_dir = None
+        saved = 0
+        while True:
+            op, arg, image = self.requests.get()
+            if op == 'load':
+                self.load(arg)
+            elif op == 'save':
+                try:
+                    image.save(os.path.join(self.cache_dir, arg + ".png"), "PNG")
+                    saved += 1
+                    if saved % 64 == 0: self.prune()
+                except:
+                    pass
+
+    def load(self, path):
+        key = ""
+        if self.cache_dir:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except:
+                mtime = None
+            # Sin stat (ruta remota, sin permisos) no hay clave fiable: no se guarda en disco
+            if mtime is not None:
+                key = hashlib.blake2b(f"{path}\0{mtime}".encode(), digest_size=16).hexdigest()
+                file = os.path.join(self.cache_dir, key + ".png")
+                if os.path.exists(file):
+                    image = QImage(file)
+                    if not image.isNull():
+                        self.loaded.emit(path, image, key)
+                        return
+        self.loaded.emit(path, None, key)
+
+    def prune(self):
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".png"): files.append((entry.stat().st_mtime, entry.path))
+        if len(files) <= DISK_CAPACITY: return
+        files.sort()
+        for _, path in files[:len(files) - DISK_CAPACITY]:
+            try: os.remove(path)
+            except: pass
+
+    def stats(self):
+        out = dict(self.stats_counts)
+        out.update(cached=len(self.cache), images=len(self.images), pending=len(self.pending))
+        return out
+
+
+_service = None
+
+
+def icon_service():
+    # Una por aplicación: la comparten las ventanas de HostsWindow
+    global _service
+    if _service is None:
+        _service = IconService(config.ICON_CACHE_SIZE, default_cache_dir() if config.ICON_DISK_CACHE else None)
+    return _service
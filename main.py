@@ -1,237 +1,141 @@
 import sys
-import psutil
-import gc
+import time
+
+T0 = time.perf_counter()
+
+import argparse
 import os
 
-from PySide6.QtWidgets import (QApplication, QWidget, QLabel, QVBoxLayout,
-                               QHBoxLayout, QFrame, QPushButton, QMenu)
-from PySide6.QtCore import Qt, QSize, QPoint, QTimer
-from PySide6.QtGui import QAction, QIcon, QPainter, QColor
-
-import config
-from workers import WorkerThread, ProcessWorker
-from widgets import HardwareRow, NetworkRow, DiskRow, ProcessTree
-from splash import SplashScreen
-
-
-class MonitorFinal(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("LeSYS")
-        self.resize(1450, 680)
-        self.use_bits = False
-        self.is_dark = True
-
-        self.main_layout = QHBoxLayout()
-        self.main_layout.setSpacing(20)
-        self.main_layout.setContentsMargins(20, 20, 20, 20)
-        self.setLayout(self.main_layout)
-
-        self.left_container = QWidget()
-        self.left_layout = QVBoxLayout(self.left_container)
-        self.left_layout.setContentsMargins(0, 0, 0, 0)
-        self.left_layout.setSpacing(10)
-
-        h_box = QHBoxLayout()
-        h_box.addWidget(QLabel("PERFORMANCE", objectName="HeaderTitle"))
-        h_box.addStretch()
-        self.left_layout.addLayout(h_box)
-
-        self.row_cpu = HardwareRow("CPU")
-        self.left_layout.addWidget(self.row_cpu)
-        self.row_ram = HardwareRow("RAM")
-        self.left_layout.addWidget(self.row_ram)
-        self.row_gpu = HardwareRow("GPU")
-        self.left_layout.addWidget(self.row_gpu)
-        self.row_net = NetworkRow()
-        self.left_layout.addWidget(self.row_net)
-
-        self.disk_frame = QFrame()
-        self.disk_frame.setObjectName("Card")
-        self.d_layout = QVBoxLayout()
-        self.d_layout.setContentsMargins(15, 10, 15, 10)
-        self.d_layout.addWidget(QLabel("STORAGE", objectName="Title"))
-
-        header_disk = QHBoxLayout()
-        header_disk.setContentsMargins(0, 5, 0, 0)
-        header_disk.setSpacing(10)
-
-        lbl_h_dev = QLabel("DRIVE")
-        lbl_h_dev.setObjectName("HeaderCol")
-        lbl_h_dev.setFixedWidth(35)
-        lbl_h_use = QLabel("USAGE")
-        lbl_h_use.setObjectName("HeaderCol")
-        lbl_h_pct = QLabel("%")
-        lbl_h_pct.setObjectName("HeaderCol")
-        lbl_h_pct.setFixedWidth(40)
-        lbl_h_pct.setAlignment(Qt.AlignRight)
-
-        lbl_h_read = QLabel("READ")
-        lbl_h_read.setObjectName("HeaderCol")
-        lbl_h_read.setFixedWidth(85)
-        lbl_h_read.setAlignment(Qt.AlignRight)
-        lbl_h_write = QLabel("WRITE")
-        lbl_h_write.setObjectName("HeaderCol")
-        lbl_h_write.setFixedWidth(85)
-        lbl_h_write.setAlignment(Qt.AlignRight)
-
-        header_disk.addWidget(lbl_h_dev)
-        header_disk.addWidget(lbl_h_use, stretch=1)
-        header_disk.addWidget(lbl_h_pct)
-        header_disk.addWidget(lbl_h_read)
-        header_disk.addWidget(lbl_h_write)
-
-        self.d_layout.addLayout(header_disk)
-        self.d_layout.addWidget(QLabel("", styleSheet="border-top: 1px solid #3C4043; margin-bottom: 5px;"))
-
-        self.disks = {}
-        for p in psutil.disk_partitions():
-            if 'cdrom' in p.opts or p.fstype == '': continue
-            try:
-                psutil.disk_usage(p.mountpoint)
-                l = p.device.rstrip("\\")
-                r = DiskRow(l)
-                self.d_layout.addWidget(r)
-                self.disks[l] = r
-            except:
-                pass
-        self.d_layout.addStretch()
-        self.disk_frame.setLayout(self.d_layout)
-        self.left_layout.addWidget(self.disk_frame, stretch=1)
-
-        self.main_layout.addWidget(self.left_container, stretch=1)
-
-        self.right_container = QFrame()
-        self.right_layout = QVBoxLayout(self.right_container)
-        self.right_layout.setContentsMargins(0, 0, 0, 0)
-        self.right_layout.setSpacing(10)
-
-        right_header = QHBoxLayout()
-        right_header.addWidget(QLabel("PROCESSES", objectName="HeaderTitle"))
-        right_header.addStretch()
-
-        self.btn_opts = QPushButton()
-        self.btn_opts.setCursor(Qt.PointingHandCursor)
-        self.btn_opts.setFixedSize(30, 30)
-        self.btn_opts.setIconSize(QSize(20, 20))
-
-        self.menu = QMenu(self)
-        self.act_unit = QAction("Switch to Kbps/Mbps", self, checkable=True)
-        self.act_unit.triggered.connect(self.toggle_unit)
-        self.act_theme = QAction("Light Mode", self, checkable=True)
-        self.act_theme.triggered.connect(self.toggle_theme)
-        self.menu.addAction(self.act_unit)
-        self.menu.addAction(self.act_theme)
-
-        self.btn_opts.clicked.connect(lambda: self.menu.exec(self.btn_opts.mapToGlobal(QPoint(0, 30))))
-        right_header.addWidget(self.btn_opts)
-
-        self.right_layout.addLayout(right_header)
-
-        self.proc_table = ProcessTree()
-        self.right_layout.addWidget(self.proc_table)
-
-        self.main_layout.addWidget(self.right_container, stretch=1.3)
-
-        self.apply_stylesheet()
-        self.refresh_settings_icon()
-
-        gc.collect()
-
-        self.worker = WorkerThread()
-        self.worker.data_signal.connect(self.update_ui)
-        self.worker.start()
-
-        self.proc_worker = ProcessWorker()
-        self.proc_worker.processes_signal.connect(self.proc_table.update_data)
-        self.proc_worker.start()
-
-    def get_icon_path(self):
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        return os.path.join(base_dir, "assets", "icon-ajustes.png")
-
-    def refresh_settings_icon(self):
-        try:
-            path = self.get_icon_path()
-            pixmap = QIcon(path).pixmap(QSize(20, 20))
-            if pixmap.isNull(): return
-            color = QColor(config.active_theme["text_dim"])
-            painter = QPainter(pixmap)
-            painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
-            painter.fillRect(pixmap.rect(), color)
-            painter.end()
-            self.btn_opts.setIcon(QIcon(pixmap))
-        except:
-            pass
-
-    def toggle_unit(self, checked):
-        self.use_bits = checked
-        self.row_net.set_unit(checked)
-        for d in self.disks.values(): d.set_unit(checked)
-
-    def toggle_theme(self, checked):
-        self.is_dark = not checked
-        config.active_theme = config.THEMES["Dark"] if self.is_dark else config.THEMES["Light"]
-        self.act_theme.setText("Dark Mode" if checked else "Light Mode")
-        self.apply_stylesheet()
-        for d in self.disks.values(): d.refresh_theme_colors()
-        self.row_net.update_style_imm()
-        self.refresh_settings_icon()
-        self.repaint()
-
-    def apply_stylesheet(self):
-        self.setStyleSheet(config.get_stylesheet(config.active_theme))
-
-    def update_ui(self, data):
-        self.row_cpu.update_val(data['cpu'], data.get('cpu_extra', ''))
-        self.row_ram.update_val(data['ram'], data.get('ram_extra', ''))
-        self.row_gpu.update_val(data['gpu'], data.get('gpu_extra', ''))
-        self.row_net.update_net(data['net_down'], data['net_up'], data.get('net_iface', ''))
-
-        total_read = 0
-        total_write = 0
-        if 'disk_io' in data:
-            for k, v in data['disk_io'].items():
-                total_read += v[0]
-                total_write += v[1]
-
-        for name, row in self.disks.items():
-            if name in data['disk_usage']:
-                usage = data['disk_usage'][name]
-                try:
-                    spec_io = data['disk_io'].get(name)
-                    if spec_io:
-                        row.update_state(usage, spec_io[0], spec_io[1])
-                    else:
-                        row.update_state(usage, total_read, total_write)
-                except:
-                    row.update_state(usage, total_read, total_write)
 
+class StartupTrace:
+    # --startup-trace: tiempos de cada etapa del arranque en stderr, relativos al inicio de main.py
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.last = T0
+
+    def mark(self, stage):
+        if not self.enabled: return
+        now = time.perf_counter()
+        print(f"[startup] {(now - T0) * 1000:8.1f} ms  (+{(now - self.last) * 1000:7.1f})  {stage}",
+              file=sys.stderr, flush=True)
+        self.last = now
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="LeSYS", description="Monitor de sistema LeSYS.")
+    parser.add_argument("--startup-trace", action="store_true",
+                        help="imprimir en stderr los tiempos de importación, construcción y primer pintado")
+    parser.add_argument("--headless", action="store_true", help="sin interfaz (no crea QApplication)")
+    parser.add_argument("--export", metavar="[HOST]:PUERTO",
+                        help="servir /metrics en formato Prometheus/OpenMetrics (con --headless)")
+    parser.add_argument("--top", type=int, default=20, help="grupos de procesos exportados por CPU y por RAM")
+    parser.add_argument("--agent", metavar="[HOST]:PUERTO|unix:RUTA",
+                        help="modo agente sin interfaz: enviar los snapshots a los clientes conectados")
+    parser.add_argument("--connect", metavar="[HOST]:PUERTO|unix:RUTA", action="append",
+                        help="mostrar un agente remoto (se puede repetir para varias máquinas)")
+    parser.add_argument("--record", metavar="FICHERO", help="grabar los snapshots de sistema y procesos mostrados")
+    parser.add_argument("--replay", metavar="FICHERO", help="reproducir una grabación en lugar de muestrear")
+    parser.add_argument("--speed", type=float, default=1.0, help="velocidad de --replay (2 = el doble, 0 = máxima)")
+    parser.add_argument("--loop", action="store_true", help="repetir la grabación al terminar")
+    args = parser.parse_args(argv)
+    if args.headless and not args.export: parser.error("--headless necesita --export [HOST]:PUERTO")
+    if args.export and not args.headless: parser.error("--export solo funciona con --headless")
+    if args.agent and args.connect: parser.error("--agent y --connect no se pueden combinar")
+    if args.replay and (args.connect or args.record): parser.error("--replay no se combina con --connect ni --record")
+    if args.record and args.connect: parser.error("--record solo graba la máquina local")
+    return args
+
+
+def run_headless(args):
+    import config
+    from collector.exporter import serve
+    return serve(args.export, interval=config.UI_INTERVAL, top=args.top)
+
+
+def run_agent(args):
+    import config
+    from collector.agent import serve
+    return serve(args.agent, interval=config.UI_INTERVAL, process_interval=config.PROCESS_INTERVAL)
+
+
+def run_gui(args):
+    trace = StartupTrace(args.startup_trace)
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QTimer
+    from PySide6.QtGui import QIcon
+    trace.mark("import Qt")
 
-if __name__ == "__main__":
     app = QApplication(sys.argv)
-
     base_dir = os.path.dirname(os.path.abspath(__file__))
-    app_icon_path = os.path.join(base_dir, "assets", "logo.png")
-    app.setWindowIcon(QIcon(app_icon_path))
+    app.setWindowIcon(QIcon(os.path.join(base_dir, "assets", "logo.png")))
 
+    from splash import SplashScreen
     splash = SplashScreen()
     splash.show()
-    main_window = None
+    app.processEvents()
+    trace.mark("splash visible")
 
+    state = {'window': None, 'shown': False}
 
-    def start_main_app():
-        global main_window
-        main_window = MonitorFinal()
-        splash_geo = splash.geometry()
+    def show_window():
+        # Primer snapshot pintado (o tiempo agotado): se muestra la ventana centrada
+        window = state['window']
+        if window is None or state['shown']: return
+        state['shown'] = True
+        trace.mark("primer snapshot" if window.got_data else "sin datos a tiempo: se muestra igualmente")
         screen_geo = app.primaryScreen().geometry()
-        x = (screen_geo.width() - main_window.width()) // 2
-        y = (screen_geo.height() - main_window.height()) // 2
-        main_window.move(x, y)
+        x = (screen_geo.width() - window.width()) // 2
+        y = (screen_geo.height() - window.height()) // 2
+        window.move(x, y)
+        window.show()
 
-        main_window.show()
+    def on_first_paint():
+        trace.mark("primer pintado")
         splash.close()
 
+    def build_window():
+        # Con el splash ya en pantalla: importar y construir la ventana; los workers arrancan
+        # en el constructor y el primer snapshot llega en config.FIRST_SAMPLE_DELAY
+        import config
+        if args.connect:
+            from hosts import HostsWindow
+            trace.mark("import hosts")
+            window = HostsWindow(args.connect)
+            trace.mark("HostsWindow()")
+        elif args.replay:
+            from window import MonitorFinal
+            from replay import ReplayFeed
+            trace.mark("import window")
+            feed = ReplayFeed(args.replay, speed=args.speed, loop=args.loop)
+            feed.finished.connect(lambda: print(f"[replay] {feed.emitted} registros en {feed.elapsed:.2f} s",
+                                                file=sys.stderr, flush=True))
+            window = MonitorFinal(feed=feed, title=f"LeSYS — {os.path.basename(args.replay)}")
+            trace.mark("MonitorFinal()")
+        else:
+            from window import MonitorFinal
+            trace.mark("import window")
+            recorder = None
+            if args.record:
+                from collector.recording import Recorder
+                recorder = Recorder(args.record)
+                app.aboutToQuit.connect(recorder.close)
+            window = MonitorFinal(recorder=recorder)
+            trace.mark("MonitorFinal()")
+        state['window'] = window
+        window.first_data.connect(show_window)
+        window.first_paint.connect(on_first_paint)
+        QTimer.singleShot(int(config.STARTUP_TIMEOUT * 1000), show_window)
+
+    QTimer.singleShot(0, build_window)
+    return app.exec()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.agent: return run_agent(args)
+    if args.headless: return run_headless(args)
+    return run_gui(args)
+
 
-    QTimer.singleShot(4500, start_main_app)
-    sys.exit(app.exec())
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+from PySide6.QtCore import Qt, QAbstractItemModel, QModelIndex
+from PySide6.QtGui import QBrush, QColor, QFont
+
+import config
+from icons import icon_service
+from utils import format_decimal
+
+COLUMNS = ["NAME", "PID", "CPU", "RAM", "DISK"]
+CELL_ALIGN = [Qt.AlignLeft | Qt.AlignVCenter, Qt.AlignCenter, Qt.AlignCenter,
+              Qt.AlignRight | Qt.AlignVCenter, Qt.AlignRight | Qt.AlignVCenter]
+
+
+def level(value, high, mid, low=None):
+    if value > high: return 'accent_red'
+    if value > mid: return 'accent_blue'
+    return low
+
+
+class RowSpec:
+    # values: lo que se muestra en cada columna sin formatear (el texto se genera al pintar).
+    # records: hijos de un grupo, que solo se convierten en filas si el grupo está desplegado.
+    __slots__ = ('key', 'values', 'pids', 'exe', 'bold', 'records')
+
+    def __init__(self, key, values, pids, exe="", bold=False, records=()):
+        self.key = key
+        self.values = values
+        self.pids = pids
+        self.exe = exe
+        self.bold = bold
+        self.records = records
+
+
+class ProcessNode:
+    __slots__ = ('key', 'parent', 'row', 'children', 'by_key', 'values', 'texts', 'colors', 'pids', 'exe', 'bold',
+                 'records', 'loaded')
+
+    def __init__(self, key=None, parent=None):
+        self.key = key
+        self.parent = parent
+        self.row = 0
+        self.children = []
+        self.by_key = {}
+        self.values = (None,) * len(COLUMNS)
+        self.texts = None
+        self.colors = None
+        self.pids = []
+        self.exe = ""
+        self.bold = False
+        self.records = ()
+        self.loaded = True
+
+
+def group_spec(p_data):
+    count = p_data['count']
+    values = (f"{p_data['name']} ({count})" if count > 1 else p_data['name'],
+              p_data['pid'] if count == 1 else None, p_data['cpu'], p_data['ram'], p_data['disk'])
+    return RowSpec(p_data['name'], values, p_data['all_pids'], p_data['exe'], True,
+                   p_data['children'] if count > 1 else ())
+
+
+def child_spec(child):
+    return RowSpec(child.pid, (child.name, child.pid, child.cpu, child.ram, child.disk), [child.pid])
+
+
+def child_specs(records):
+    return [child_spec(r) for r in records]
+
+
+def tree_spec(r, total, children):
+    # Modo jerárquico: cpu/ram/disk del subárbol; records son los PIDs hijos
+    return RowSpec(r.pid, (r.name, r.pid, total[0], total[1], total[2]), [r.pid], r.exe, bool(children), children)
+
+
+def format_row(node):
+    # Textos y colores de una fila; los grupos (en negrita) atenúan los valores bajos
+    name, pid, cpu, ram, disk = node.values
+    ram_mb = ram / (1024 * 1024)
+    texts = (name, str(pid) if pid is not None else "",
+             f"{format_decimal(cpu)}%",
+             f"{format_decimal(ram_mb)} MB",
+             f"{format_decimal(disk)} MB/s")
+    low = 'text_dim' if node.bold else None
+    colors = ('text_main' if node.bold else 'text_dim', None,
+              level(cpu, 15, 1.0, low),
+              level(ram_mb, 1000, 300, low),
+              level(disk, 5.0, 0.1, low))
+    return texts, colors
+
+
+class ProcessModel(QAbstractItemModel):
+    # Árbol de procesos con claves estables (nombre de grupo / PID): cada actualización
+    # solo emite altas, bajas, dataChanged de las celdas que cambian y un único
+    # layoutChanged si cambia el orden. Selección, scroll y expansión se conservan.
+    # Virtual: los textos se formatean al pedirlos la vista (solo filas visibles) y los hijos
+    # de un grupo solo existen como filas mientras está desplegado (canFetchMore/fetchMore).
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = ProcessNode()
+        self.header_labels = list(COLUMNS)
+        self.bold_font = QFont()
+        self.bold_font.setBold(True)
+        self.brushes = {}
+        # records de una fila -> RowSpec de sus hijos (agrupado: procesos; jerárquico: PIDs hijos)
+        self.expand_specs = child_specs
+        # Iconos asíncronos: data() devuelve el provisional y `ready` repinta la columna 0
+        self.icons = icon_service()
+        self.icons.ready.connect(self.refresh_icons)
+        self._reorder = []
+        self.refresh_theme(notify=False)
+
+    def refresh_theme(self, notify=True):
+        theme = config.active_theme
+        self.brushes = {k: QBrush(QColor(theme[k])) for k in ('text_main', 'text_dim', 'accent_red', 'accent_blue')}
+        if notify and self.root.children:
+            self._notify_all(self.root, QModelIndex(), Qt.ForegroundRole)
+
+    def refresh_icons(self):
+        if self.root.children: self._notify_all(self.root, QModelIndex(), Qt.DecorationRole, 0)
+
+    def _notify_all(self, node, parent_index, role, last=len(COLUMNS) - 1):
+        self.dataChanged.emit(self.index(0, 0, parent_index),
+                              self.index(len(node.children) - 1, last, parent_index), [role])
+        for child in node.children:
+            if child.children: self._notify_all(child, self.createIndex(child.row, 0, child), role, last)
+
+    def set_header_labels(self, labels):
+        self.header_labels = list(labels)
+        self.headerDataChanged.emit(Qt.Horizontal, 0, len(COLUMNS) - 1)
+
+    # --- QAbstractItemModel ---
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = parent.internalPointer() if parent.isValid() else self.root
+        if 0 <= row < len(node.children) and 0 <= column < len(COLUMNS):
+            return self.createIndex(row, column, node.children[row])
+        return QModelIndex()
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid(): return QModelIndex()
+        p = index.internalPointer().parent
+        if p is None or p is self.root: return QModelIndex()
+        return self.createIndex(p.row, 0, p)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0: return 0
+        node = parent.internalPointer() if parent.isValid() else self.root
+        return len(node.children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(COLUMNS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if parent.column() > 0: return False
+        node = parent.internalPointer() if parent.isValid() else self.root
+        return bool(node.children) or (not node.loaded and bool(node.records))
+
+    def canFetchMore(self, parent):
+        if not parent.isValid(): return False
+        node = parent.internalPointer()
+        return not node.loaded and bool(node.records)
+
+    def fetchMore(self, parent):
+        # Se despliega un grupo: sus procesos pasan a ser filas
+        if not parent.isValid(): return
+        node = parent.internalPointer()
+        if node.loaded: return
+        node.loaded = True
+        if not node.records: return
+        specs = self.expand_specs(node.records)
+        if not specs: return
+        self.beginInsertRows(parent, 0, len(specs) - 1)
+        for spec in specs: self._build(node, spec)
+        self.endInsertRows()
+
+    def unload(self, parent):
+        # Fila plegada: se liberan sus hijos, vuelve a ser una sola
+        if not parent.isValid(): return
+        node = parent.internalPointer()
+        if not node.loaded or not node.records: return
+        if node.children:
+            self.beginRemoveRows(parent, 0, len(node.children) - 1)
+            node.children = []
+            node.by_key = {}
+            self.endRemoveRows()
+        node.loaded = False
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid(): return None
+        node = index.internalPointer()
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if node.texts is None: node.texts, node.colors = format_row(node)
+            return node.texts[col]
+        if role == Qt.ForegroundRole:
+            if node.colors is None: node.texts, node.colors = format_row(node)
+            c = node.colors[col]
+            return self.brushes[c] if c else None
+        if role == Qt.TextAlignmentRole:
+            return CELL_ALIGN[col]
+        if col != 0: return None
+        if role == Qt.DecorationRole:
+            return self.icons.icon(node.exe) if node.exe else None
+        if role == Qt.FontRole:
+            return self.bold_font if node.bold else None
+        if role == Qt.UserRole:
+            return node.pids
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation != Qt.Horizontal: return None
+        if role == Qt.DisplayRole: return self.header_labels[section]
+        if role == Qt.TextAlignmentRole: return CELL_ALIGN[section]
+        return None
+
+    # --- Actualización incremental ---
+
+    def clear(self):
+        # Cambio de modo (grupos / jerarquía): las claves no son comparables, se empieza de cero
+        self.beginResetModel()
+        self.root = ProcessNode()
+        self._reorder = []
+        self.endResetModel()
+
+    def update_groups(self, groups):
+        self.apply_specs([group_spec(g) for g in groups])
+
+    def patch_groups(self, groups, removed, order):
+        # Vista agrupada incremental: solo los grupos que cambian, los quitados y el orden nuevo
+        node = self.root
+        parent_index = QModelIndex()
+        by_key = node.by_key
+        self._reorder = []
+        self._remove_rows(node, parent_index, sorted(by_key[k].row for k in removed if k in by_key))
+        specs = [group_spec(g) for g in groups]
+        self._update_rows(node, parent_index, [(by_key[s.key], s) for s in specs if s.key in by_key])
+        self._insert_rows(node, parent_index, [s for s in specs if s.key not in by_key])
+        if [c.key for c in node.children] != order: self._reorder.append((node, order))
+        if self._reorder: self._apply_reorder()
+
+    def apply_specs(self, specs):
+        self._reorder = []
+        self._sync(self.root, QModelIndex(), specs)
+        if self._reorder: self._apply_reorder()
+
+    def _sync(self, node, parent_index, specs):
+        wanted = {s.key: s for s in specs}
+        self._remove_rows(node, parent_index, [i for i, c in enumerate(node.children) if c.key not in wanted])
+        self._update_rows(node, parent_index, [(c, wanted[c.key]) for c in node.children])
+        self._insert_rows(node, parent_index, [s for s in specs if s.key not in node.by_key])
+        if [c.key for c in node.children] != [s.key for s in specs]:
+            self._reorder.append((node, [s.key for s in specs]))
+
+    def _remove_rows(self, node, parent_index, doomed):
+        # Bajas (filas en orden creciente), en tramos contiguos desde el final
+        while doomed:
+            last = doomed.pop()
+            first = last
+            while doomed and doomed[-1] == first - 1: first = doomed.pop()
+            self.beginRemoveRows(parent_index, first, last)
+            for c in node.children[first:last + 1]: del node.by_key[c.key]
+            del node.children[first:last + 1]
+            for i in range(first, len(node.children)): node.children[i].row = i
+            self.endRemoveRows()
+
+    def _update_rows(self, node, parent_index, pairs):
+        # Cambios en filas existentes: un único dataChanged por nivel que cubre las celdas modificadas
+        first_row = first_col = None
+        last_row = last_col = -1
+        for child, spec in pairs:
+            old = child.values
+            new = spec.values
+            changed = [i for i in range(len(COLUMNS)) if old[i] != new[i]] if old != new else []
+            child.pids = spec.pids
+            # Columna 0: icono, fuente y flecha de despliegue (hasChildren depende de records)
+            if child.exe != spec.exe or child.bold != spec.bold or bool(child.records) != bool(spec.records):
+                child.exe = spec.exe
+                child.bold = spec.bold
+                if 0 not in changed: changed.insert(0, 0)
+            child.records = spec.records
+            if changed:
+                child.values = new
+                child.texts = child.colors = None
+                first_row = child.row if first_row is None else min(first_row, child.row)
+                last_row = max(last_row, child.row)
+                first_col = changed[0] if first_col is None else min(first_col, changed[0])
+                last_col = max(last_col, changed[-1])
+            if child.loaded and (child.children or spec.records):
+                self._sync(child, self.createIndex(child.row, 0, child), self.expand_specs(spec.records))
+        if first_row is not None:
+            self.dataChanged.emit(self.index(first_row, first_col, parent_index),
+                                  self.index(last_row, last_col, parent_index))
+
+    def _insert_rows(self, node, parent_index, new_specs):
+        # Altas al final; el orden se corrige después con un solo layoutChanged
+        if not new_specs: return
+        start = len(node.children)
+        self.beginInsertRows(parent_index, start, start + len(new_specs) - 1)
+        for s in new_specs: self._build(node, s)
+        self.endInsertRows()
+
+    def _build(self, parent, spec):
+        node = ProcessNode(spec.key, parent)
+        node.row = len(parent.children)
+        node.values = spec.values
+        node.pids = spec.pids
+        node.exe = spec.exe
+        node.bold = spec.bold
+        node.records = spec.records
+        # loaded = ya desplegado (fetchMore); un nodo sin procesos que después los gane sigue
+        # plegado y sin hijos hasta que se despliegue
+        node.loaded = False
+        parent.children.append(node)
+        parent.by_key[spec.key] = node
+        return node
+
+    def _apply_reorder(self):
+        self.layoutAboutToBeChanged.emit()
+        old = self.persistentIndexList()
+        for node, order in self._reorder:
+            node.children = [node.by_key[k] for k in order]
+            for i, c in enumerate(node.children): c.row = i
+        new = []
+        for idx in old:
+            n = idx.internalPointer()
+            new.append(self.createIndex(n.row, idx.column(), n))
+        self.changePersistentIndexList(old, new)
+        self.layoutChanged.emit()
+        self._reorder = []
@@ -0,0 +1,92 @@
+from PySide6.QtCore import QThread, Signal
+
+from collector import ProcessDelta
+from collector.agent import AgentStream
+from collector.mailbox import Mailbox
+
+
+class RemoteWorker(QThread):
+    # Sustituye a WorkerThread + ProcessWorker para una máquina con `python main.py --agent`.
+    # El hilo solo decodifica; la interfaz recibe el último dict de sistema y los deltas
+    # pendientes fundidos en uno (buzones de último valor, como los workers locales), así que un
+    # enlace lento o una ráfaga no llenan la cola de eventos de Qt.
+    data_signal = Signal(dict)
+    processes_signal = Signal(object)
+    hello_signal = Signal(dict)
+    status_signal = Signal(bool)
+    ready = Signal()
+
+    def __init__(self, address):
+        super().__init__()
+        self.address = address
+        self.system = Mailbox()
+        self.deltas = Mailbox(merge=ProcessDelta.merge)
+        self.stream = None
+        self.visible = None
+        self.running = True
+        self.connected = False
+        self.paused = False
+        self.ready.connect(self.flush)
+
+    def set_visible_pids(self, pids):
+        self.visible = pids
+        stream = self.stream
+        if stream is not None: stream.send_visible(pids)
+
+    def request_keyframe(self):
+        stream = self.stream
+        if stream is not None: stream.request_keyframe()
+
+    def set_paused(self, paused):
+        # Página oculta o ventana minimizada: los deltas se siguen fundiendo en el buzón y se
+        # entregan en uno al volver
+        self.paused = paused
+        if not paused: self.flush()
+
+    def flush(self):
+        # Hilo de la interfaz
+        delta = self.deltas.take() if not self.paused else None
+        system = self.system.take()
+        if delta is not None: self.processes_signal.emit(delta)
+        if system is not None: self.data_signal.emit(system)
+
+    def transport_stats(self):
+        return {'system': self.system.stats(), 'processes': self.deltas.stats()}
+
+    def run(self):
+        backoff = 0.5
+        while self.running:
+            try:
+                stream = AgentStream(self.address)
+            except:
+                self.status_signal.emit(False)
+                self.msleep(int(backoff * 1000))
+                backoff = min(backoff * 2, 10.0)
+                continue
+            backoff = 0.5
+            self.stream = stream
+            if self.visible: stream.send_visible(self.visible)
+            self.connected = True
+            self.status_signal.emit(True)
+            try:
+                while self.running:
+                    kind, value = stream.next()
+                    if kind == 'system':
+                        if self.system.post(value): self.ready.emit()
+                    elif kind == 'procs':
+                        if self.deltas.post(value): self.ready.emit()
+                    elif kind == 'hello':
+                        self.hello_signal.emit(value)
+            except:
+                pass
+            self.stream = None
+            self.connected = False
+            try: stream.close()
+            except: pass
+            if self.running: self.status_signal.emit(False)
+
+    def stop(self):
+        self.running = False
+        stream = self.stream
+        if stream is not None: stream.close()
+        self.wait(2000)
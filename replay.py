@@ -0,0 +1,83 @@
+import time
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from collector.recording import Recording
+
+
+class ReplayFeed(QObject):
+    # Reproduce una grabación (collector.recording) en lugar de WorkerThread + ProcessWorker.
+    # Corre en el hilo de la interfaz con un QTimer: a velocidad 1x/Nx respeta los tiempos
+    # grabados divididos por `speed`; con speed=0 entrega un registro por vuelta del bucle de
+    # eventos, tan rápido como la interfaz lo procese (útil para perfilar).
+    data_signal = Signal(dict)
+    processes_signal = Signal(object)
+    finished = Signal()
+
+    def __init__(self, path, speed=1.0, loop=False):
+        super().__init__()
+        self.recording = Recording(path)
+        self.speed = speed
+        self.loop = loop
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.step)
+        self.records = None
+        self.pending = None
+        self.t_rec0 = 0.0
+        self.t_wall0 = 0.0
+        self.emitted = 0
+        self.elapsed = 0.0
+
+    def set_visible_pids(self, pids):
+        pass
+
+    def request_keyframe(self):
+        # La grabación no se puede resincronizar: empieza con un keyframe y no tiene huecos
+        pass
+
+    def rewind(self):
+        self.records = iter(self.recording)
+        self.pending = next(self.records, None)
+        self.t_rec0 = self.pending[0] if self.pending is not None else 0.0
+        self.t_wall0 = time.perf_counter()
+
+    def start(self):
+        self.emitted = 0
+        self.rewind()
+        self.timer.start(0)
+
+    def stop(self):
+        self.timer.stop()
+
+    def emit_record(self, record):
+        t, kind, value = record
+        if kind == 'system':
+            self.data_signal.emit(value)
+        else:
+            self.processes_signal.emit(value)
+        self.emitted += 1
+
+    def step(self):
+        if self.pending is None:
+            self.elapsed = time.perf_counter() - self.t_wall0
+            if self.loop and self.emitted:
+                self.rewind()
+                self.timer.start(0)
+            else:
+                self.finished.emit()
+            return
+        if self.speed <= 0:
+            self.emit_record(self.pending)
+            self.pending = next(self.records, None)
+            self.timer.start(0)
+            return
+        now = (time.perf_counter() - self.t_wall0) * self.speed
+        while self.pending is not None and self.pending[0] - self.t_rec0 <= now:
+            self.emit_record(self.pending)
+            self.pending = next(self.records, None)
+        if self.pending is None:
+            self.timer.start(0)
+        else:
+            wait = (self.pending[0] - self.t_rec0 - now) / self.speed
+            self.timer.start(max(int(wait * 1000), 0))
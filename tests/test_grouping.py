@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from collector import ProcessTable, DeltaEncoder, ProcessRecord, ProcessSnapshot, GroupView, COLUMNAR_AVAILABLE
+
+pytestmark = pytest.mark.skipif(not COLUMNAR_AVAILABLE, reason="sin NumPy")
+
+
+def test_columnar_matches_python_groups():
+    from collector import ColumnarProcessTable
+    rnd = random.Random(0)
+    encoder = DeltaEncoder()
+    plain = ProcessTable()
+    columnar = ColumnarProcessTable()
+    procs = {}
+    for step in range(40):
+        # Bajas y altas con PIDs reutilizados: los huecos del array columnar cambian de dueño
+        for pid in rnd.sample(list(procs), min(len(procs), 6)): del procs[pid]
+        for _ in range(8):
+            pid = rnd.randrange(1, 300)
+            procs[pid] = (f"name{rnd.randrange(8)}", f"/usr/bin/x{pid}", float(rnd.randrange(100)))
+        records = [ProcessRecord(pid, name, cpu, float(pid), 0.0, exe, float(step))
+                   for pid, (name, exe, cpu) in procs.items()]
+        delta = encoder.encode(ProcessSnapshot(float(step), records))
+        assert plain.apply(delta) and columnar.apply(delta)
+        # El orden entre empates no está fijado: se compara por nombre
+        a = {g['name']: (g['pid'], g['exe'], g['count'], g['ram']) for g in plain.group_by_name(limit=None)}
+        b = {g['name']: (g['pid'], g['exe'], g['count'], g['ram']) for g in columnar.group_by_name(limit=None)}
+        assert a == b
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_group_view_matches_full_regroup(columnar):
+    from collector import ColumnarProcessTable
+    rnd = random.Random(1)
+    encoder = DeltaEncoder()
+    table = ColumnarProcessTable() if columnar else ProcessTable()
+    view = GroupView()
+    procs = {}
+    sort = (3, 0, False)
+    for step in range(60):
+        for pid in rnd.sample(list(procs), min(len(procs), 4)): del procs[pid]
+        for _ in range(5):
+            pid = rnd.randrange(1, 300)
+            procs[pid] = (f"name{rnd.randrange(20)}", f"/usr/bin/x{pid}")
+        # Solo unos pocos procesos cambian de valores en cada paso
+        records = [ProcessRecord(pid, name, float(pid % 7), float((pid * step) % 11 if pid % 5 == 0 else pid),
+                                 0.0, exe, float(step)) for pid, (name, exe) in procs.items()]
+        delta = encoder.encode(ProcessSnapshot(float(step), records))
+        assert table.apply(delta)
+        if step == 30: sort = (2, 0, True)
+        query = "name1" if step >= 45 else ""
+        view.refresh(table, sort, query)
+        full = table.group_by_name(*sort, limit=None, only=table.search(query))
+        expected = {g['name']: (g['count'], g['cpu'], g['ram'], sorted(g['all_pids'])) for g in full}
+        got = {name: (g['count'], g['cpu'], g['ram'], sorted(g['all_pids'])) for name, g in view.groups.items()}
+        assert got == expected
+        key = 'ram' if sort[0] == 3 else 'cpu'
+        values = [view.groups[name][key] for name in view.order]
+        assert values == sorted(values, reverse=(sort[2] is False))
@@ -0,0 +1,165 @@
+import random
+
+import pytest
+
+from collector import DeltaEncoder, ProcessTable, ProcessHierarchy, ProcessRecord, ProcessSnapshot
+
+
+class Machine:
+    # Procesos simulados: pid -> [nombre, inicio, ppid, cpu, ram, disco]
+    def __init__(self, procs=()):
+        self.procs = {}
+        self.clock = 0.0
+        self.encoder = DeltaEncoder()
+        self.table = ProcessTable()
+        self.tree = ProcessHierarchy()
+        for pid, ppid in procs: self.spawn(pid, ppid)
+
+    def spawn(self, pid, ppid, start=None):
+        self.clock += 1.0
+        self.procs[pid] = [f"p{pid}", self.clock if start is None else start, ppid, 1.0, 10.0 * pid, 0.0]
+
+    def step(self):
+        # Un escaneo: registros nuevos como los de un colector, delta, réplica e índice
+        records = [ProcessRecord(pid, p[0], p[3], p[4], p[5], "", p[1], p[2]) for pid, p in self.procs.items()]
+        delta = self.encoder.encode(ProcessSnapshot(self.clock, records))
+        assert self.table.apply(delta)
+        self.tree.apply(delta, self.table.records)
+        return self.tree
+
+
+def shape(h):
+    children = {pid: sorted(c) for pid, c in h.children.items() if c}
+    totals = {pid: [round(v, 6) for v in t] for pid, t in h.totals.items()}
+    return dict(h.parent), children, totals
+
+
+def assert_matches_rebuild(h, records):
+    fresh = ProcessHierarchy()
+    fresh.rebuild(records)
+    assert shape(h) == shape(fresh)
+
+
+def test_totals_roll_up():
+    m = Machine([(1, 0), (2, 1), (3, 2), (4, 1)])
+    h = m.step()
+    assert h.parent == {1: 0, 2: 1, 3: 2, 4: 1}
+    assert h.totals[1] == [4.0, 100.0, 0.0]
+    assert h.totals[2] == [2.0, 50.0, 0.0]
+    m.procs[3][3] = 50.0
+    h = m.step()
+    assert h.totals[1][0] == 53.0
+    assert h.totals[2][0] == 51.0
+    assert h.subtree(2) == [2, 3]
+
+
+def test_reparenting():
+    m = Machine([(1, 0), (2, 1), (3, 1), (4, 2)])
+    m.step()
+    m.procs[4][2] = 3
+    h = m.step()
+    assert h.parent[4] == 3
+    assert 4 not in h.children[2] and 4 in h.children[3]
+    assert h.totals[2][1] == 20.0
+    assert h.totals[3][1] == 70.0
+    assert_matches_rebuild(h, m.table.records)
+
+
+def test_orphans_go_to_root():
+    m = Machine([(1, 0), (2, 1), (3, 2), (4, 3)])
+    m.step()
+    del m.procs[2]
+    h = m.step()
+    assert h.parent[3] == 0
+    assert h.parent[4] == 3
+    assert 3 in h.roots()
+    assert h.totals[1] == [1.0, 10.0, 0.0]
+    assert_matches_rebuild(h, m.table.records)
+
+
+def test_reused_pid_does_not_adopt_orphans():
+    m = Machine([(1, 0), (2, 1), (3, 2)])
+    m.step()
+    del m.procs[2]
+    m.step()
+    # Mismo PID, proceso más nuevo que el huérfano: no es su padre
+    m.spawn(2, 1)
+    h = m.step()
+    assert h.parent[2] == 1
+    assert h.parent[3] == 0
+    assert h.children[2] == set()
+    assert_matches_rebuild(h, m.table.records)
+
+
+def test_reused_pid_in_a_single_scan():
+    # El PID se reutiliza entre dos escaneos: baja + alta en el mismo delta
+    m = Machine([(1, 0), (2, 1), (3, 2)])
+    m.step()
+    m.spawn(2, 1)
+    h = m.step()
+    assert h.parent[3] == 0
+    assert h.totals[2] == [1.0, 20.0, 0.0]
+    assert_matches_rebuild(h, m.table.records)
+
+
+def test_child_seen_before_parent():
+    m = Machine([(1, 0)])
+    m.spawn(5, 4, start=10.0)
+    h = m.step()
+    assert h.parent[5] == 0
+    m.spawn(4, 1, start=9.0)
+    h = m.step()
+    assert h.parent[5] == 4
+    assert h.totals[4][1] == 90.0
+    assert_matches_rebuild(h, m.table.records)
+
+
+def test_cycles_are_broken():
+    m = Machine([(1, 0)])
+    m.spawn(2, 3, start=5.0)
+    m.spawn(3, 2, start=5.0)
+    h = m.step()
+    assert sorted(h.subtree(0)) == [0, 1, 2, 3]
+    assert h.parent[2] == 0 or h.parent[3] == 0
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_churn_matches_rebuild(seed):
+    rnd = random.Random(seed)
+    m = Machine([(1, 0)] + [(pid, rnd.choice(range(1, pid))) for pid in range(2, 60)])
+    free = list(range(60, 120))
+    exited = []
+    late = []
+    for _ in range(150):
+        live = list(m.procs)
+        for pid in rnd.sample(live, min(len(live) - 1, rnd.randrange(4))):
+            if pid == 1: continue
+            del m.procs[pid]
+            exited.append(pid)
+        for _ in range(rnd.randrange(4)):
+            # PID nuevo o reutilizado, hijo de un proceso vivo o de uno que ya ha terminado
+            pid = exited.pop(rnd.randrange(len(exited))) if exited and rnd.random() < 0.4 else \
+                free.pop() if free else None
+            if pid is None or pid in m.procs: continue
+            parent = rnd.choice(list(m.procs)) if rnd.random() < 0.85 else rnd.choice(exited or [1])
+            m.spawn(pid, parent)
+        for pid in late:
+            # Padre que aparece después que su hijo (escaneo a medias)
+            if pid not in m.procs: m.spawn(pid, 1, start=0.5)
+        late = []
+        if rnd.random() < 0.2 and free:
+            parent = free.pop()
+            child = free.pop() if free else None
+            if child is not None:
+                m.spawn(child, parent)
+                late.append(parent)
+        for pid in rnd.sample(list(m.procs), min(len(m.procs), 3)):
+            # Reparentado: adoptado por init o por otro proceso más antiguo
+            older = [p for p in m.procs if m.procs[p][1] < m.procs[pid][1]]
+            m.procs[pid][2] = rnd.choice(older) if older and rnd.random() < 0.5 else 1
+        for p in m.procs.values():
+            p[3] = round(rnd.random() * 10, 2)
+        if rnd.random() < 0.05: m.encoder.request_keyframe()
+        h = m.step()
+        assert_matches_rebuild(h, m.table.records)
+        assert len(h) == len(m.procs)
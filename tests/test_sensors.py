@@ -0,0 +1,128 @@
+import os
+import sys
+import types
+
+from collector import SystemSnapshot, SensorRegistry, FakeBackend, NvmlBackend, SysfsGpuBackend
+from collector.sensors import default_registry
+
+
+def test_cheapest_available_backend_wins():
+    slow = FakeBackend({'gpu': 10.0}, cost=5.0, name="slow")
+    fast = FakeBackend({'gpu': 20.0}, cost=0.1, name="fast")
+    registry = SensorRegistry([slow, fast])
+    assert registry.open() == [fast]
+    assert slow.probes == 0
+
+    snap = SystemSnapshot()
+    registry.sample(snap)
+    assert snap.gpu == 20.0
+    assert (fast.samples, slow.samples) == (1, 0)
+
+
+def test_priority_beats_cost():
+    igpu = FakeBackend({'gpu': 5.0}, cost=0.05, priority=1, name="igpu")
+    dgpu = FakeBackend({'gpu': 80.0}, cost=0.3, priority=0, name="dgpu")
+    registry = SensorRegistry([igpu, dgpu])
+    assert registry.open() == [dgpu]
+    assert igpu.probes == 0
+
+
+def test_nvml_before_sysfs_on_hybrid_machines():
+    # iGPU por sysfs (más barata) y NVIDIA por NVML: la GPU mostrada sigue siendo la NVIDIA
+    class Nvml(NvmlBackend):
+        def probe(self):
+            return True
+
+    class Sysfs(SysfsGpuBackend):
+        def probe(self):
+            return True
+
+    nvml = Nvml()
+    sysfs = Sysfs()
+    registry = SensorRegistry([sysfs, nvml])
+    assert registry.open() == [nvml]
+    assert registry.owner['gpu'] is nvml
+
+
+def test_nvml_not_loaded_without_nvidia_driver(tmp_path, monkeypatch):
+    calls = []
+    fake = types.ModuleType("pynvml")
+    fake.nvmlInit = lambda: calls.append("init")
+    fake.nvmlDeviceGetHandleByIndex = lambda i: object()
+    monkeypatch.setitem(sys.modules, "pynvml", fake)
+    monkeypatch.setattr(sys, "platform", "linux")
+
+    assert not NvmlBackend(proc_root=str(tmp_path)).probe()
+    assert calls == []
+
+    (tmp_path / "driver" / "nvidia").mkdir(parents=True)
+    assert NvmlBackend(proc_root=str(tmp_path)).probe()
+    assert calls == ["init"]
+
+
+def test_fallback_when_preferred_is_unavailable():
+    missing = FakeBackend({'gpu': 99.0}, cost=0.1, available=False, name="missing")
+    backup = FakeBackend({'gpu': 42.0}, cost=3.0, name="backup")
+    registry = SensorRegistry([missing, backup])
+    assert registry.open() == [backup]
+    assert missing.probes == 1
+
+    snap = SystemSnapshot()
+    registry.sample(snap)
+    assert snap.gpu == 42.0
+    assert missing.samples == 0
+    desc = {d['name']: d for d in registry.describe()}
+    assert desc['missing']['available'] is False
+    assert desc['backup']['provides'] == ['gpu']
+
+
+def test_probe_errors_count_as_unavailable():
+    class Broken(FakeBackend):
+        def probe(self):
+            raise RuntimeError("sin driver")
+
+    broken = Broken({'gpu': 1.0}, name="broken")
+    registry = SensorRegistry([broken])
+    assert registry.open() == []
+    snap = SystemSnapshot()
+    registry.sample(snap)
+    assert snap.gpu == 0.0
+
+
+def test_each_backend_probed_once_across_metrics():
+    both = FakeBackend({'gpu': 1.0, 'temps': {'cpu': 50.0}}, name="both")
+    registry = SensorRegistry([both])
+    assert registry.open() == [both]
+    assert both.probes == 1
+
+
+def test_sample_errors_do_not_stop_other_backends():
+    def fail():
+        raise OSError("sensor desaparecido")
+
+    bad = FakeBackend({'gpu': fail}, name="bad")
+    temps = FakeBackend({'temps': {'cpu': 61.0}}, name="temps")
+    registry = SensorRegistry([bad, temps])
+    registry.open()
+    snap = SystemSnapshot()
+    registry.sample(snap)
+    assert snap.temps == {'cpu': 61.0}
+
+
+def test_unavailable_sysfs_and_unknown_names(tmp_path):
+    assert not SysfsGpuBackend(sys_root=str(tmp_path)).probe()
+    registry = default_registry(names=['nope', 'null'])
+    assert [b.name for b in registry.backends] == ['null']
+    assert registry.open() == []
+
+
+def test_sysfs_reads_gpu_busy(tmp_path):
+    device = tmp_path / "class" / "drm" / "card0" / "device"
+    device.mkdir(parents=True)
+    (device / "gpu_busy_percent").write_text("37\n")
+    backend = SysfsGpuBackend(sys_root=str(tmp_path))
+    assert backend.probe()
+    snap = SystemSnapshot()
+    backend.sample(snap)
+    assert snap.gpu == 37
+    assert os.path.basename(backend.device) == "device"
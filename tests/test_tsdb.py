@@ -0,0 +1,58 @@
+from collector.history import read_backfill
+from collector.tsdb import TimeSeriesStore
+
+TIERS = ((1, 600), (10, 6000))
+CORE = {'cpu': 0.0, 'ram': 1.0, 'gpu': 0.0, 'net_down': 0.0, 'net_up': 0.0}
+
+
+def test_restart_inside_a_bucket_keeps_one_point(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), tiers=TIERS)
+    for t in range(1000, 1004): store.record(dict(CORE, cpu=t - 1000), t=float(t))
+    store.close()
+    store = TimeSeriesStore(str(tmp_path), tiers=TIERS)
+    for t in range(1004, 1012): store.record(dict(CORE, cpu=t - 1000), t=float(t))
+    store.close()
+    store = TimeSeriesStore(str(tmp_path), tiers=TIERS, readonly=True)
+    try:
+        assert store.query('cpu', 0, 2000, step=10) == [(1000.0, 4.5, 0.0, 9.0), (1010.0, 10.5, 10.0, 11.0)]
+    finally:
+        store.close()
+
+
+def test_clock_going_backwards_is_clamped(tmp_path):
+    with TimeSeriesStore(str(tmp_path), tiers=TIERS) as store:
+        store.record(CORE, t=1000.0)
+        store.record(CORE, t=990.0)
+        store.record(CORE, t=1001.0)
+        assert [p[0] for p in store.query('cpu', 0, 2000, step=1)] == [1000.0, 1000.0, 1001.0]
+
+
+def test_disks_win_over_interfaces_and_sensors(tmp_path):
+    with TimeSeriesStore(str(tmp_path), tiers=TIERS, series_budget=10) as store:
+        data = dict(CORE, net_nics={f"veth{i}": (1.0, 1.0) for i in range(4)}, temps={'cpu': 50.0})
+        store.record(data, t=1.0)
+        data['disk_detail'] = {'sda': (0.0, 0.0, 0.0, 0.0, 5.0, 'sda', [])}
+        store.record(data, t=2.0)
+        kept = {store.names[sid] for sid in store.active}
+        assert {'cpu', 'ram', 'gpu', 'net_down', 'net_up', 'disk_util:sda'} <= kept
+        assert 'temp:cpu' in store.dropped
+        assert store.query('disk_util:sda', 0, 10, step=1) == [(2.0, 5.0, 5.0, 5.0)]
+
+
+def test_query_many_matches_query(tmp_path):
+    with TimeSeriesStore(str(tmp_path), tiers=TIERS) as store:
+        for t in range(100): store.record(dict(CORE, cpu=float(t)), t=float(t))
+        many = store.query_many(('cpu', 'ram', 'missing'), 10, 20, step=1)
+        assert many['cpu'] == store.query('cpu', 10, 20, step=1)
+        assert many['ram'] == store.query('ram', 10, 20, step=1)
+        assert many['missing'] == []
+
+
+def test_backfill_follows_the_ui_interval(tmp_path):
+    with TimeSeriesStore(str(tmp_path), tiers=TIERS) as store:
+        for t in range(100, 110): store.record(dict(CORE, cpu=float(t)), t=float(t))
+        # Un valor por segundo, por cada 2 s (media) y por cada 0,5 s (repetido)
+        assert list(read_backfill(store, ('cpu',), 110.0, 10)['cpu']) == [float(t) for t in range(100, 110)]
+        assert list(read_backfill(store, ('cpu',), 110.0, 10, step=2)['cpu']) == [100.5, 102.5, 104.5, 106.5, 108.5]
+        half = list(read_backfill(store, ('cpu',), 110.0, 4, step=0.5)['cpu'])
+        assert half == [106.0, 106.0, 107.0, 107.0, 108.0, 108.0, 109.0, 109.0]
@@ -1,97 +1,210 @@
 from PySide6.QtWidgets import (QWidget, QLabel, QHBoxLayout, QVBoxLayout, QFrame,
-                               QProgressBar, QTreeWidget, QTreeWidgetItem,
-                               QHeaderView, QFileIconProvider, QMenu, QMessageBox,
-                               QAbstractItemView)
-from PySide6.QtCore import Qt, QFileInfo, QSize, QPoint
-from PySide6.QtGui import (QPainter, QPen, QColor, QBrush, QLinearGradient,
-                           QPainterPath, QFont, QIcon, QAction, QCursor)
+                               QProgressBar, QTreeView, QHeaderView, QMenu, QMessageBox,
+                               QAbstractItemView, QPushButton)
+from PySide6.QtCore import Qt, QSize, QPoint, QPointF, QLineF, QRectF, QEvent, QTimer, Signal
+from PySide6.QtGui import (QPainter, QPen, QColor, QBrush, QPixmap, QPolygonF,
+                           QFont, QFontMetrics, QIcon, QAction, QCursor)
 import config
 from utils import format_speed, format_decimal
+from models import ProcessModel, COLUMNS, child_specs, tree_spec
+from collector import make_process_table, ProcessHierarchy, GroupView
+from collector.history import RingBuffer, DEFAULT_RETENTION, decimate_minmax, envelope_minmax
+from collector.instrument import INSTRUMENT
 import psutil
+import time
 
 
 class AreaGraph(QWidget):
-    def __init__(self, use_secondary=False, max_points=60):
+    def __init__(self, use_secondary=False, max_points=60, series=None, secondary_series=None):
         super().__init__()
+        # max_points es la ventana visible en muestras; el historial vive en RingBuffer (propio o compartido)
         self.max_points = max_points
-        self.data = [0.0] * max_points
-        self.secondary_data = [0.0] * max_points if use_secondary else None
+        self.series = series if series is not None else RingBuffer(max(max_points, DEFAULT_RETENTION))
+        self.secondary_series = secondary_series
+        if use_secondary and secondary_series is None:
+            self.secondary_series = RingBuffer(max(max_points, DEFAULT_RETENTION))
+        self._decimated = {}
+        self._shapes = {}
+        self._static = None
+        self._static_key = None
+        self._styles = None
+        self._styles_key = None
+        # Etapa con la que se mide el pintado cuando la instrumentación está activa
+        self.instrument_key = "paint:graph"
         self.setFixedHeight(75)
         self.setStyleSheet("background: transparent;")
 
+    def set_window(self, points):
+        self.max_points = max(points, 2)
+        self._decimated.clear()
+        self._shapes.clear()
+        self.update()
+
     def add_value(self, value, value2=None):
-        self.data.append(float(value))
-        self.data.pop(0)
-        if self.secondary_data and value2 is not None:
-            self.secondary_data.append(float(value2))
-            self.secondary_data.pop(0)
+        self.series.append(float(value))
+        if self.secondary_series is not None and value2 is not None:
+            self.secondary_series.append(float(value2))
         self.update()
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
+    def decimated(self, series):
+        # Con más de una muestra por cada 2 px se pasa a una envolvente (mín, máx) por cubo:
+        # ventanas largas cuestan lo mismo que 60 puntos
+        buckets = max(self.width() // 2, 2)
+        key = (series.total, self.max_points, buckets)
+        hit = self._decimated.get(id(series))
+        if hit is None or hit[0] != key:
+            if min(self.max_points, len(series)) > buckets:
+                env = envelope_minmax(series, self.max_points, buckets)
+                hit = (key, ('envelope', env, max(env[3])))
+            else:
+                xs, ys = decimate_minmax(series, self.max_points, buckets)
+                hit = (key, ('points', (xs, ys), max(ys) if ys else 0.0))
+            self._decimated[id(series)] = hit
+        return hit[1]
+
+    def static_layer(self, w, h, theme):
+        # Rejilla punteada y etiquetas "%"/"100": se pintan una vez por (tamaño, tema, escala)
+        dpr = self.devicePixelRatioF()
+        key = (w, h, dpr, theme['grid_line'], theme['text_dim'])
+        if self._static_key == key: return self._static
+        pixmap = QPixmap(int(w * dpr), int(h * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.Antialiasing)
-        w, h = self.width(), self.height()
-        theme = config.active_theme
-        grid_c = QColor(theme['grid_line'])
-        text_c = QColor(theme['text_dim'])
-        col_prim = QColor(theme['accent_blue'])
-        col_sec = QColor(theme['accent_red'])
-
-        pen_grid = QPen(grid_c)
+        pen_grid = QPen(QColor(theme['grid_line']))
         pen_grid.setStyle(Qt.DotLine)
         painter.setPen(pen_grid)
         painter.drawLine(0, int(h / 2), w, int(h / 2))
         for i in range(1, 4): painter.drawLine(int(i * w / 4), 10, int(i * w / 4), h - 10)
-
-        painter.setPen(text_c)
+        painter.setPen(QColor(theme['text_dim']))
         font = painter.font()
         font.setPixelSize(10)
         painter.setFont(font)
         painter.drawText(2, 10, "%")
         painter.drawText(w - 25, 10, "100")
+        painter.end()
+        self._static = pixmap
+        self._static_key = key
+        return pixmap
+
+    def styles(self, theme):
+        # Pluma y relleno por color de tema; el relleno es plano porque las dos paradas del
+        # degradado original acababan con el mismo alfa (20)
+        key = (theme['accent_blue'], theme['accent_red'])
+        if self._styles_key != key:
+            self._styles = {}
+            for name in ('accent_blue', 'accent_red'):
+                color = QColor(theme[name])
+                pen = QPen(color)
+                pen.setWidth(2)
+                fill = QColor(color)
+                fill.setAlpha(20)
+                self._styles[name] = (pen, QBrush(fill))
+            self._styles_key = key
+        return self._styles
+
+    def shapes(self, series, w, h, max_v):
+        # Geometría lista para pintar; se rehace solo si cambian datos, ventana, tamaño o escala
+        kind, data, _ = self.decimated(series)
+        key = (series.total, self.max_points, w, h, max_v)
+        hit = self._shapes.get(id(series))
+        if hit is not None and hit[0] == key: return hit[1]
 
-        max_v = 1.0
-        if self.data: max_v = max(max_v, max(self.data))
-        if self.secondary_data: max_v = max(max_v, max(self.secondary_data))
-        if max_v <= 100.0 and not self.secondary_data: max_v = 100.0
-
-        if self.secondary_data: self.draw_single_graph(painter, self.secondary_data, col_sec, max_v)
-        self.draw_single_graph(painter, self.data, col_prim, max_v)
-
-    def draw_single_graph(self, painter, data_list, color, max_scale_val):
-        w, h = self.width(), self.height()
         margin_top, margin_bottom = 15, 15
         draw_h = h - margin_top - margin_bottom
-        path = QPainterPath()
-        scale = draw_h / max_scale_val if max_scale_val > 0.001 else 0
+        base = margin_top + draw_h
+        scale = draw_h / max_v if max_v > 0.001 else 0
         step_w = w / (self.max_points - 1) if self.max_points > 1 else 0
-        path.moveTo(0, (margin_top + draw_h) - (data_list[0] * scale))
-        for i, val in enumerate(data_list): path.lineTo(i * step_w, (margin_top + draw_h) - (val * scale))
-
-        pen = QPen(color)
-        pen.setWidth(2)
-        painter.setPen(pen)
-        painter.setBrush(Qt.NoBrush)
-        painter.drawPath(path)
-        path.lineTo(w, margin_top + draw_h)
-        path.lineTo(0, margin_top + draw_h)
-        path.closeSubpath()
-
-        grad = QLinearGradient(0, margin_top, 0, margin_top + draw_h)
-        c1 = color
-        c1.setAlpha(150)
-        c2 = color
-        c2.setAlpha(20)
-        grad.setColorAt(0, c1)
-        grad.setColorAt(1, c2)
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(QBrush(grad))
-        painter.drawPath(path)
+
+        if kind == 'points':
+            xs, ys = data
+            # Línea y área cerradas como QPolygonF; sin historial suficiente la izquierda va a cero
+            line = QPolygonF([QPointF(x * step_w, base - val * scale) for x, val in zip(xs, ys)])
+            if not ys:
+                line = QPolygonF([QPointF(0, base), QPointF(w, base)])
+            elif xs[0] > 0:
+                line.prepend(QPointF(xs[0] * step_w, base))
+                line.prepend(QPointF(0, base))
+            area = QPolygonF(line)
+            area.append(QPointF(w, base))
+            area.append(QPointF(0, base))
+            shape = ('poly', line, area)
+        else:
+            # Una columna por cubo: relleno hasta el máximo y trazo vertical de mín a máx,
+            # estirado hasta el cubo anterior para que la línea no tenga huecos
+            pad, per_bucket, lows, highs = data
+            col_w = per_bucket * step_w
+            lines = []
+            rects = []
+            x0 = pad * step_w
+            if pad > 0: lines.append(QLineF(0, base, x0, base))
+            prev_lo = prev_hi = None
+            for lo, hi in zip(lows, highs):
+                y_lo = base - lo * scale
+                y_hi = base - hi * scale
+                top, bottom = y_hi, y_lo
+                if prev_lo is not None:
+                    if prev_hi > bottom: bottom = prev_hi
+                    if prev_lo < top: top = prev_lo
+                x = x0 + col_w / 2
+                lines.append(QLineF(x, top, x, bottom))
+                rects.append(QRectF(x0, y_hi, col_w, base - y_hi))
+                prev_lo, prev_hi = y_lo, y_hi
+                x0 += col_w
+            shape = ('bars', lines, rects)
+        self._shapes[id(series)] = (key, shape)
+        return shape
+
+    def paintEvent(self, event):
+        t0 = time.perf_counter() if INSTRUMENT.enabled else 0.0
+        painter = QPainter(self)
+        w, h = self.width(), self.height()
+        theme = config.active_theme
+        painter.drawPixmap(0, 0, self.static_layer(w, h, theme))
+        styles = self.styles(theme)
+
+        prim = self.decimated(self.series)
+        sec = self.decimated(self.secondary_series) if self.secondary_series is not None else None
+
+        max_v = max(1.0, prim[2], sec[2] if sec else 0.0)
+        if max_v <= 100.0 and sec is None: max_v = 100.0
+
+        if sec is not None: self.draw_single_graph(painter, self.shapes(self.secondary_series, w, h, max_v), styles['accent_red'])
+        self.draw_single_graph(painter, self.shapes(self.series, w, h, max_v), styles['accent_blue'])
+        if t0:
+            painter.end()
+            INSTRUMENT.since(self.instrument_key, t0)
+
+    def draw_single_graph(self, painter, shape, style):
+        pen, fill = style
+        if shape[0] == 'poly':
+            _, line, area = shape
+            # El borde del relleno queda bajo el trazo: solo el trazo necesita antialiasing
+            painter.setRenderHint(QPainter.Antialiasing, False)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(fill)
+            painter.drawPolygon(area)
+            painter.setRenderHint(QPainter.Antialiasing, True)
+            painter.setPen(pen)
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPolyline(line)
+        else:
+            # Columnas alineadas a píxel: sin antialiasing el coste ya no depende de la forma
+            _, lines, rects = shape
+            painter.setRenderHint(QPainter.Antialiasing, False)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(fill)
+            painter.drawRects(rects)
+            painter.setPen(pen)
+            painter.drawLines(lines)
 
 
 class HardwareRow(QFrame):
-    def __init__(self, title):
+    def __init__(self, title, series=None):
         super().__init__()
+        # Con una serie compartida (HistoryStore) el dueño del historial es quien la alimenta
+        self.shared_history = series is not None
         self.setObjectName("Card")
         self.setFixedHeight(95)
         layout = QHBoxLayout()
@@ -113,7 +226,8 @@ class HardwareRow(QFrame):
         t_layout.addWidget(self.lbl_extra)
         t_layout.addWidget(self.lbl_val)
         t_layout.addStretch()
-        self.graph = AreaGraph(use_secondary=False)
+        self.graph = AreaGraph(use_secondary=False, series=series)
+        self.graph.instrument_key = f"paint:{title.lower()}"
         layout.addWidget(text_cont)
         layout.addWidget(self.graph, stretch=1)
         self.setLayout(layout)
@@ -121,12 +235,16 @@ class HardwareRow(QFrame):
     def update_val(self, val, extra_text=""):
         self.lbl_val.setText(f"{int(val)}%")
         self.lbl_extra.setText(extra_text)
-        self.graph.add_value(val)
+        if self.shared_history:
+            self.graph.update()
+        else:
+            self.graph.add_value(val)
 
 
 class NetworkRow(QFrame):
-    def __init__(self):
+    def __init__(self, down_series=None, up_series=None):
         super().__init__()
+        self.shared_history = down_series is not None
         self.setObjectName("Card")
         self.setFixedHeight(110)
         layout = QVBoxLayout()
@@ -143,7 +261,8 @@ class NetworkRow(QFrame):
         self.lbl_info = QLabel()
         self.lbl_info.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
         header.addWidget(self.lbl_info)
-        self.g = AreaGraph(use_secondary=True)
+        self.g = AreaGraph(use_secondary=True, series=down_series, secondary_series=up_series)
+        self.g.instrument_key = "paint:net"
         layout.addLayout(header)
         layout.addStretch()
         layout.addWidget(self.g)
@@ -165,7 +284,11 @@ class NetworkRow(QFrame):
         self.lbl_info.setText(
             f"<span style='color:{c_d}; font-weight:bold'>▼ {str_d}</span> &nbsp;&nbsp; <span style='color:{c_u}; font-weight:bold'>▲ {str_u}</span>")
         if iface_name: self.lbl_iface.setText(iface_name.upper())
-        if not refresh_only: self.g.add_value(d, u)
+        if refresh_only: return
+        if self.shared_history:
+            self.g.update()
+        else:
+            self.g.add_value(d, u)
 
 
 class DiskRow(QWidget):
@@ -198,12 +321,13 @@ class DiskRow(QWidget):
         layout.addWidget(self.lbl_write_v)
         self.setLayout(layout)
         self.use_bits = False
+        self.stale = False
         self.refresh_theme_colors()
 
     def refresh_theme_colors(self):
         theme = config.active_theme
         self.lbl_name.setStyleSheet(f"color: {theme['text_main']};")
-        self.lbl_pct.setStyleSheet(f"color: {theme['text_main']}; font-weight: bold; font-size: 13px;")
+        self.lbl_pct.setStyleSheet(f"color: {theme['text_dim' if self.stale else 'text_main']}; font-weight: bold; font-size: 13px;")
         self.lbl_read_v.setStyleSheet(
             f"color: {theme['accent_blue']}; font-size: 12px; font-family: 'Consolas', monospace; font-weight: bold;")
         self.lbl_write_v.setStyleSheet(
@@ -212,10 +336,24 @@ class DiskRow(QWidget):
     def set_unit(self, use_bits):
         self.use_bits = use_bits
 
-    def update_state(self, percent, read_mb, write_mb):
+    def update_state(self, percent, read_mb, write_mb, stale_age=None, detail=None):
         theme = config.active_theme
         self.bar.setValue(int(percent))
         self.lbl_pct.setText(f"{int(percent)}%")
+        # Montaje sin respuesta: se muestra el último valor atenuado y con su antigüedad
+        stale = stale_age is not None
+        if stale != self.stale:
+            self.stale = stale
+            self.lbl_pct.setStyleSheet(
+                f"color: {theme['text_dim' if stale else 'text_main']}; font-weight: bold; font-size: 13px;")
+        tip = []
+        if stale: tip.append(f"Sin respuesta · último dato hace {int(stale_age)} s" if stale_age >= 0 else "Sin respuesta")
+        if detail:
+            r_iops, w_iops, r_lat, w_lat, util, kname, backing = detail
+            tip.append(f"{kname} ({', '.join(backing)})" if list(backing) != [kname] else kname)
+            tip.append(f"IOPS ▼ {r_iops:.0f}  ▲ {w_iops:.0f} · latencia ▼ {r_lat:.1f} ms  ▲ {w_lat:.1f} ms · ocupado {util:.0f}%")
+        tip = "\n".join(tip)
+        if tip != self.toolTip(): self.setToolTip(tip)
         c_fill = theme['accent_red'] if percent > 90 else theme['accent_blue']
         self.bar.setStyleSheet(
             f"QProgressBar {{ background-color: {theme['bar_bg']}; border-radius: 4px; }} QProgressBar::chunk {{ background-color: {c_fill}; border-radius: 4px; }}")
@@ -223,12 +361,19 @@ class DiskRow(QWidget):
         self.lbl_write_v.setText(f"▲ {format_speed(write_mb, self.use_bits)}")
 
 
-class ProcessTree(QTreeWidget):
+COLUMN_SAMPLES = {1: "9999999", 2: "100,0%", 3: "99.999,9 MB", 4: "9.999,9 MB/s"}
+
+
+class ProcessTree(QTreeView):
+    visible_pids_changed = Signal(list)
+    resync_requested = Signal()
+
     def __init__(self):
         super().__init__()
-        self.setColumnCount(5)
-        self.setHeaderLabels(["NAME", "PID", "CPU", "RAM", "DISK"])
+        self.proc_model = ProcessModel(self)
+        self.setModel(self.proc_model)
         self.setIndentation(15)
+        self.setUniformRowHeights(True)
         self.setIconSize(QSize(20, 20))
         self.setAlternatingRowColors(False)
         self.setRootIsDecorated(True)
@@ -237,23 +382,16 @@ class ProcessTree(QTreeWidget):
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self.open_menu)
 
-        self.icon_provider = QFileIconProvider()
-        self.icon_cache = {}
-
         header = self.header()
         header.setSectionsClickable(True)
         header.setSectionsMovable(False)
 
+        # Anchos fijos: ResizeToContents vuelve a medir todas las filas en cada dataChanged
         header.setSectionResizeMode(0, QHeaderView.Stretch)
-        for i in range(1, 5): header.setSectionResizeMode(i, QHeaderView.ResizeToContents)
+        for i in range(1, 5): header.setSectionResizeMode(i, QHeaderView.Fixed)
 
         header.setStretchLastSection(False)
-
-        item = self.headerItem()
-        item.setTextAlignment(1, Qt.AlignCenter)
-        item.setTextAlignment(2, Qt.AlignCenter)
-        item.setTextAlignment(3, Qt.AlignRight | Qt.AlignVCenter)
-        item.setTextAlignment(4, Qt.AlignRight | Qt.AlignVCenter)
+        self.fit_columns()
 
         self.sort_state_name = 0
         self.sort_col = -1
@@ -262,12 +400,52 @@ class ProcessTree(QTreeWidget):
         header.sectionClicked.connect(self.on_header_clicked)
         self.refresh_header_visuals()
 
-        self.last_data = []
+        self.table = make_process_table()
+        # Texto del filtro (nombre, PID o ruta); vacío, todos los procesos
+        self.query = ""
+        # Modo jerárquico (padre/hijo por PPID): índice incremental y PIDs que deja ver el filtro
+        self.hierarchy = None
+        self.tree_filter = None
+        # Modo agrupado: grupos por nombre mantenidos con los deltas
+        self.group_view = GroupView()
+        # False cuando los PIDs son de otra máquina (vista remota): no se puede terminar nada local
+        self.allow_kill = True
+        self.verticalScrollBar().valueChanged.connect(self.emit_visible_pids)
+        self.expanded.connect(self.emit_visible_pids)
+        self.collapsed.connect(self.proc_model.unload)
+
+    def fit_columns(self):
+        bold = QFont(self.font())
+        bold.setBold(True)
+        fm = QFontMetrics(bold)
+        header = self.header()
+        for col, sample in COLUMN_SAMPLES.items():
+            w = max(fm.horizontalAdvance(sample), fm.horizontalAdvance(COLUMNS[col] + " ▼"))
+            header.resizeSection(col, w + 24)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() in (QEvent.StyleChange, QEvent.FontChange): self.fit_columns()
+
+    def emit_visible_pids(self, *args):
+        bottom = self.viewport().rect().bottom()
+        pids = []
+        index = self.indexAt(QPoint(0, 0))
+        while index.isValid() and self.visualRect(index).top() <= bottom:
+            pids.extend(index.siblingAtColumn(0).data(Qt.UserRole) or [])
+            index = self.indexBelow(index)
+        self.visible_pids_changed.emit(pids)
+
+    def refresh_theme(self):
+        self.proc_model.refresh_theme()
 
     def open_menu(self, position):
-        item = self.itemAt(position)
-        if not item: return
-        pids_data = item.data(0, Qt.UserRole)
+        index = self.indexAt(position)
+        if not index.isValid(): return
+        pids_data = index.siblingAtColumn(0).data(Qt.UserRole)
+        if self.hierarchy is not None and pids_data:
+            # Subárbol real; se terminan primero los hijos
+            pids_data = self.hierarchy.subtree(pids_data[0])[::-1]
         menu = QMenu()
         menu.setStyleSheet(config.get_stylesheet(config.active_theme))
         kill_action = QAction(self)
@@ -275,7 +453,7 @@ class ProcessTree(QTreeWidget):
             kill_action.setText(f"Finalizar árbol de procesos ({len(pids_data)})")
         else:
             kill_action.setText("Finalizar tarea")
-        if not pids_data:
+        if not pids_data or not self.allow_kill:
             kill_action.setEnabled(False)
         else:
             kill_action.triggered.connect(lambda: self.kill_processes(pids_data))
@@ -283,6 +461,7 @@ class ProcessTree(QTreeWidget):
         menu.exec(QCursor.pos())
 
     def kill_processes(self, pids):
+        if not self.allow_kill: return
         if not isinstance(pids, list): pids = [pids]
         for pid in pids:
             try:
@@ -304,10 +483,10 @@ class ProcessTree(QTreeWidget):
                 self.sort_col = index
                 self.sort_asc = False
         self.refresh_header_visuals()
-        if self.last_data: self.update_data(self.last_data)
+        if self.table: self.refresh_view()
 
     def refresh_header_visuals(self):
-        labels = ["NAME", "PID", "CPU", "RAM", "DISK"]
+        labels = list(COLUMNS)
         if self.sort_col != -1:
             arrow = " ▲" if self.sort_asc else " ▼"
             if self.sort_col == 0:
@@ -317,147 +496,162 @@ class ProcessTree(QTreeWidget):
                     labels[0] += " ▼"
             else:
                 labels[self.sort_col] += arrow
-        self.setHeaderLabels(labels)
-
-    def update_data(self, process_list):
-        self.last_data = process_list
-        groups = {}
-        for p in process_list:
-            name = p['name']
-            if name not in groups: groups[name] = []
-            groups[name].append(p)
-
-        parent_items_data = []
-        for name, children in groups.items():
-            total_cpu = sum(c['cpu'] for c in children)
-            total_ram = sum(c['ram'] for c in children)
-            total_disk = sum(c['disk'] for c in children)
-            all_pids = [c['pid'] for c in children]
-            min_pid = min(all_pids)
-            exe_path = children[0]['exe']
-
-            parent_data = {
-                'name': name, 'pid': min_pid, 'all_pids': all_pids,
-                'cpu': total_cpu, 'ram': total_ram, 'disk': total_disk,
-                'exe': exe_path, 'count': len(children), 'children': children
-            }
-            parent_items_data.append(parent_data)
-
-        col_keys = {0: 'name', 1: 'pid', 2: 'cpu', 3: 'ram', 4: 'disk'}
-        key = col_keys.get(self.sort_col, 'ram')
-
-        if self.sort_col == 0:
-            if self.sort_state_name == 1:
-                parent_items_data.sort(key=lambda x: x['name'].lower())
-            elif self.sort_state_name == 2:
-                parent_items_data.sort(key=lambda x: x['name'].lower(), reverse=True)
-            else:
-                parent_items_data.sort(key=lambda x: x['ram'], reverse=True)
-        elif self.sort_col == -1:
-            parent_items_data.sort(key=lambda x: x['ram'], reverse=True)
-        else:
-            parent_items_data.sort(key=lambda x: x[key], reverse=not self.sort_asc)
-
-        expanded_names = set()
-        root = self.invisibleRootItem()
-        for i in range(root.childCount()):
-            item = root.child(i)
-            if item.isExpanded(): expanded_names.add(item.text(0).split(" (")[0])
-
-        self.clear()
+        self.proc_model.set_header_labels(labels)
 
-        display_limit = len(parent_items_data) if self.sort_col == 0 else 100
-
-        for p_data in parent_items_data[:display_limit]:
-            item = QTreeWidgetItem(self)
-            item.setData(0, Qt.UserRole, p_data['all_pids'])
-
-            txt_name = f"{p_data['name']} ({p_data['count']})" if p_data['count'] > 1 else p_data['name']
-            item.setText(0, txt_name)
-
-            exe_path = p_data['exe']
-            if exe_path:
-                if exe_path not in self.icon_cache:
-                    self.icon_cache[exe_path] = self.icon_provider.icon(QFileInfo(exe_path))
-                item.setIcon(0, self.icon_cache[exe_path])
-
-            font = QFont();
-            font.setBold(True);
-            item.setFont(0, font)
-            item.setForeground(0, QBrush(QColor(config.active_theme['text_main'])))
+    def paintEvent(self, event):
+        t0 = time.perf_counter() if INSTRUMENT.enabled else 0.0
+        super().paintEvent(event)
+        if t0: INSTRUMENT.since("paint:processes", t0)
+
+    def apply_delta(self, delta):
+        t0 = time.perf_counter() if INSTRUMENT.enabled else 0.0
+        if not self.table.apply(delta):
+            self.resync_requested.emit()
+            return
+        if delta.is_empty(): return
+        if self.hierarchy is not None: self.hierarchy.apply(delta, self.table.records)
+        self.refresh_view()
+        if t0: INSTRUMENT.since("process_tree.apply_delta", t0)
+
+    def update_data(self, records):
+        # Snapshot completo (lista de ProcessRecord)
+        t0 = time.perf_counter() if INSTRUMENT.enabled else 0.0
+        self.table.reset(records)
+        if self.hierarchy is not None: self.hierarchy.rebuild(self.table.records)
+        self.refresh_view()
+        if t0: INSTRUMENT.since("process_tree.update_data", t0)
+
+    def set_filter(self, text):
+        self.query = text
+        self.refresh_view()
+
+    def set_hierarchy(self, enabled):
+        if enabled == (self.hierarchy is not None): return
+        if enabled:
+            self.hierarchy = ProcessHierarchy()
+            self.hierarchy.rebuild(self.table.records)
+        else:
+            self.hierarchy = None
+            self.tree_filter = None
+        self.proc_model.expand_specs = self.tree_specs if enabled else child_specs
+        self.proc_model.clear()
+        self.group_view.clear()
+        self.refresh_view()
+
+    def tree_specs(self, pids):
+        allowed = self.tree_filter
+        if allowed is not None: pids = [p for p in pids if p in allowed]
+        else: pids = list(pids)
+        records = self.table.records
+        totals = self.hierarchy.totals
+        children = self.hierarchy.children
+        if self.sort_col == 0 and self.sort_state_name:
+            pids.sort(key=lambda p: records[p].name.lower(), reverse=(self.sort_state_name == 2))
+        elif self.sort_col == 1:
+            pids.sort(reverse=not self.sort_asc)
+        else:
+            # Por el total del subárbol: cpu, ram, disk
+            col = 1 if self.sort_col in (-1, 0) else self.sort_col - 2
+            pids.sort(key=lambda p: totals[p][col], reverse=(self.sort_col in (-1, 0) or not self.sort_asc))
+        specs = []
+        for p in pids:
+            kids = children[p]
+            if allowed is not None: kids = [c for c in kids if c in allowed]
+            specs.append(tree_spec(records[p], totals[p], list(kids)))
+        return specs
+
+    def refresh_view(self):
+        if self.hierarchy is not None:
+            only = self.table.search(self.query)
+            # Con filtro se ven los procesos que coinciden y la cadena de padres hasta la raíz
+            allowed = None
+            if only is not None:
+                allowed = set()
+                parent = self.hierarchy.parent
+                for pid in only:
+                    while pid and pid not in allowed:
+                        allowed.add(pid)
+                        pid = parent.get(pid, 0)
+            self.tree_filter = allowed
+            self.proc_model.apply_specs(self.tree_specs(self.hierarchy.roots()))
+        else:
+            # Todos los grupos, pero cada tick solo reagrupa los nombres que trae el delta; el modelo
+            # solo formatea las filas que la vista pinta
+            sort = (self.sort_col, self.sort_state_name, self.sort_asc)
+            full, groups, removed = self.group_view.refresh(self.table, sort, self.query)
+            if full: self.proc_model.update_groups(groups)
+            else: self.proc_model.patch_groups(groups, removed, self.group_view.order)
+        self.emit_visible_pids()
+
+
+class DebugOverlay(QFrame):
+    # Panel flotante sobre la ventana: etapas instrumentadas, coste por fuente y huella del
+    # propio proceso. Mientras está oculto la instrumentación queda desactivada.
+    export_requested = Signal()
+
+    def __init__(self, parent, provider):
+        super().__init__(parent)
+        self.provider = provider
+        self.setObjectName("Card")
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(12, 8, 12, 10)
+        layout.setSpacing(4)
+        header = QHBoxLayout()
+        header.addWidget(QLabel("DIAGNOSTICS", objectName="Title"))
+        header.addStretch()
+        self.btn_export = QPushButton("Export")
+        self.btn_export.setCursor(Qt.PointingHandCursor)
+        self.btn_export.clicked.connect(self.export_requested.emit)
+        header.addWidget(self.btn_export)
+        layout.addLayout(header)
+        self.text = QLabel("")
+        self.text.setTextFormat(Qt.PlainText)
+        layout.addWidget(self.text)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.refresh_theme_colors()
+        self.hide()
 
-            if p_data['count'] == 1:
-                item.setText(1, str(p_data['pid']))
-            else:
-                item.setText(1, "")
-            item.setTextAlignment(1, Qt.AlignCenter)
-
-            item.setText(2, f"{format_decimal(p_data['cpu'])}%")
-            item.setTextAlignment(2, Qt.AlignCenter)
-            if p_data['cpu'] > 15:
-                item.setForeground(2, QBrush(QColor(config.active_theme['accent_red'])))
-            elif p_data['cpu'] > 1.0:
-                item.setForeground(2, QBrush(QColor(config.active_theme['accent_blue'])))
-            else:
-                item.setForeground(2, QBrush(QColor(config.active_theme['text_dim'])))
-
-            ram_mb = p_data['ram'] / (1024 * 1024)
-            item.setText(3, f"{format_decimal(ram_mb)} MB")
-            item.setTextAlignment(3, Qt.AlignRight | Qt.AlignVCenter)
-            if ram_mb > 1000:
-                item.setForeground(3, QBrush(QColor(config.active_theme['accent_red'])))
-            elif ram_mb > 300:
-                item.setForeground(3, QBrush(QColor(config.active_theme['accent_blue'])))
-            else:
-                item.setForeground(3, QBrush(QColor(config.active_theme['text_dim'])))
-
-            item.setText(4, f"{format_decimal(p_data['disk'])} MB/s")
-            item.setTextAlignment(4, Qt.AlignRight | Qt.AlignVCenter)
-            if p_data['disk'] > 5.0:
-                item.setForeground(4, QBrush(QColor(config.active_theme['accent_red'])))
-            elif p_data['disk'] > 0.1:
-                item.setForeground(4, QBrush(QColor(config.active_theme['accent_blue'])))
-            else:
-                item.setForeground(4, QBrush(QColor(config.active_theme['text_dim'])))
-
-            if p_data['count'] > 1:
-                if self.sort_col == 0 and self.sort_state_name != 0:
-                    p_data['children'].sort(key=lambda x: x['name'].lower(), reverse=(self.sort_state_name == 2))
-                else:
-                    child_key = col_keys.get(self.sort_col, 'ram')
-                    if self.sort_col == -1: child_key = 'ram'
-                    reverse = not self.sort_asc if self.sort_col != -1 else True
-                    p_data['children'].sort(key=lambda x: x[child_key], reverse=reverse)
-
-                for child in p_data['children']:
-                    child_item = QTreeWidgetItem(item)
-                    child_item.setData(0, Qt.UserRole, [child['pid']])
-                    child_item.setText(0, child['name'])
-                    child_item.setForeground(0, QBrush(QColor(config.active_theme['text_dim'])))
-
-                    child_item.setText(1, str(child['pid']))
-                    child_item.setTextAlignment(1, Qt.AlignCenter)
-
-                    child_item.setText(2, f"{format_decimal(child['cpu'])}%")
-                    child_item.setTextAlignment(2, Qt.AlignCenter)
-                    if child['cpu'] > 15:
-                        child_item.setForeground(2, QBrush(QColor(config.active_theme['accent_red'])))
-                    elif child['cpu'] > 1.0:
-                        child_item.setForeground(2, QBrush(QColor(config.active_theme['accent_blue'])))
-
-                    c_ram = child['ram'] / (1024 * 1024)
-                    child_item.setText(3, f"{format_decimal(c_ram)} MB")
-                    child_item.setTextAlignment(3, Qt.AlignRight | Qt.AlignVCenter)
-                    if c_ram > 1000:
-                        child_item.setForeground(3, QBrush(QColor(config.active_theme['accent_red'])))
-                    elif c_ram > 300:
-                        child_item.setForeground(3, QBrush(QColor(config.active_theme['accent_blue'])))
-
-                    child_item.setText(4, f"{format_decimal(child['disk'])} MB/s")
-                    child_item.setTextAlignment(4, Qt.AlignRight | Qt.AlignVCenter)
-                    if child['disk'] > 5.0:
-                        child_item.setForeground(4, QBrush(QColor(config.active_theme['accent_red'])))
-                    elif child['disk'] > 0.1:
-                        child_item.setForeground(4, QBrush(QColor(config.active_theme['accent_blue'])))
-
-            if p_data['name'] in expanded_names: item.setExpanded(True)
\ No newline at end of file
+    def refresh_theme_colors(self):
+        self.text.setStyleSheet(f"color: {config.active_theme['text_main']}; font-size: 11px; "
+                                f"font-family: 'Consolas', monospace;")
+
+    def set_active(self, active):
+        INSTRUMENT.enabled = active
+        if active:
+            INSTRUMENT.reset()
+            self.timer.start(1000)
+            self.refresh()
+            self.show()
+            self.raise_()
+        else:
+            self.timer.stop()
+            self.hide()
+
+    def refresh(self):
+        d = self.provider()
+        p = d.get('process', {})
+        lines = []
+        if p:
+            lines.append(f"LeSYS  CPU {p['cpu_percent']:5.1f}%   RSS {p['rss_bytes'] / 1024 ** 2:6.1f} MB   "
+                         f"threads {p['threads']}")
+            lines.append("")
+        lines.append(f"{'stage':<28}{'last':>8}{'p50':>8}{'p99':>8}{'max':>8}  ms")
+        for name, st in d.get('stages', {}).items():
+            lines.append(f"{name:<28}{st['last_ms']:8.2f}{st['p50_ms']:8.2f}{st['p99_ms']:8.2f}{st['max_ms']:8.2f}")
+        sources = d.get('sources', {})
+        if sources:
+            lines.append("")
+            lines.append(f"{'source':<28}{'last':>8}{'max':>8}{'late':>8}{'miss':>8}")
+            for name, st in sources.items():
+                lines.append(f"{name:<28}{st['last_ms']:8.2f}{st['max_ms']:8.2f}{st['max_late_ms']:8.1f}{st['missed']:8d}")
+        transport = d.get('transport', {})
+        if transport:
+            lines.append("")
+            lines.append(f"{'transport':<28}{'posted':>8}{'drop':>8}{'scale':>8}")
+            for name, st in transport.items():
+                lines.append(f"{name:<28}{st['posted']:8d}{st['dropped']:8d}{st.get('scale', 1.0):7.0f}x")
+        self.text.setText("\n".join(lines))
+        self.adjustSize()
+        parent = self.parentWidget()
+        if parent is not None: self.move(parent.width() - self.width() - 24, 24)
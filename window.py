@@ -0,0 +1,406 @@
+import gc
+import json
+import time
+import os
+
+from PySide6.QtWidgets import (QApplication, QWidget, QLabel, QVBoxLayout,
+                               QHBoxLayout, QFrame, QPushButton, QMenu, QFileDialog, QLineEdit)
+from PySide6.QtCore import Qt, QSize, QPoint, QEvent, Signal
+from PySide6.QtGui import QAction, QActionGroup, QIcon, QPainter, QColor, QKeySequence, QShortcut
+
+import config
+from workers import WorkerThread, ProcessWorker
+from collector.history import HistoryStore
+from collector.tsdb import open_store
+from collector.instrument import INSTRUMENT
+from widgets import HardwareRow, NetworkRow, DiskRow, ProcessTree, DebugOverlay
+
+VISIBILITY_EVENTS = (QEvent.Show, QEvent.Hide, QEvent.WindowStateChange, QEvent.Expose)
+
+
+def samples(seconds):
+    # Segundos -> muestras del historial en memoria (una cada UI_INTERVAL)
+    return max(int(round(seconds / config.UI_INTERVAL)), 2)
+
+
+class MonitorFinal(QWidget):
+    # Arranque por etapas: first_data al pintar el primer snapshot, first_paint tras el primer
+    # paintEvent de la ventana ya visible
+    first_data = Signal()
+    first_paint = Signal()
+
+    def __init__(self, feed=None, title="LeSYS", recorder=None):
+        # feed: fuente externa de datos (RemoteWorker, ReplayFeed) con data_signal, processes_signal,
+        # set_visible_pids, request_keyframe y start(); sin feed se muestrea esta máquina.
+        # recorder: collector.recording.Recorder que guarda todo lo que llega a la ventana
+        super().__init__()
+        self.feed = feed
+        self.got_data = False
+        self.painted = False
+        # Ventana visible: con active=False solo se alimenta el historial (update_ui) y, si se
+        # puede, se pausa el escaneo de procesos; last_data se pinta al volver
+        self.active = True
+        self.last_data = None
+        self.pause_hidden = config.PAUSE_HIDDEN and recorder is None
+        self.setWindowTitle(title)
+        self.resize(1450, 680)
+        self.use_bits = False
+        self.is_dark = True
+        # Una muestra por UI_INTERVAL: retención y ventanas de los gráficos en muestras
+        self.history = HistoryStore(samples(config.HISTORY_RETENTION))
+
+        self.main_layout = QHBoxLayout()
+        self.main_layout.setSpacing(20)
+        self.main_layout.setContentsMargins(20, 20, 20, 20)
+        self.setLayout(self.main_layout)
+
+        self.left_container = QWidget()
+        self.left_layout = QVBoxLayout(self.left_container)
+        self.left_layout.setContentsMargins(0, 0, 0, 0)
+        self.left_layout.setSpacing(10)
+
+        h_box = QHBoxLayout()
+        h_box.addWidget(QLabel("PERFORMANCE", objectName="HeaderTitle"))
+        h_box.addStretch()
+        self.left_layout.addLayout(h_box)
+
+        self.row_cpu = HardwareRow("CPU", self.history.series('cpu'))
+        self.left_layout.addWidget(self.row_cpu)
+        self.row_ram = HardwareRow("RAM", self.history.series('ram'))
+        self.left_layout.addWidget(self.row_ram)
+        self.row_gpu = HardwareRow("GPU", self.history.series('gpu'))
+        self.left_layout.addWidget(self.row_gpu)
+        self.row_net = NetworkRow(self.history.series('net_down'), self.history.series('net_up'))
+        self.left_layout.addWidget(self.row_net)
+        self.set_graph_window(config.GRAPH_WINDOWS[0][1])
+
+        self.disk_frame = QFrame()
+        self.disk_frame.setObjectName("Card")
+        self.d_layout = QVBoxLayout()
+        self.d_layout.setContentsMargins(15, 10, 15, 10)
+        self.d_layout.addWidget(QLabel("STORAGE", objectName="Title"))
+
+        header_disk = QHBoxLayout()
+        header_disk.setContentsMargins(0, 5, 0, 0)
+        header_disk.setSpacing(10)
+
+        lbl_h_dev = QLabel("DRIVE")
+        lbl_h_dev.setObjectName("HeaderCol")
+        lbl_h_dev.setFixedWidth(35)
+        lbl_h_use = QLabel("USAGE")
+        lbl_h_use.setObjectName("HeaderCol")
+        lbl_h_pct = QLabel("%")
+        lbl_h_pct.setObjectName("HeaderCol")
+        lbl_h_pct.setFixedWidth(40)
+        lbl_h_pct.setAlignment(Qt.AlignRight)
+
+        lbl_h_read = QLabel("READ")
+        lbl_h_read.setObjectName("HeaderCol")
+        lbl_h_read.setFixedWidth(85)
+        lbl_h_read.setAlignment(Qt.AlignRight)
+        lbl_h_write = QLabel("WRITE")
+        lbl_h_write.setObjectName("HeaderCol")
+        lbl_h_write.setFixedWidth(85)
+        lbl_h_write.setAlignment(Qt.AlignRight)
+
+        header_disk.addWidget(lbl_h_dev)
+        header_disk.addWidget(lbl_h_use, stretch=1)
+        header_disk.addWidget(lbl_h_pct)
+        header_disk.addWidget(lbl_h_read)
+        header_disk.addWidget(lbl_h_write)
+
+        self.d_layout.addLayout(header_disk)
+        self.d_layout.addWidget(QLabel("", styleSheet="border-top: 1px solid #3C4043; margin-bottom: 5px;"))
+
+        # Las filas de disco se crean al llegar datos del WorkerThread: enumerar particiones o
+        # consultar disk_usage aquí puede bloquear el arranque con un montaje de red colgado
+        self.disks = {}
+        self.d_layout.addStretch()
+        self.disk_frame.setLayout(self.d_layout)
+        self.left_layout.addWidget(self.disk_frame, stretch=1)
+
+        self.main_layout.addWidget(self.left_container, stretch=1)
+
+        self.right_container = QFrame()
+        self.right_layout = QVBoxLayout(self.right_container)
+        self.right_layout.setContentsMargins(0, 0, 0, 0)
+        self.right_layout.setSpacing(10)
+
+        right_header = QHBoxLayout()
+        right_header.addWidget(QLabel("PROCESSES", objectName="HeaderTitle"))
+        right_header.addStretch()
+
+        self.proc_filter = QLineEdit(objectName="Filter")
+        self.proc_filter.setPlaceholderText("Filter by name, PID or path")
+        self.proc_filter.setClearButtonEnabled(True)
+        self.proc_filter.setFixedWidth(240)
+        right_header.addWidget(self.proc_filter)
+        QShortcut(QKeySequence.Find, self, activated=self.proc_filter.setFocus)
+        QShortcut(QKeySequence("Escape"), self.proc_filter, activated=self.proc_filter.clear,
+                  context=Qt.WidgetShortcut)
+
+        self.btn_opts = QPushButton()
+        self.btn_opts.setCursor(Qt.PointingHandCursor)
+        self.btn_opts.setFixedSize(30, 30)
+        self.btn_opts.setIconSize(QSize(20, 20))
+
+        self.menu = QMenu(self)
+        self.act_unit = QAction("Switch to Kbps/Mbps", self, checkable=True)
+        self.act_unit.triggered.connect(self.toggle_unit)
+        self.act_theme = QAction("Light Mode", self, checkable=True)
+        self.act_theme.triggered.connect(self.toggle_theme)
+        self.act_tree = QAction("Process tree by parent", self, checkable=True)
+        self.act_tree.setChecked(config.PROCESS_HIERARCHY)
+        self.menu.addAction(self.act_unit)
+        self.menu.addAction(self.act_theme)
+        self.menu.addAction(self.act_tree)
+
+        self.menu_window = self.menu.addMenu("Graph window")
+        self.window_group = QActionGroup(self)
+        for label, seconds in config.GRAPH_WINDOWS:
+            act = QAction(label, self, checkable=True)
+            act.setChecked(seconds == config.GRAPH_WINDOWS[0][1])
+            act.triggered.connect(lambda checked, s=seconds: self.set_graph_window(s))
+            self.window_group.addAction(act)
+            self.menu_window.addAction(act)
+
+        self.act_debug = QAction("Debug overlay (F12)", self, checkable=True)
+        self.act_debug.triggered.connect(self.toggle_debug)
+        self.menu.addAction(self.act_debug)
+        self.act_export = QAction("Export diagnostics…", self)
+        self.act_export.triggered.connect(self.export_diagnostics)
+        self.menu.addAction(self.act_export)
+        QShortcut(QKeySequence("F12"), self, activated=self.act_debug.trigger)
+
+        self.btn_opts.clicked.connect(lambda: self.menu.exec(self.btn_opts.mapToGlobal(QPoint(0, 30))))
+        right_header.addWidget(self.btn_opts)
+
+        self.right_layout.addLayout(right_header)
+
+        self.proc_table = ProcessTree()
+        self.right_layout.addWidget(self.proc_table)
+        self.proc_filter.textChanged.connect(self.proc_table.set_filter)
+        self.act_tree.triggered.connect(self.proc_table.set_hierarchy)
+        if config.PROCESS_HIERARCHY: self.proc_table.set_hierarchy(True)
+
+        self.main_layout.addWidget(self.right_container, stretch=1.3)
+
+        self.debug_overlay = DebugOverlay(self, self.diagnostics)
+        self.debug_overlay.export_requested.connect(self.export_diagnostics)
+
+        self.apply_stylesheet()
+        self.refresh_settings_icon()
+
+        gc.collect()
+
+        if feed is not None:
+            # PIDs de otra máquina o de una grabación: no se puede terminar nada local
+            self.proc_table.allow_kill = False
+            self.worker = self.proc_worker = feed
+        else:
+            # El historial en disco se abre y se lee en el hilo del worker
+            persist = config.HISTORY_PERSIST
+            self.worker = WorkerThread(intervals=config.SAMPLE_INTERVALS,
+                                       emit_interval=config.UI_INTERVAL, sensors=config.SENSOR_BACKENDS,
+                                       first_delay=config.FIRST_SAMPLE_DELAY,
+                                       open_store=(lambda: open_store(config.HISTORY_PATH)) if persist else None,
+                                       backfill=('cpu', 'ram', 'gpu', 'net_down', 'net_up'),
+                                       backfill_seconds=config.HISTORY_RETENTION, backfill_step=config.UI_INTERVAL)
+            self.worker.backfill_signal.connect(self.history.apply_backfill)
+            self.proc_worker = ProcessWorker(interval=config.PROCESS_INTERVAL)
+        if recorder is not None:
+            # En el hilo de cada worker y antes del buzón: se graba todo, también lo que la
+            # interfaz descarta o funde (el Recorder tiene su propio lock)
+            if hasattr(self.worker, 'add_tap'):
+                self.worker.add_tap(recorder.write_system)
+                self.proc_worker.add_tap(recorder.write_processes)
+            else:
+                self.worker.data_signal.connect(recorder.write_system)
+                self.proc_worker.processes_signal.connect(recorder.write_processes)
+        self.worker.data_signal.connect(self.update_ui)
+        self.proc_worker.processes_signal.connect(self.on_processes)
+        self.proc_table.visible_pids_changed.connect(self.proc_worker.set_visible_pids)
+        self.proc_table.resync_requested.connect(self.proc_worker.request_keyframe)
+        self.worker.start()
+        if self.proc_worker is not self.worker: self.proc_worker.start()
+        if feed is None and config.HISTORY_PERSIST: QApplication.instance().aboutToQuit.connect(self.close_store)
+        if config.DEBUG_OVERLAY:
+            self.act_debug.setChecked(True)
+            self.toggle_debug(True)
+
+    def close_store(self):
+        # Con el WorkerThread ya parado: close() guarda los cubos de 10 s y 1 min a medio llenar
+        self.worker.stop()
+        stopped = self.worker.wait(3000)
+        store = self.worker.store
+        if store is None: return
+        if stopped: store.close()
+        else: store.flush()
+
+    def get_icon_path(self):
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        return os.path.join(base_dir, "assets", "icon-ajustes.png")
+
+    def refresh_settings_icon(self):
+        try:
+            path = self.get_icon_path()
+            pixmap = QIcon(path).pixmap(QSize(20, 20))
+            if pixmap.isNull(): return
+            color = QColor(config.active_theme["text_dim"])
+            painter = QPainter(pixmap)
+            painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+            painter.fillRect(pixmap.rect(), color)
+            painter.end()
+            self.btn_opts.setIcon(QIcon(pixmap))
+        except:
+            pass
+
+    def toggle_unit(self, checked):
+        self.use_bits = checked
+        self.row_net.set_unit(checked)
+        for d in self.disks.values(): d.set_unit(checked)
+
+    def set_graph_window(self, seconds):
+        for graph in (self.row_cpu.graph, self.row_ram.graph, self.row_gpu.graph, self.row_net.g):
+            graph.set_window(samples(seconds))
+
+    def toggle_theme(self, checked):
+        self.is_dark = not checked
+        config.active_theme = config.THEMES["Dark"] if self.is_dark else config.THEMES["Light"]
+        self.act_theme.setText("Dark Mode" if checked else "Light Mode")
+        self.apply_stylesheet()
+        for d in self.disks.values(): d.refresh_theme_colors()
+        self.row_net.update_style_imm()
+        self.proc_table.refresh_theme()
+        self.debug_overlay.refresh_theme_colors()
+        self.refresh_settings_icon()
+        self.repaint()
+
+    def apply_stylesheet(self):
+        self.setStyleSheet(config.get_stylesheet(config.active_theme))
+
+    def event(self, e):
+        result = super().event(e)
+        if not self.painted and e.type() == QEvent.Paint:
+            self.painted = True
+            self.first_paint.emit()
+        if e.type() in VISIBILITY_EVENTS:
+            if e.type() == QEvent.Show: self.watch_window()
+            self.refresh_activity()
+        return result
+
+    def watch_window(self):
+        # Minimizar o tapar la ventana no siempre llega como evento a este widget (p. ej. dentro
+        # de HostsWindow): se observan también la ventana de nivel superior y su QWindow (Expose)
+        top = self.window()
+        if top is not self: top.installEventFilter(self)
+        handle = top.windowHandle()
+        if handle is not None: handle.installEventFilter(self)
+
+    def eventFilter(self, obj, e):
+        if e.type() in VISIBILITY_EVENTS: self.refresh_activity()
+        return False
+
+    def refresh_activity(self):
+        top = self.window()
+        handle = top.windowHandle()
+        active = self.isVisible() and not top.isMinimized() and (handle is None or handle.isExposed())
+        if active == self.active: return
+        self.active = active
+        if self.pause_hidden:
+            pause = getattr(self.proc_worker, 'set_paused', None)
+            if pause is not None: pause(not active)
+            slowdown = getattr(self.worker, 'set_slowdown', None)
+            if slowdown is not None: slowdown(1 if active else config.HIDDEN_SLOWDOWN)
+        # Al volver se pinta ya el último snapshot; el escaneo de procesos se reanuda al momento
+        if active and self.last_data is not None: self.update_widgets(self.last_data)
+
+    def toggle_debug(self, checked):
+        self.debug_overlay.set_active(checked)
+
+    def diagnostics(self):
+        # Todo lo que muestra el panel de diagnóstico, serializable a JSON
+        sources = {}
+        for prefix, worker in (('system', self.worker), ('processes', self.proc_worker)):
+            stats = getattr(worker, 'stats', None)
+            if stats is None: continue
+            for name, st in stats().items(): sources[f"{prefix}:{name}"] = st
+        # Buzones worker -> interfaz: valores entregados, descartados/fundidos y ralentización
+        transport = {}
+        for prefix, worker in (('system', self.worker), ('processes', self.proc_worker)):
+            stats = getattr(worker, 'transport_stats', None)
+            if stats is None: continue
+            st = stats()
+            # RemoteWorker devuelve los dos buzones a la vez
+            if 'posted' in st: transport[prefix] = st
+            else: transport.update(st)
+        return {'timestamp': time.time(), 'instrumented': INSTRUMENT.enabled,
+                'process': INSTRUMENT.footprint(), 'stages': INSTRUMENT.snapshot(), 'sources': sources,
+                'transport': transport, 'icons': self.proc_table.proc_model.icons.stats()}
+
+    def export_diagnostics(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export diagnostics", "lesys-diagnostics.json", "JSON (*.json)")
+        if not path: return
+        try:
+            with open(path, "w") as f: json.dump(self.diagnostics(), f, indent=2)
+        except:
+            pass
+
+    def on_processes(self, delta):
+        if INSTRUMENT.enabled:
+            emitted = getattr(self.proc_worker, 'emitted_at', 0.0)
+            if emitted: INSTRUMENT.record("signal:processes", (time.perf_counter() - emitted) * 1000)
+        self.proc_table.apply_delta(delta)
+
+    def update_ui(self, data):
+        t0 = time.perf_counter() if INSTRUMENT.enabled else 0.0
+        if t0:
+            emitted = getattr(self.worker, 'emitted_at', 0.0)
+            if emitted: INSTRUMENT.record("signal:system", (t0 - emitted) * 1000)
+        self.history.record(data)
+        self.last_data = data
+        if self.active: self.update_widgets(data)
+
+        if t0: INSTRUMENT.since("update_ui", t0)
+        if not self.got_data:
+            self.got_data = True
+            self.first_data.emit()
+
+    def update_widgets(self, data):
+        self.row_cpu.update_val(data['cpu'], data.get('cpu_extra', ''))
+        self.row_ram.update_val(data['ram'], data.get('ram_extra', ''))
+        self.row_gpu.update_val(data['gpu'], data.get('gpu_extra', ''))
+        self.row_net.update_net(data['net_down'], data['net_up'], data.get('net_iface', ''))
+
+        total_read = 0
+        total_write = 0
+        if 'disk_io' in data:
+            for k, v in data['disk_io'].items():
+                total_read += v[0]
+                total_write += v[1]
+
+        disk_usage = data.get('disk_usage', {})
+        disk_stale = data.get('disk_stale', {})
+        if disk_usage.keys() != self.disks.keys(): self.sync_disk_rows(disk_usage)
+        disk_detail = data.get('disk_detail', {})
+        for name, row in self.disks.items():
+            usage = disk_usage[name]
+            spec_io = data.get('disk_io', {}).get(name)
+            if spec_io:
+                row.update_state(usage, spec_io[0], spec_io[1], disk_stale.get(name), disk_detail.get(name))
+            else:
+                row.update_state(usage, total_read, total_write, disk_stale.get(name))
+
+    def sync_disk_rows(self, names):
+        for name in list(self.disks):
+            if name not in names:
+                row = self.disks.pop(name)
+                self.d_layout.removeWidget(row)
+                row.deleteLater()
+        for name in names:
+            if name in self.disks: continue
+            row = DiskRow(name)
+            row.set_unit(self.use_bits)
+            # Antes del stretch final del layout
+            self.d_layout.insertWidget(self.d_layout.count() - 1, row)
+            self.disks[name] = row
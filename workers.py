@@ -1,205 +1,197 @@
+import threading
 import time
-import psutil
-from PySide6.QtCore import QThread, Signal
-
-IGNORED_PROCESSES = {
-    "System Idle Process", "System", "Registry", "MemCompression", "vmmem",
-    "smss.exe", "csrss.exe", "wininit.exe", "services.exe", "lsass.exe",
-    "winlogon.exe", "Memory Compression", "svchost.exe", "RuntimeBroker.exe"
-}
 
+from PySide6.QtCore import QThread, Signal
 
-class WorkerThread(QThread):
+from collector import SystemCollector, ProcessCollector, DeltaEncoder, ProcessDelta, Scheduler
+from collector.mailbox import Mailbox
+from collector.history import read_backfill
+
+# Como mucho 1 de cada MAX_SCALE valores llega a la interfaz cuando no los recoge a tiempo
+MAX_SCALE = 8
+
+
+class MailboxWorker(QThread):
+    # Entrega a la interfaz por un buzón de último valor (collector.mailbox): el hilo deja el
+    # resultado y solo emite `ready` (sin datos) si el buzón estaba vacío; flush() corre en el
+    # hilo de la interfaz y emite la señal pública con lo que haya. Un hilo de interfaz atascado
+    # no acumula eventos en la cola de Qt: se descartan (o funden) valores y se publica en el
+    # buzón solo 1 de cada `scale` valores (el doble por cada descarte, hasta MAX_SCALE; vuelve
+    # a 1 al ponerse al día). El muestreo, las taps y el historial siguen a su intervalo.
+    ready = Signal()
+
+    def __init__(self, merge=None):
+        super().__init__()
+        self.mailbox = Mailbox(merge)
+        self.merge = merge
+        # Valor retenido entre publicaciones mientras scale > 1 (fundido si hay merge)
+        self.held = None
+        self.skip = 0
+        # Consumidores que necesitan cada valor (grabación): se llaman en el hilo del worker
+        self.taps = []
+        self.scale = 1
+        self.throttled = 0
+        self.skipped = 0
+        # perf_counter de la última entrega al buzón: la interfaz mide con él la latencia
+        self.emitted_at = 0.0
+        self.ready.connect(self.flush)
+
+    def add_tap(self, fn):
+        self.taps.append(fn)
+
+    def publish(self, value):
+        for tap in self.taps:
+            try: tap(value)
+            except: pass
+        if self.held is not None:
+            value = self.merge(self.held, value) if self.merge is not None else value
+            self.held = None
+        self.skip += 1
+        if self.skip < self.scale:
+            self.held = value
+            self.skipped += 1
+            return
+        self.skip = 0
+        self.emitted_at = time.perf_counter()
+        if self.mailbox.post(value):
+            if self.scale > 1: self.scale //= 2
+            self.ready.emit()
+        elif self.scale < MAX_SCALE:
+            self.scale *= 2
+            self.throttled += 1
+
+    def flush(self):
+        value = self.mailbox.take()
+        if value is not None: self.deliver(value)
+
+    def deliver(self, value):
+        pass
+
+    def transport_stats(self):
+        stats = self.mailbox.stats()
+        stats['scale'] = self.scale
+        stats['throttled'] = self.throttled
+        stats['skipped'] = self.skipped
+        return stats
+
+
+class WorkerThread(MailboxWorker):
     data_signal = Signal(dict)
+    # {serie: array} leído del historial persistente al arrancar (HistoryStore.apply_backfill)
+    backfill_signal = Signal(object)
+
+    def __init__(self, collector=None, store=None, intervals=None, emit_interval=1.0, sensors=None,
+                 first_delay=None, open_store=None, backfill=(), backfill_seconds=0, backfill_step=1):
+        super().__init__()
+        self.collector = collector
+        self.sensors = sensors
+        self.first_delay = first_delay
+        self.intervals = intervals
+        self.emit_interval = emit_interval
+        # TimeSeriesStore opcional: la escritura es un pack_into sobre el mmap por métrica
+        self.store = store
+        # open_store(): abre el TimeSeriesStore en este hilo (fichero de bloqueo, catálogo y
+        # mmap no retrasan la ventana); después se leen las series de `backfill`
+        self.open_store = open_store
+        self.backfill = backfill
+        self.backfill_seconds = backfill_seconds
+        self.backfill_step = backfill_step
+        self.running = True
+        self.slowdown = 1
+        self.wake = threading.Event()
+
+    def stats(self):
+        return self.collector.stats() if self.collector is not None else {}
+
+    def set_slowdown(self, factor):
+        # Desde la interfaz (ventana oculta): el hilo aplica el factor en el siguiente ciclo
+        self.slowdown = factor
+        self.wake.set()
+
+    def deliver(self, data):
+        self.data_signal.emit(data)
+
+    def stop(self):
+        # Al salir: el hilo termina el tick en curso; después ya se puede cerrar el store
+        self.running = False
+        self.wake.set()
 
     def run(self):
-        wmi_c = None
-        has_wmi = False
-        try:
-            import pythoncom
-            import wmi
-            pythoncom.CoInitialize()
-            wmi_c = wmi.WMI(namespace="root\\cimv2")
-            has_wmi = True
-        except:
-            pass
-
-        gpu_mode = "NONE"
-        nvml_handle = None
-        wmi_gpu = None
-
-        try:
-            import pynvml
-            pynvml.nvmlInit()
-            nvml_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-            gpu_mode = "NVIDIA"
-        except:
-            if has_wmi:
-                try:
-                    if wmi_c.Win32_VideoController():
-                        gpu_mode = "WMI"
-                except:
-                    pass
-
-        self.prev_net_per_nic = psutil.net_io_counters(pernic=True)
-        last_time = time.time()
-
-        while True:
-            current_time = time.time()
-            dt = current_time - last_time
-            if dt <= 0: dt = 0.001
-            last_time = current_time
-
-            data = {'gpu': 0, 'disk_io': {}, 'disk_usage': {}}
-
-            data['cpu'] = psutil.cpu_percent(interval=None)
-            try:
-                freq = psutil.cpu_freq()
-                if freq:
-                    val = freq.current if freq.current > 100 else freq.max
-                    data['cpu_extra'] = f"{val / 1000:.2f} GHz"
-                else:
-                    data['cpu_extra'] = ""
-            except:
-                data['cpu_extra'] = ""
-
-            mem = psutil.virtual_memory()
-            data['ram'] = mem.percent
-            used_gb = mem.used / (1024 ** 3)
-            total_gb = mem.total / (1024 ** 3)
-            data['ram_extra'] = f"{used_gb:.1f} / {total_gb:.1f} GB"
-
-            data['gpu_extra'] = ""
-            if gpu_mode == "NVIDIA" and nvml_handle:
-                try:
-                    import pynvml
-                    util = pynvml.nvmlDeviceGetUtilizationRates(nvml_handle)
-                    data['gpu'] = util.gpu
-                    mem_info = pynvml.nvmlDeviceGetMemoryInfo(nvml_handle)
-                    vram_used = mem_info.used / (1024 ** 3)
-                    vram_total = mem_info.total / (1024 ** 3)
-                    data['gpu_extra'] = f"{vram_used:.1f} / {vram_total:.1f} GB"
-                except:
-                    pass
-            elif gpu_mode == "WMI" and has_wmi:
-                try:
-                    gpu_list = wmi_c.Win32_VideoController()
-                    if gpu_list:
-                        if hasattr(gpu_list[0], 'LoadPercentage'):
-                            data['gpu'] = gpu_list[0].LoadPercentage
-                        if hasattr(gpu_list[0], 'AdapterRAM') and gpu_list[0].AdapterRAM:
-                            vram_total = int(gpu_list[0].AdapterRAM) / (1024 ** 3)
-                            data['gpu_extra'] = f"Total: {vram_total:.1f} GB"
-                except:
-                    pass
-
-            curr_net_per_nic = psutil.net_io_counters(pernic=True)
-            total_sent_delta = 0
-            total_recv_delta = 0
-            active_iface_name = "Ethernet"
-            max_activity = -1
-            blacklist = ['loopback', 'vethernet', 'wsl', 'vmware', 'virtualbox', 'adapter', 'pseudo', 'teredo']
-
-            for name, io in curr_net_per_nic.items():
-                if any(x in name.lower() for x in blacklist): continue
-                prev_io = self.prev_net_per_nic.get(name, io)
-                delta_s = io.bytes_sent - prev_io.bytes_sent
-                delta_r = io.bytes_recv - prev_io.bytes_recv
-                if delta_s < 0: delta_s = 0
-                if delta_r < 0: delta_r = 0
-                total_sent_delta += delta_s
-                total_recv_delta += delta_r
-                if (delta_s + delta_r) > max_activity:
-                    max_activity = (delta_s + delta_r)
-                    active_iface_name = name
-
-            self.prev_net_per_nic = curr_net_per_nic
-            data['net_up'] = (total_sent_delta / dt) / (1024 ** 2)
-            data['net_down'] = (total_recv_delta / dt) / (1024 ** 2)
-            data['net_iface'] = active_iface_name
-
-            if has_wmi:
-                try:
-                    for i in wmi_c.Win32_PerfFormattedData_PerfDisk_LogicalDisk():
-                        read_mb = int(i.DiskReadBytesPerSec) / (1024 ** 2)
-                        write_mb = int(i.DiskWriteBytesPerSec) / (1024 ** 2)
-                        data['disk_io'][i.Name] = (read_mb, write_mb)
-                except:
-                    pass
-
-            try:
-                partitions = psutil.disk_partitions(all=False)
-                for p in partitions:
-                    if 'cdrom' in p.opts or p.fstype == '': continue
-                    try:
-                        usage = psutil.disk_usage(p.mountpoint).percent
-                        data['disk_usage'][p.device.rstrip("\\")] = usage
-                    except:
-                        pass
-            except:
-                pass
-
-            self.data_signal.emit(data)
-            self.msleep(1000)
-
-
-class ProcessWorker(QThread):
-    processes_signal = Signal(list)
+        # El colector se crea dentro del hilo: WMI/COM se inicializa por hilo
+        if self.collector is None: self.collector = SystemCollector(intervals=self.intervals,
+                                                                    emit_interval=self.emit_interval,
+                                                                    sensors=self.sensors,
+                                                                    first_delay=self.first_delay)
+        self.collector.open()
+        # Mientras vence la primera muestra (first_delay)
+        if self.store is None and self.open_store is not None: self.store = self.open_store()
+        if self.store is not None and self.backfill:
+            try: self.backfill_signal.emit(read_backfill(self.store, self.backfill, time.time(), self.backfill_seconds,
+                                                      self.backfill_step))
+            except: pass
+
+        slowdown = 1
+        while self.running:
+            if self.slowdown != slowdown:
+                slowdown = self.slowdown
+                set_slowdown = getattr(self.collector, 'set_slowdown', None)
+                if set_slowdown is not None: set_slowdown(slowdown)
+            snap = self.collector.tick()
+            if snap is not None:
+                data = snap.as_dict()
+                if self.store is not None:
+                    try: self.store.record(data)
+                    except: self.store = None
+                self.publish(data)
+            self.wake.wait(self.collector.sleep_ms() / 1000)
+            if self.running: self.wake.clear()
+        self.collector.close()
+
+
+class ProcessWorker(MailboxWorker):
+    # Emite ProcessDelta: altas, bajas y cambios de cpu/ram/disk respecto al ciclo anterior.
+    # Los deltas que la interfaz no recoge a tiempo se funden en uno (ProcessDelta.merge).
+    processes_signal = Signal(object)
+
+    def __init__(self, collector=None, interval=2.0):
+        super().__init__(merge=ProcessDelta.merge)
+        self.collector = collector if collector is not None else ProcessCollector()
+        self.encoder = DeltaEncoder()
+        self.interval = interval
+        self.scheduler = Scheduler()
+        self.paused = False
+        self.wake = threading.Event()
+
+    def stats(self):
+        return self.scheduler.stats()
+
+    def set_paused(self, paused):
+        # Desde la interfaz (ventana minimizada u oculta): el hilo duerme sin escanear y al
+        # reanudar escanea en seguida; el delta siguiente cubre todo lo ocurrido en la pausa
+        self.paused = paused
+        self.wake.set()
+
+    def request_keyframe(self):
+        self.encoder.request_keyframe()
+
+    def set_visible_pids(self, pids):
+        # Las filas visibles tienen prioridad para la medición exacta de USS
+        self.collector.set_visible_pids(pids)
+
+    def deliver(self, delta):
+        self.processes_signal.emit(delta)
+
+    def scan(self, now, dt):
+        self.publish(self.encoder.encode(self.collector.sample()))
 
     def run(self):
-        prev_io_data = {}
-        logical_cores = psutil.cpu_count(logical=True) or 1
-
+        self.scheduler.add('processes', self.interval, self.scan, delay=0)
         while True:
-            procs = []
-            try:
-                current_time = time.time()
-                for p in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info', 'exe', 'io_counters']):
-                    try:
-                        p_info = p.info
-                        name = p_info['name']
-                        if not name: continue
-                        if name in IGNORED_PROCESSES: continue
-
-                        pid = p_info['pid']
-
-                        disk_usage = 0.0
-                        io = p_info['io_counters']
-                        if io:
-                            current_total = io.read_bytes + io.write_bytes
-                            if pid in prev_io_data:
-                                prev = prev_io_data[pid]
-                                dt = current_time - prev['time']
-                                if dt > 0:
-                                    diff = current_total - prev['total']
-                                    if diff < 0: diff = 0
-                                    disk_usage = (diff / dt) / (1024 * 1024)
-                            prev_io_data[pid] = {'total': current_total, 'time': current_time}
-
-                        raw_cpu = p_info['cpu_percent'] or 0.0
-                        normalized_cpu = raw_cpu / logical_cores
-
-                        try:
-                            mem_full = p.memory_full_info()
-                            ram_bytes = mem_full.uss
-                        except:
-                            ram_bytes = p.memory_info().rss / 2
-
-                        procs.append({
-                            'pid': pid,
-                            'name': name,
-                            'cpu': normalized_cpu,
-                            'ram': ram_bytes,
-                            'disk': disk_usage,
-                            'exe': p_info['exe'] or ""
-                        })
-                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                        pass
-            except:
-                pass
-
-            current_pids = {p['pid'] for p in procs}
-            prev_io_data = {k: v for k, v in prev_io_data.items() if k in current_pids}
-
-            self.processes_signal.emit(procs)
-            self.sleep(2)
\ No newline at end of file
+            if self.paused:
+                self.wake.wait()
+                self.wake.clear()
+                if not self.paused: self.scheduler.expedite()
+                continue
+            self.scheduler.run_pending()
+            self.wake.wait(self.scheduler.time_to_next())
+            self.wake.clear()